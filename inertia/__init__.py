@@ -1,22 +1,75 @@
-from .inertia import InertiaResponse, Inertia, inertia_dependency_factory
+from .inertia import (
+    InertiaResponse,
+    Inertia,
+    inertia_dependency_factory,
+    inertia_lifespan,
+)
 from .exceptions import (
     inertia_version_conflict_exception_handler,
     InertiaVersionConflictException,
     inertia_request_validation_exception_handler,
+    SSRUnavailableException,
+    SSRDeadlineExceededException,
+    SSRRenderException,
+    SSRBatchUnsupportedException,
 )
 from .config import InertiaConfig
-from .utils import lazy, defer
+from .serializers import JsonSerializer, StdlibJsonSerializer, OrjsonSerializer
+from .utils import lazy, defer, inline, InertiaJsonEncoder
 from .templating import InertiaExtension
+from .circuit_breaker import CircuitBreaker
+from .concurrency_limiter import ConcurrencyLimiter
+from .ssr_cache import SSRCacheBackend, MemorySSRCache, SQLiteSSRCache
+from .prerender import prerender, PrerenderMiddleware
+from .ssr_policy import (
+    SSRPolicy,
+    BotsOnlySSRPolicy,
+    RouteSSRPolicy,
+    HealthySSRPolicy,
+)
+from .ssr_transports import (
+    SSRTransport,
+    HTTPSSRTransport,
+    StdioSSRTransport,
+    SSRSupervisor,
+    LoadBalancedSSRTransport,
+)
 
 __all__ = [
     "InertiaResponse",
     "Inertia",
     "inertia_dependency_factory",
+    "inertia_lifespan",
     "inertia_version_conflict_exception_handler",
     "inertia_request_validation_exception_handler",
     "InertiaVersionConflictException",
+    "SSRUnavailableException",
+    "SSRDeadlineExceededException",
+    "SSRRenderException",
+    "SSRBatchUnsupportedException",
     "InertiaConfig",
+    "InertiaJsonEncoder",
+    "JsonSerializer",
+    "StdlibJsonSerializer",
+    "OrjsonSerializer",
     "lazy",
     "defer",
+    "inline",
     "InertiaExtension",
+    "CircuitBreaker",
+    "ConcurrencyLimiter",
+    "SSRCacheBackend",
+    "MemorySSRCache",
+    "SQLiteSSRCache",
+    "prerender",
+    "PrerenderMiddleware",
+    "SSRPolicy",
+    "BotsOnlySSRPolicy",
+    "RouteSSRPolicy",
+    "HealthySSRPolicy",
+    "SSRTransport",
+    "HTTPSSRTransport",
+    "StdioSSRTransport",
+    "SSRSupervisor",
+    "LoadBalancedSSRTransport",
 ]
@@ -0,0 +1,152 @@
+import os
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, Union
+
+from .utils import _read_manifest_file
+
+if TYPE_CHECKING:
+    from .config import InertiaConfig
+
+# Minimum time, in seconds, between two checks of the manifest modification time
+MANIFEST_CHECK_INTERVAL = 1.0
+
+
+@dataclass(frozen=True)
+class InertiaFiles:
+    """
+    Helper class to store the CSS and JS file urls for Inertia.js, and the Link
+    header values preloading them
+    """
+
+    css_file_urls: Tuple[str, ...]
+    js_file_url: str
+    preload_links: Tuple[str, ...] = ()
+    link_header: str = ""
+
+
+class InertiaAssets:
+    """
+    Asset resolution table of an InertiaConfig.
+    The entrypoint files are resolved from the manifest once, and shared by every
+    request. If `manifest_auto_reload` is enabled, the table is rebuilt whenever
+    the manifest file's modification time changes. The modification time is checked
+    at most once every `MANIFEST_CHECK_INTERVAL` seconds, rather than on every request.
+    """
+
+    _config: "InertiaConfig"
+    _files: Union[InertiaFiles, None]
+    _manifest_mtime: Union[float, None]
+    _next_manifest_check: float
+
+    def __init__(self, config_: "InertiaConfig") -> None:
+        """
+        Constructor
+        :param config_: InertiaConfig object
+        """
+        self._config = config_
+        self._files = None
+        self._manifest_mtime = None
+        self._next_manifest_check = 0.0
+
+    @property
+    def _uses_manifest(self) -> bool:
+        """
+        Check if the assets are resolved from the manifest file
+        :return: True in production or when SSR is enabled, False otherwise
+        """
+        return self._config.environment == "production" or self._config.ssr_enabled
+
+    @property
+    def files(self) -> InertiaFiles:
+        """
+        Get the resolved Inertia files, loading them on first access
+        :return: InertiaFiles object
+        """
+        if self._files is None or (
+            self._config.manifest_auto_reload
+            and self._uses_manifest
+            and self._manifest_changed()
+        ):
+            return self.load()
+        return self._files
+
+    def _manifest_changed(self) -> bool:
+        """
+        Check if the manifest file's modification time changed since it was loaded,
+        unless it was already checked less than `MANIFEST_CHECK_INTERVAL` seconds ago
+        :return: True if the manifest must be loaded again, False otherwise
+        """
+        now = time.monotonic()
+        if now < self._next_manifest_check:
+            return False
+        self._next_manifest_check = now + MANIFEST_CHECK_INTERVAL
+        return os.path.getmtime(self._config.manifest_json_path) != self._manifest_mtime
+
+    def load(self) -> InertiaFiles:
+        """
+        Resolve the Inertia files (CSS and JS) based on the configuration
+        :return: InertiaFiles object
+        """
+        if self._uses_manifest:
+            manifest_mtime = os.path.getmtime(self._config.manifest_json_path)
+            manifest = _read_manifest_file(self._config.manifest_json_path)
+            asset_manifest = manifest[
+                f"{self._config.root_directory}/{self._config.entrypoint_filename}"
+            ]
+            css_file_urls = asset_manifest.get("css", []) or []
+            js_file_url = asset_manifest["file"]
+            preload_links = self._get_preload_links(
+                manifest,
+                f"{self._config.root_directory}/{self._config.entrypoint_filename}",
+            )
+
+            files = InertiaFiles(
+                css_file_urls=tuple(
+                    os.path.join("/", self._config.assets_prefix, file)
+                    for file in css_file_urls
+                ),
+                js_file_url=os.path.join("/", self._config.assets_prefix, js_file_url),
+                preload_links=preload_links,
+                link_header=", ".join(preload_links),
+            )
+            self._manifest_mtime = manifest_mtime
+        else:
+            js_file_url = f"{self._config.dev_url}/{self._config.root_directory}/{self._config.entrypoint_filename}"
+            files = InertiaFiles(css_file_urls=(), js_file_url=js_file_url)
+
+        self._files = files
+        return files
+
+    def _get_preload_links(
+        self, manifest: Dict[str, Any], entrypoint: str
+    ) -> Tuple[str, ...]:
+        """
+        Get the Link header values preloading the entrypoint chunk, the chunks it
+        statically imports, and their CSS files
+        :param manifest: The manifest
+        :param entrypoint: The manifest key of the entrypoint
+        :return: The Link header values
+        """
+        scripts: List[str] = []
+        styles: List[str] = []
+        chunks = [entrypoint]
+        seen = {entrypoint}
+        while chunks:
+            chunk = manifest[chunks.pop(0)]
+            scripts.append(chunk["file"])
+            styles.extend(
+                file for file in chunk.get("css", []) or [] if file not in styles
+            )
+            for imported in chunk.get("imports", []) or []:
+                if imported not in seen:
+                    seen.add(imported)
+                    chunks.append(imported)
+
+        return tuple(
+            f"<{os.path.join('/', self._config.assets_prefix, file)}>; rel=modulepreload"
+            for file in scripts
+        ) + tuple(
+            f"<{os.path.join('/', self._config.assets_prefix, file)}>; rel=preload; as=style"
+            for file in styles
+        )
@@ -0,0 +1,163 @@
+import time
+from collections import deque
+from typing import Callable, Deque, Literal, TypedDict
+
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+class CircuitBreakerStats(TypedDict):
+    """
+    Circuit breaker metrics
+    """
+
+    state: CircuitState
+    consecutive_failures: int
+    failure_rate: float
+    calls_in_window: int
+    times_opened: int
+    rejected_calls: int
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker around the calls to the SSR server.
+
+    The circuit opens after `failure_threshold` consecutive failures, or when the
+    failure rate over the last `window_size` calls reaches `failure_rate_threshold`
+    (once at least `minimum_calls` calls were made). While open, SSR is skipped and
+    pages are rendered client-side straight away. After `reset_timeout` seconds,
+    the circuit is half-open: up to `half_open_max_calls` probe calls are let
+    through, and the circuit closes again if they succeed, or re-opens otherwise.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        failure_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        minimum_calls: int = 10,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Constructor
+        :param failure_threshold: Number of consecutive failures opening the circuit
+        :param failure_rate_threshold: Failure rate (between 0 and 1) opening the circuit
+        :param window_size: Number of calls over which the failure rate is computed
+        :param minimum_calls: Minimum number of calls before the failure rate is used
+        :param reset_timeout: Time, in seconds, after which an open circuit is half-open
+        :param half_open_max_calls: Number of probe calls let through when half-open
+        :param clock: Monotonic clock, in seconds
+        """
+        self.failure_threshold = failure_threshold
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._state: CircuitState = "closed"
+        self._window: Deque[bool] = deque(maxlen=window_size)
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._times_opened = 0
+        self._rejected_calls = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """
+        Get the state of the circuit, an open circuit being half-open once
+        the reset timeout has elapsed
+        :return: The state of the circuit
+        """
+        if (
+            self._state == "open"
+            and self._clock() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = "half_open"
+            self._half_open_calls = 0
+        return self._state
+
+    @property
+    def failure_rate(self) -> float:
+        """
+        Get the failure rate over the calls in the window
+        :return: The failure rate, between 0 and 1
+        """
+        if not self._window:
+            return 0.0
+        return sum(self._window) / len(self._window)
+
+    def allow_request(self) -> bool:
+        """
+        Check if a call can be made, counting it as a probe when half-open
+        :return: True if the call can be made, False otherwise
+        """
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return True
+        self._rejected_calls += 1
+        return False
+
+    def record_success(self) -> None:
+        """
+        Record a successful call
+        """
+        self._consecutive_failures = 0
+        if self._state == "half_open":
+            self._state = "closed"
+            self._window.clear()
+        self._window.append(False)
+
+    def record_cancellation(self) -> None:
+        """
+        Record a call given up before it completed. It counts neither as a success
+        nor as a failure, and frees its probe slot when half-open
+        """
+        if self._state == "half_open" and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def record_failure(self) -> None:
+        """
+        Record a failed call
+        """
+        self._consecutive_failures += 1
+        self._window.append(True)
+        if self._state == "half_open" or (
+            self._state == "closed"
+            and (
+                self._consecutive_failures >= self.failure_threshold
+                or (
+                    len(self._window) >= self.minimum_calls
+                    and self.failure_rate >= self.failure_rate_threshold
+                )
+            )
+        ):
+            self._open()
+
+    def stats(self) -> CircuitBreakerStats:
+        """
+        Get the circuit breaker metrics
+        :return: The metrics
+        """
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "failure_rate": self.failure_rate,
+            "calls_in_window": len(self._window),
+            "times_opened": self._times_opened,
+            "rejected_calls": self._rejected_calls,
+        }
+
+    def _open(self) -> None:
+        """
+        Open the circuit
+        """
+        self._state = "open"
+        self._opened_at = self._clock()
+        self._times_opened += 1
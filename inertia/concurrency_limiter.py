@@ -0,0 +1,109 @@
+import asyncio
+from collections import deque
+from typing import Deque, Optional, TypedDict
+
+from .exceptions import SSRUnavailableException
+
+
+class ConcurrencyLimiterStats(TypedDict):
+    """
+    Concurrency limiter metrics
+    """
+
+    active: int
+    queued: int
+    admitted: int
+    shed_queue_full: int
+    shed_timeout: int
+
+
+class ConcurrencyLimiter:
+    """
+    Limit of the concurrent calls to the SSR server.
+
+    Up to `max_concurrency` calls run at once. Further calls wait in a queue of up to
+    `max_queue` calls, for at most `max_wait` seconds. When the queue is full or
+    the wait is too long, the call is shed: SSR is skipped and the page is rendered
+    client-side, instead of piling up renders on an overloaded SSR server.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 32,
+        max_queue: int = 64,
+        max_wait: Optional[float] = 0.1,
+    ) -> None:
+        """
+        Constructor
+        :param max_concurrency: Maximum number of concurrent calls
+        :param max_queue: Maximum number of calls waiting for a slot
+        :param max_wait: Maximum time, in seconds, a call waits for a slot,
+            None to wait until one is free
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._active = 0
+        self._waiters: "Deque[asyncio.Future[None]]" = deque()
+        self._admitted = 0
+        self._shed_queue_full = 0
+        self._shed_timeout = 0
+
+    async def acquire(self) -> None:
+        """
+        Acquire a slot, waiting in the queue if none is free
+        :raises SSRUnavailableException: If the call is shed
+        """
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            self._admitted += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self._shed_queue_full += 1
+            raise SSRUnavailableException("The SSR queue is full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            # The slot may have been handed over right before the timeout: keep it
+            if not waiter.done() or waiter.cancelled():
+                self._shed_timeout += 1
+                raise SSRUnavailableException(
+                    f"No SSR slot was free within {self.max_wait}s"
+                ) from None
+        except asyncio.CancelledError:
+            # The slot may have been handed over right before the cancellation
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        self._admitted += 1
+
+    def release(self) -> None:
+        """
+        Release a slot, handing it over to the first call waiting in the queue
+        """
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def stats(self) -> ConcurrencyLimiterStats:
+        """
+        Get the concurrency limiter metrics
+        :return: The metrics
+        """
+        return {
+            "active": self._active,
+            "queued": len(self._waiters),
+            "admitted": self._admitted,
+            "shed_queue_full": self._shed_queue_full,
+            "shed_timeout": self._shed_timeout,
+        }
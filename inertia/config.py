@@ -1,8 +1,17 @@
-from typing import Literal, Type, Dict, Any
+from typing import Literal, Optional, Type, Dict, Any, List, Sequence, Tuple, Union
 from json import JSONEncoder
+from concurrent.futures import ThreadPoolExecutor
 
 from fastapi.templating import Jinja2Templates
 from .utils import InertiaJsonEncoder
+from .circuit_breaker import CircuitBreaker
+from .concurrency_limiter import ConcurrencyLimiter
+from .ssr import SSRClient
+from .ssr_cache import SSRCacheBackend
+from .ssr_policy import SSRPolicy
+from .ssr_transports import SSRTransport
+from .assets import InertiaAssets
+from .serializers import JsonSerializer, default_json_serializer
 from dataclasses import dataclass, field
 
 
@@ -16,10 +25,32 @@ class InertiaConfig:
     environment: Literal["development", "production"] = "development"
     version: str = "1.0"
     json_encoder: Type[JSONEncoder] = InertiaJsonEncoder
+    json_serializer: Optional[JsonSerializer] = None
     dev_url: str = "http://localhost:5173"
-    ssr_url: str = "http://localhost:13714"
+    ssr_url: Union[str, List[str]] = "http://localhost:13714"
     ssr_enabled: bool = False
+    ssr_timeout: float = 5.0
+    ssr_max_connections: int = 100
+    ssr_max_keepalive_connections: int = 20
+    ssr_keepalive_expiry: float = 5.0
+    ssr_gzip_min_size: Optional[int] = None
+    ssr_transport: Optional[SSRTransport] = None
+    ssr_hedge_percentile: Optional[float] = None
+    ssr_max_hedge_rate: float = 0.1
+    ssr_circuit_breaker: Optional[CircuitBreaker] = None
+    ssr_concurrency_limiter: Optional[ConcurrencyLimiter] = None
+    ssr_cache: Optional[SSRCacheBackend] = None
+    ssr_single_flight: bool = False
+    ssr_deadline: Optional[float] = None
+    ssr_deadline_background: bool = False
+    ssr_warmup_pages: Sequence[Tuple[str, Dict[str, Any]]] = ()
+    ssr_health_check_interval: Optional[float] = None
+    ssr_policy: Optional[SSRPolicy] = None
+    stream_html: bool = False
+    preload_links: bool = False
+    early_hints: bool = False
     manifest_json_path: str = ""
+    manifest_auto_reload: bool = False
     root_directory: str = "src"
     root_template_filename: str = "index.html"
     entrypoint_filename: str = "main.js"
@@ -29,3 +60,36 @@ class InertiaConfig:
     flash_error_key: str = "errors"
     assets_prefix: str = ""
     extra_template_context: Dict[str, Any] = field(default_factory=dict)
+    concurrent_props: bool = False
+    props_max_concurrency: Optional[int] = None
+    offload_sync_props: bool = False
+    sync_props_max_workers: Optional[int] = None
+    slow_sync_prop_threshold: Optional[float] = 0.1
+    ssr_client: SSRClient = field(init=False, repr=False, compare=False)
+    assets: InertiaAssets = field(init=False, repr=False, compare=False)
+    props_executor: Optional[ThreadPoolExecutor] = field(
+        init=False, repr=False, compare=False
+    )
+    serializer: JsonSerializer = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.ssr_client = SSRClient(self)
+        self.assets = InertiaAssets(self)
+        self.props_executor = self._create_props_executor()
+        self.serializer = (
+            self.json_serializer
+            if self.json_serializer is not None
+            else default_json_serializer(self.json_encoder)
+        )
+
+    def _create_props_executor(self) -> Optional[ThreadPoolExecutor]:
+        """
+        Create the thread pool in which synchronous props are called
+        :return: The thread pool, or None if `offload_sync_props` is disabled
+        """
+        if not self.offload_sync_props:
+            return None
+        return ThreadPoolExecutor(
+            max_workers=self.sync_props_max_workers,
+            thread_name_prefix="inertia-props",
+        )
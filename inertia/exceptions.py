@@ -18,6 +18,34 @@ class InertiaVersionConflictException(Exception):
         super().__init__()
 
 
+class SSRUnavailableException(Exception):
+    """
+    Exception raised when SSR is skipped because the SSR server is known to be
+    unavailable. The page is then rendered client-side.
+    """
+
+
+class SSRDeadlineExceededException(SSRUnavailableException):
+    """
+    Exception raised when the SSR server did not answer within the SSR deadline.
+    The page is then rendered client-side.
+    """
+
+
+class SSRBatchUnsupportedException(Exception):
+    """
+    Exception raised by an SSR transport which cannot render several pages at once
+    (see `SSRTransport.render_batch`). The pages are then rendered one by one.
+    """
+
+
+class SSRRenderException(Exception):
+    """
+    Exception raised when the SSR renderer reports it could not render a page
+    of a batch (see `SSRClient.render_batch`)
+    """
+
+
 async def inertia_version_conflict_exception_handler(
     _: Request, exc: InertiaVersionConflictException
 ) -> Response:
@@ -1,32 +1,36 @@
 import logging
-import os
+from contextlib import asynccontextmanager
 
+import fastapi
 from fastapi import Depends, Request, Response, status
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, HTMLResponse, StreamingResponse
 from collections import defaultdict
 from typing import (
     Annotated,
     Any,
-    AsyncGenerator,
+    AsyncIterator,
     Callable,
     Dict,
     List,
+    Optional,
+    Tuple,
     TypeVar,
     TypedDict,
     Union,
     cast,
 )
-import json
 from pydantic import BaseModel
 from starlette.responses import RedirectResponse
-from jinja2.utils import htmlsafe_json_dumps
 
-from .templating import InertiaExtension
+from .templating import BODY_MARKER, HEAD_MARKER, InertiaExtension
 from .config import InertiaConfig
-from .utils import InertiaContext, _read_manifest_file
-from .exceptions import InertiaVersionConflictException
+from .utils import InertiaContext, InertiaJsonEncoder, htmlsafe_json
+from .assets import InertiaFiles
+from .exceptions import InertiaVersionConflictException, SSRUnavailableException
 from .utils import DeferredProp, IgnoreOnFirstLoadProp
-from dataclasses import dataclass
+from .props import PropResolver
+from .ssr import SSRResult
 
 
 try:
@@ -36,10 +40,25 @@ except (ModuleNotFoundError, ImportError):
 
 logger = logging.getLogger(__name__)
 
-InertiaResponse = Union[HTMLResponse, JSONResponse]
+InertiaResponse = Union[HTMLResponse, JSONResponse, StreamingResponse]
 
 T = TypeVar("T")
 
+# Before FastAPI 0.118.0, the exit code of the dependencies using yield runs
+# before the body of a streaming response is sent
+_DEPENDENCIES_OUTLIVE_STREAM = tuple(
+    int(part) for part in fastapi.__version__.split(".")[:2]
+) >= (0, 118)
+
+
+class _EncodedJSONResponse(JSONResponse):
+    """
+    JSONResponse whose content is already encoded by the configured serializer
+    """
+
+    def render(self, content: Any) -> bytes:
+        return cast(bytes, content)
+
 
 class FlashMessage(TypedDict):
     """
@@ -58,15 +77,6 @@ class Inertia:
     to pass the configuration to the Inertia class
     """
 
-    @dataclass
-    class InertiaFiles:
-        """
-        Helper class to store the CSS and JS file urls for Inertia.js
-        """
-
-        css_file_urls: List[str]
-        js_file_url: str
-
     _request: Request
     _component: str
     _props: dict[str, Any]
@@ -90,7 +100,7 @@ class Inertia:
         self._props = {}
         self._config = config_
         self._client = client
-        self._set_inertia_files()
+        self._inertia_files = config_.assets.files
 
         if self._is_stale:
             raise InertiaVersionConflictException(url=str(request.url))
@@ -175,95 +185,40 @@ class Inertia:
             else {}
         )
 
-    @staticmethod
-    def _assert_httpx_is_installed() -> None:
-        """
-        Assert that httpx is installed
-        :raises ImportError: If httpx is not installed
-        """
-        if not httpx:
-            raise ImportError("You need to install httpx to use Inertia in SSR mode")
-
-    def _set_inertia_files(self) -> None:
-        """
-        Set the Inertia files (CSS and JS) based on the configuration
-        """
-        if self._config.environment == "production" or self._config.ssr_enabled:
-            manifest = _read_manifest_file(self._config.manifest_json_path)
-            asset_manifest = manifest[
-                f"{self._config.root_directory}/{self._config.entrypoint_filename}"
-            ]
-            css_file_urls = asset_manifest.get("css", []) or []
-            js_file_url = asset_manifest["file"]
-
-            self._inertia_files = self.InertiaFiles(
-                css_file_urls=[
-                    os.path.join("/", self._config.assets_prefix, file)
-                    for file in css_file_urls
-                ],
-                js_file_url=os.path.join("/", self._config.assets_prefix, js_file_url),
-            )
-        else:
-            js_file_url = f"{self._config.dev_url}/{self._config.root_directory}/{self._config.entrypoint_filename}"
-            self._inertia_files = self.InertiaFiles(
-                css_file_urls=[], js_file_url=js_file_url
-            )
-
-    @classmethod
-    async def _deep_transform_callables(
-        cls,
-        prop: Union[
-            Callable[..., Any],
-            Dict[str, Any],
-            BaseModel,
-            List[BaseModel],
-            List[Any],
-            Any,
-        ],
-    ) -> Any:
-        """
-        Deeply transform callables in a dictionary, evaluating them if they are callables
-        If the value is a BaseModel, it will call the model_dump method.
-        Recursive function
-
-        :param prop: Property to transform
-        :return: Transformed property
-        """
-        if not isinstance(prop, dict):
-            if callable(prop):
-                result = prop()
-                if hasattr(result, "__await__"):
-                    result = await result
-                return await cls._deep_transform_callables(result)
-            if isinstance(prop, BaseModel):
-                return json.loads(prop.model_dump_json())
-            if isinstance(prop, list):
-                return [await cls._deep_transform_callables(p) for p in prop]
-            return prop
-
-        prop_ = prop.copy()
-        for key in list(prop_.keys()):
-            prop_[key] = await cls._deep_transform_callables(prop_[key])
-
-        return prop_
-
     async def _build_props(self) -> Union[Dict[str, Any], Any]:
         """
         Build the props for the page.
         If the request is a partial render, it will only include the partial keys
         :return: A dictionary with the props
         """
-        _props = self._props.copy()
-
-        for key in list(_props.keys()):
-            if self._is_a_partial_render:
-                if key not in self._partial_keys:
-                    del _props[key]
-            else:
-                if isinstance(_props[key], IgnoreOnFirstLoadProp):
-                    del _props[key]
-
-        return await self._deep_transform_callables(_props)
+        if self._is_a_partial_render:
+            partial_keys = self._partial_keys
+            _props = {
+                key: prop for key, prop in self._props.items() if key in partial_keys
+            }
+        else:
+            _props = {
+                key: prop
+                for key, prop in self._props.items()
+                if not isinstance(prop, IgnoreOnFirstLoadProp)
+            }
+
+        resolver = PropResolver(
+            concurrent=self._config.concurrent_props,
+            max_concurrency=self._config.props_max_concurrency,
+            executor=self._config.props_executor,
+            slow_call_threshold=(
+                self._config.slow_sync_prop_threshold
+                if self._config.environment == "development"
+                else None
+            ),
+            encoder=(
+                jsonable_encoder
+                if self._config.json_encoder is InertiaJsonEncoder
+                else None
+            ),
+        )
+        return await resolver.resolve(_props)
 
     def _build_deferred_props(self) -> Union[Dict[str, List[str]], None]:
         """
@@ -283,31 +238,82 @@ class Inertia:
 
         return _deferred_props
 
-    async def _render_ssr(self) -> HTMLResponse:
+    def _should_render_ssr(self, ssr: Optional[bool]) -> bool:
         """
-        Render the page using SSR, calling the Inertia SSR server.
-        :return: The HTML response
+        Check if the page should be rendered server-side
+        :param ssr: The per-render decision, None to ask the SSR policy
+        :return: True if the page should be rendered server-side, False otherwise
         """
-        self._assert_httpx_is_installed()
-        data = json.dumps(await self._get_page_data(), cls=self._config.json_encoder)
-        request_kwargs: Dict[str, Any] = {
-            "url": f"{self._config.ssr_url}/render",
-            "json": data,
-            "headers": {"Content-Type": "application/json"},
-        }
+        if not self._config.ssr_enabled:
+            return False
+        if ssr is not None:
+            return ssr
 
-        if self._client is None:
-            raise ValueError("httpx client is not available")
+        policy = self._config.ssr_policy
+        if policy is None or policy.should_render(
+            self._request, self._component, self._config
+        ):
+            return True
+        logger.debug(f"Skipping SSR of {self._component} (declined by the SSR policy)")
+        return False
 
-        response = await self._client.post(**request_kwargs)
+    async def _get_ssr_result(
+        self,
+        page_json: bytes,
+        ssr: Optional[bool],
+        cacheable: bool,
+        deadline: Optional[float],
+    ) -> Optional[SSRResult]:
+        """
+        Render the page using SSR, calling the Inertia SSR server, if it should be.
+        If an error occurs, the page is to be rendered client-side
+        :param page_json: The serialized page data
+        :param ssr: The per-render SSR decision, None to ask the SSR policy
+        :param cacheable: Whether the SSR result can be cached
+        :param deadline: Time, in seconds, the SSR result is waited for
+        :return: The SSR result, None to render the page client-side
+        """
+        if not self._should_render_ssr(ssr):
+            return None
 
-        response.raise_for_status()
-        response_json = response.json()
+        try:
+            return await self._config.ssr_client.render(
+                page_json,
+                self._client,
+                cacheable=cacheable,
+                deadline=deadline
+                if deadline is not None
+                else self._config.ssr_deadline,
+                component=self._component,
+            )
+        except SSRUnavailableException as exc:
+            logger.debug(f"Skipping SSR (rendering client-side): {exc}")
+        except Exception as exc:
+            logger.error(
+                f"An error occurred in rendering SSR (falling back to classic rendering): {exc}"
+            )
+        return None
 
-        head = response_json["head"]
-        displayable_head = "\n".join(head)
-        body = response_json["body"]
+    async def _send_early_hints(self) -> None:
+        """
+        Send a 103 Early Hints response preloading the assets of the page, so that
+        the browser fetches them while the props are resolved.
+        Nothing is sent if the ASGI server does not support early hints
+        """
+        links = self._inertia_files.preload_links
+        if (
+            self._config.early_hints
+            and links
+            and hasattr(self._request, "send_early_hints")
+        ):
+            await self._request.send_early_hints(*links)
 
+    def _render_ssr(self, result: SSRResult) -> HTMLResponse:
+        """
+        Render the page using the template and the SSR result
+        :param result: The SSR result
+        :return: The HTML response
+        """
         return self._config.templates.TemplateResponse(
             name=self._config.root_template_filename,
             request=self._request,
@@ -316,8 +322,8 @@ class Inertia:
                     environment=self._config.environment,
                     dev_url=self._config.dev_url,
                     is_ssr=True,
-                    ssr_head=displayable_head,
-                    ssr_body=body,
+                    ssr_head=result.head,
+                    ssr_body=result.body,
                     js=self._inertia_files.js_file_url,
                     css=self._inertia_files.css_file_urls,
                 ),
@@ -329,14 +335,125 @@ class Inertia:
         Render the page using JSON
         :return: The JSON response
         """
-        return JSONResponse(
-            content=await self._get_page_data(),
+        return _EncodedJSONResponse(
+            content=self._config.serializer.dumps(await self._get_page_data()),
             headers={
                 "X-Inertia": "true",
                 "Vary": "Accept",
             },
         )
 
+    def _render_html(self, page_json: bytes) -> HTMLResponse:
+        """
+        Render the page using the template, the page data being rendered client-side
+        :param page_json: The serialized page data
+        :return: The HTML response
+        """
+        return self._config.templates.TemplateResponse(
+            name=self._config.root_template_filename,
+            request=self._request,
+            context={
+                "inertia": InertiaContext(
+                    environment=self._config.environment,
+                    dev_url=self._config.dev_url,
+                    is_ssr=False,
+                    data=htmlsafe_json(page_json),
+                    js=self._inertia_files.js_file_url,
+                    css=self._inertia_files.css_file_urls,
+                ),
+                **self._config.extra_template_context,
+            },
+        )
+
+    async def _render_stream(
+        self, ssr: Optional[bool], cacheable: bool, deadline: Optional[float]
+    ) -> StreamingResponse:
+        """
+        Stream the page: the template is sent up to the assets of the head right away,
+        and the rest once the props are resolved and the page is rendered.
+        When the dependencies using yield are closed before the response is sent
+        (FastAPI < 0.118.0), the props are resolved beforehand, as they may use them.
+        :param ssr: The per-render SSR decision, None to ask the SSR policy
+        :param cacheable: Whether the SSR result can be cached
+        :param deadline: Time, in seconds, the SSR result is waited for
+        :return: The streaming response
+        """
+        head, middle, tail = self._render_template_parts()
+        page_data = (
+            None if _DEPENDENCIES_OUTLIVE_STREAM else await self._get_page_data()
+        )
+
+        async def stream() -> AsyncIterator[str]:
+            yield head
+            try:
+                page_json = self._config.serializer.dumps(
+                    page_data if page_data is not None else await self._get_page_data()
+                )
+                result = await self._get_ssr_result(page_json, ssr, cacheable, deadline)
+            except Exception as exc:
+                # The response has started: close the document without the page
+                logger.error(f"An error occurred in rendering the streamed page: {exc}")
+                yield middle + tail
+                return
+
+            inertia = self._get_inertia_context(
+                is_ssr=result is not None,
+                data=None if result is not None else htmlsafe_json(page_json),
+                ssr_body=result.body if result is not None else None,
+            )
+            ssr_head = f"{result.head}\n" if result is not None else ""
+            yield ssr_head + middle + InertiaExtension.render_body(inertia) + tail
+
+        return StreamingResponse(
+            stream(),
+            media_type="text/html",
+            # Keep reverse proxies from buffering the head
+            headers={"X-Accel-Buffering": "no"},
+        )
+
+    def _render_template_parts(self) -> Tuple[str, str, str]:
+        """
+        Render the template split around the Inertia head and body, to stream it
+        :raises ValueError: If the template has no `inertia_head` or `inertia_body` tag
+        :return: The template up to the end of the Inertia head, between the Inertia
+            head and body, and after the Inertia body
+        """
+        templates = self._config.templates
+        context: Dict[str, Any] = {
+            "request": self._request,
+            "inertia": self._get_inertia_context(is_ssr=False, split=True),
+            **self._config.extra_template_context,
+        }
+        for context_processor in templates.context_processors:
+            context.update(context_processor(self._request))
+        html = templates.get_template(self._config.root_template_filename).render(
+            context
+        )
+
+        head, head_marker, rest = html.partition(HEAD_MARKER)
+        middle, body_marker, tail = rest.partition(BODY_MARKER)
+        if not head_marker or not body_marker:
+            raise ValueError(
+                "Streaming needs the inertia_head and inertia_body tags in the template"
+            )
+        return head, middle, tail
+
+    def _get_inertia_context(self, is_ssr: bool, **kwargs: Any) -> InertiaContext:
+        """
+        Get the Inertia context of the template
+        :param is_ssr: Whether the page is rendered server-side
+        :param kwargs: The other fields of the context
+        :return: The Inertia context
+        """
+        return InertiaContext(
+            environment=self._config.environment,
+            dev_url=self._config.dev_url,
+            is_ssr=is_ssr,
+            js=self._inertia_files.js_file_url,
+            css=self._inertia_files.css_file_urls,
+            **kwargs,
+        )
+
     def share(self, **props: Any) -> None:
         """
         Share props between functions. Useful to share props between dependencies/middlewares and routes
@@ -388,7 +505,14 @@ class Inertia:
         )
 
     async def render(
-        self, component: str, props: Union[Dict[str, Any], BaseModel, None] = None
+        self,
+        component: str,
+        props: Union[Dict[str, Any], BaseModel, None] = None,
+        *,
+        cache_ssr: bool = True,
+        ssr_deadline: Optional[float] = None,
+        ssr: Optional[bool] = None,
+        stream: Optional[bool] = None,
     ) -> InertiaResponse:
         """
         Render the page
@@ -397,6 +521,13 @@ class Inertia:
         If an error occurs, it will fall back to server-side template rendering
         :param component: The component name to render
         :param props: The props to pass to the component
+        :param cache_ssr: Whether the SSR result can be cached. Disable it for personalized pages
+        :param ssr_deadline: Time, in seconds, the SSR result is waited for before
+            rendering client-side. Defaults to the `ssr_deadline` of the config
+        :param ssr: Whether to render the page server-side, when SSR is enabled.
+            Defaults to the decision of the `ssr_policy` of the config
+        :param stream: Whether to stream the page, sending its head before the props
+            are resolved. Defaults to the `stream_html` of the config
         :return: InertiaResponse
         """
         if self._config.use_flash_messages:
@@ -415,40 +546,34 @@ class Inertia:
         if self._is_inertia_request:
             return await self._render_json()
 
-        if self._config.ssr_enabled:
-            try:
-                return await self._render_ssr()
-            except Exception as exc:
-                logger.error(
-                    f"An error occurred in rendering SSR (falling back to classic rendering): {exc}"
-                )
+        await self._send_early_hints()
 
-        # Fallback to server-side template rendering
-        page_data = await self._get_page_data()
-        json_string = json.dumps(page_data, cls=self._config.json_encoder)
-        page_json = htmlsafe_json_dumps(json_string)
-        return self._config.templates.TemplateResponse(
-            name=self._config.root_template_filename,
-            request=self._request,
-            context={
-                "inertia": InertiaContext(
-                    environment=self._config.environment,
-                    dev_url=self._config.dev_url,
-                    is_ssr=False,
-                    data=page_json,
-                    js=self._inertia_files.js_file_url,
-                    css=self._inertia_files.css_file_urls,
-                ),
-                **self._config.extra_template_context,
-            },
-        )
+        response: InertiaResponse
+        if stream if stream is not None else self._config.stream_html:
+            response = await self._render_stream(ssr, cache_ssr, ssr_deadline)
+        else:
+            page_json = self._config.serializer.dumps(await self._get_page_data())
+            result = await self._get_ssr_result(page_json, ssr, cache_ssr, ssr_deadline)
+            # Fallback to server-side template rendering
+            response = (
+                self._render_ssr(result)
+                if result is not None
+                else self._render_html(page_json)
+            )
 
+        if self._config.preload_links and self._inertia_files.link_header:
+            response.headers["Link"] = self._inertia_files.link_header
+        return response
 
-async def get_httpx_client() -> AsyncGenerator[Union[None, "httpx.AsyncClient"], None]:
-    if not httpx:
-        yield None
-    async with httpx.AsyncClient() as client:
-        yield client
+
+def get_httpx_client() -> Union[None, "httpx.AsyncClient"]:
+    """
+    Per-request httpx client used for SSR.
+    Returns None, so that the application-lifetime client owned by the
+    InertiaConfig is used. Override this dependency to provide your own client.
+    :return: None
+    """
+    return None
 
 
 HttpxClientDep = Annotated[Union["httpx.AsyncClient", None], Depends(get_httpx_client)]
@@ -464,6 +589,7 @@ def inertia_dependency_factory(
     """
 
     config_.templates.env.add_extension(InertiaExtension)
+    config_.assets.load()
 
     def inertia_dependency(request: Request, client: HttpxClientDep) -> Inertia:
         """
@@ -475,3 +601,34 @@ def inertia_dependency_factory(
         return Inertia(request, config_, client)
 
     return inertia_dependency
+
+
+@asynccontextmanager
+async def inertia_lifespan(config_: InertiaConfig) -> AsyncIterator[None]:
+    """
+    Lifespan hook for the resources Inertia keeps for the application lifetime,
+    such as the SSR client connection pool, the renderers of an SSRSupervisor
+    or the thread pool of the synchronous props.
+    When SSR is enabled, it also renders the SSR warm-up pages before the application
+    starts serving requests, and runs the SSR health probe.
+    Use it inside your FastAPI lifespan:
+
+        @asynccontextmanager
+        async def lifespan(app: FastAPI):
+            async with inertia_lifespan(inertia_config):
+                yield
+
+    :param config_: InertiaConfig object
+    """
+    if config_.ssr_enabled:
+        await config_.ssr_client.start()
+    try:
+        yield
+    finally:
+        await config_.ssr_client.aclose()
+        if config_.ssr_cache is not None:
+            await config_.ssr_cache.aclose()
+        if config_.props_executor is not None:
+            config_.props_executor.shutdown(wait=False)
+            # Its threads are only started on use, so the config can be reused
+            config_.props_executor = config_._create_props_executor()
@@ -0,0 +1,310 @@
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple, TypedDict
+
+from starlette.applications import Starlette
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import InertiaConfig
+
+try:
+    import httpx
+except (ModuleNotFoundError, ImportError):
+    httpx = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "prerender.json"
+
+
+class PrerenderedPage(TypedDict):
+    """
+    Files of a prerendered page, relative to the export directory
+    """
+
+    html: str
+    json: str
+
+
+class PrerenderManifest(TypedDict):
+    """
+    Index of the prerendered pages, by path
+    """
+
+    version: str
+    pages: Dict[str, PrerenderedPage]
+
+
+async def prerender(
+    app: Starlette,
+    paths: Sequence[str],
+    directory: str,
+    base_url: str,
+) -> PrerenderManifest:
+    """
+    Render pages through the application, in-process, and write their HTML and
+    Inertia page object to the directory, along with a manifest.
+    The application lifespan runs during the export, so SSR is used when enabled.
+    Only render pages that are identical for every visitor.
+    :param app: The FastAPI application
+    :param paths: Paths of the pages, e.g. "/about"
+    :param directory: Directory the pages are written to
+    :param base_url: Public URL of the application, e.g. "https://example.com".
+        The page objects embed the URL of the page, so it must be the one of the site
+    :raises ValueError: If a path has a query string, or a page is not rendered
+        or has a different asset version
+    :return: The manifest of the prerendered pages
+    """
+    if httpx is None:
+        raise ImportError(
+            "You need to install httpx to prerender pages: `pip install httpx`"
+        )
+
+    manifest: Optional[PrerenderManifest] = None
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url=base_url) as client:
+            for path in paths:
+                html, page = await _render(client, path)
+                version = str(page["version"])
+                if manifest is None:
+                    manifest = {"version": version, "pages": {}}
+                elif version != manifest["version"]:
+                    raise ValueError(
+                        f"{path} was rendered with version {version}, "
+                        f"instead of {manifest['version']}"
+                    )
+                manifest["pages"][path] = _write_page(directory, path, html, page)
+                logger.info(f"Prerendered {path}")
+
+    if manifest is None:
+        raise ValueError("No page to prerender")
+    _write_file(directory, MANIFEST_FILENAME, json.dumps(manifest).encode())
+    return manifest
+
+
+async def _render(
+    client: "httpx.AsyncClient", path: str
+) -> Tuple[bytes, Dict[str, object]]:
+    """
+    Render a page, both as HTML and as an Inertia page object
+    :param client: httpx client sending requests to the application
+    :param path: Path of the page
+    :raises ValueError: If the path has a query string or the page is not rendered
+    :return: The HTML and the page object
+    """
+    if "?" in path:
+        raise ValueError(f"Cannot prerender {path}: query strings are not supported")
+
+    html_response = await client.get(path)
+    json_response = await client.get(
+        path, headers={"X-Inertia": "true", "Accept": "application/json"}
+    )
+    for response in (html_response, json_response):
+        if response.status_code != 200:
+            raise ValueError(
+                f"Cannot prerender {path}: got a {response.status_code} response"
+            )
+    if json_response.headers.get("X-Inertia") != "true":
+        raise ValueError(f"Cannot prerender {path}: not an Inertia page")
+    return html_response.content, json_response.json()
+
+
+def _write_page(
+    directory: str, path: str, html: bytes, page: Dict[str, object]
+) -> PrerenderedPage:
+    """
+    Write the files of a prerendered page, e.g. "blog/index.html" and
+    "blog/index.json" for "/blog"
+    :param directory: Directory the page is written to
+    :param path: Path of the page
+    :param html: The HTML of the page
+    :param page: The page object of the page
+    :return: The files of the page
+    """
+    stem = "/".join(part for part in path.split("/") if part not in ("", ".", ".."))
+    stem = f"{stem}/index" if stem else "index"
+    files: PrerenderedPage = {"html": f"{stem}.html", "json": f"{stem}.json"}
+    _write_file(directory, files["html"], html)
+    _write_file(directory, files["json"], json.dumps(page).encode())
+    return files
+
+
+def _write_file(directory: str, filename: str, content: bytes) -> None:
+    """
+    Write a file atomically, so that it is never served half-written
+    :param directory: The export directory
+    :param filename: Path of the file, relative to the directory
+    :param content: Content of the file
+    """
+    path = os.path.join(directory, filename)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.tmp", "wb") as file:
+        file.write(content)
+    os.replace(f"{path}.tmp", path)
+
+
+class PrerenderMiddleware:
+    """
+    ASGI middleware serving the pages exported by `prerender`, without running
+    the application.
+    The prerendered pages are ignored once their version differs from the `version`
+    of the config, and the manifest is reloaded when the pages are exported again.
+    Partial reloads, requests with a query string and, when flash messages or errors
+    are enabled, requests whose session holds some are passed to the application.
+    """
+
+    def __init__(self, app: ASGIApp, config: InertiaConfig, directory: str) -> None:
+        """
+        Constructor
+        :param app: The ASGI application
+        :param config: InertiaConfig object
+        :param directory: Directory the pages were exported to
+        """
+        self.app = app
+        self.config = config
+        self.directory = directory
+        self._manifest: Optional[PrerenderManifest] = None
+        self._manifest_mtime: Optional[float] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        page = await self._get_page(scope)
+        if page is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if "X-Inertia" not in headers:
+            response = FileResponse(
+                os.path.join(self.directory, page["html"]),
+                media_type="text/html; charset=utf-8",
+            )
+        elif (
+            headers.get("X-Inertia-Version", self.config.version) != self.config.version
+            or "X-Inertia-Partial-Data" in headers
+            or "X-Inertia-Partial-Except" in headers
+        ):
+            await self.app(scope, receive, send)
+            return
+        else:
+            response = FileResponse(
+                os.path.join(self.directory, page["json"]),
+                media_type="application/json",
+                headers={"X-Inertia": "true", "Vary": "Accept"},
+            )
+        await response(scope, receive, send)
+
+    async def _get_page(self, scope: Scope) -> Optional[PrerenderedPage]:
+        """
+        Get the prerendered page matching the request, if any
+        :param scope: The ASGI scope of the request
+        :return: The prerendered page, None if there is none or it is stale
+        """
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("GET", "HEAD")
+            or scope["query_string"]
+            or self._may_have_flashed_data(scope)
+        ):
+            return None
+
+        manifest = await asyncio.to_thread(self._load_manifest)
+        if manifest is None or manifest["version"] != self.config.version:
+            return None
+        return manifest["pages"].get(scope["path"])
+
+    def _may_have_flashed_data(self, scope: Scope) -> bool:
+        """
+        Check if the request may have flashed messages or errors to show, which the
+        prerendered pages do not hold. Without a session in the scope, it cannot
+        be ruled out.
+        :param scope: The ASGI scope of the request
+        :return: True if the page must be rendered by the application
+        """
+        keys = [
+            key
+            for key, enabled in (
+                ("_messages", self.config.use_flash_messages),
+                ("_errors", self.config.use_flash_errors),
+            )
+            if enabled
+        ]
+        if not keys:
+            return False
+        if "session" not in scope:
+            return True
+        return any(key in scope["session"] for key in keys)
+
+    def _load_manifest(self) -> Optional[PrerenderManifest]:
+        """
+        Load the manifest, unless it did not change since it was last loaded.
+        It blocks on the file system, so it is called in a worker thread.
+        :return: The manifest, None if no page was exported
+        """
+        path = os.path.join(self.directory, MANIFEST_FILENAME)
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            self._manifest = self._manifest_mtime = None
+            return None
+
+        if mtime != self._manifest_mtime:
+            with open(path, "rb") as file:
+                self._manifest = json.loads(file.read())
+            self._manifest_mtime = mtime
+        return self._manifest
+
+
+def _import_app(import_path: str) -> Starlette:
+    """
+    Import the application from a "module:attribute" path
+    :param import_path: Import path of the application, e.g. "main:app"
+    :return: The application
+    """
+    module_name, _, attribute = import_path.partition(":")
+    app: Starlette = getattr(importlib.import_module(module_name), attribute or "app")
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Command line entry point: python -m inertia.prerender main:app / /about -o dist
+    :param argv: Command line arguments, defaults to sys.argv
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m inertia.prerender",
+        description="Prerender Inertia pages that are identical for every visitor",
+    )
+    parser.add_argument("app", help='Import path of the application, e.g. "main:app"')
+    parser.add_argument("paths", nargs="+", help='Paths of the pages, e.g. "/about"')
+    parser.add_argument(
+        "-o", "--output", required=True, help="Directory the pages are written to"
+    )
+    parser.add_argument(
+        "--base-url",
+        required=True,
+        help='Public URL of the application, e.g. "https://example.com"',
+    )
+    arguments = parser.parse_args(argv)
+
+    sys.path.insert(0, os.getcwd())
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(
+        prerender(
+            _import_app(arguments.app),
+            arguments.paths,
+            arguments.output,
+            arguments.base_url,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
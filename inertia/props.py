@@ -0,0 +1,273 @@
+import asyncio
+import contextvars
+import inspect
+import logging
+import time
+from concurrent.futures import Executor
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
+
+from pydantic import BaseModel, TypeAdapter
+
+from .utils import IgnoreOnFirstLoadProp, InlineProp
+
+logger = logging.getLogger(__name__)
+
+_JSON_PRIMITIVES = frozenset({str, int, float, bool, type(None)})
+
+_Slot = Tuple[Union[Dict[Any, Any], List[Any]], Any, "asyncio.Future[Any]"]
+
+
+class PropResolver:
+    """
+    Resolve the props of a page: callables (sync or async) are evaluated,
+    and BaseModels are dumped, at any depth of the props tree.
+    BaseModels are dumped by pydantic-core straight to JSON compatible values, and
+    lists of BaseModels of a same type are dumped in a single call.
+
+    By default, callables are evaluated one after another. In concurrent mode,
+    every callable of the tree is scheduled as a task, optionally limited by
+    `max_concurrency`, and the results are put back at their place in the tree.
+    If several callables fail, the error of the first one (in props order) is raised.
+
+    If an `encoder` is given, the values and dict keys which are not JSON primitives
+    are encoded with it while the tree is resolved, so that the resolved tree can be
+    serialized without walking it again.
+
+    If an `executor` is given, synchronous callables (except inline ones) are
+    called in it instead of on the event loop. If a `slow_call_threshold` is given,
+    synchronous callables holding the event loop for longer are logged.
+    """
+
+    _concurrent: bool
+    _semaphore: Optional[asyncio.Semaphore]
+    _executor: Optional[Executor]
+    _slow_call_threshold: Optional[float]
+    _encoder: Optional[Callable[[Any], Any]]
+
+    def __init__(
+        self,
+        concurrent: bool = False,
+        max_concurrency: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        slow_call_threshold: Optional[float] = None,
+        encoder: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        """
+        Constructor
+        :param concurrent: Whether to evaluate the callables concurrently
+        :param max_concurrency: Maximum number of callables evaluated at the same time
+        :param executor: Executor in which synchronous callables are called
+        :param slow_call_threshold: Duration (in seconds) above which a synchronous
+        callable holding the event loop is logged
+        :param encoder: Function encoding the values which are not JSON primitives
+        """
+        self._concurrent = concurrent
+        self._semaphore = (
+            asyncio.Semaphore(max_concurrency)
+            if concurrent and max_concurrency
+            else None
+        )
+        self._executor = executor
+        self._slow_call_threshold = slow_call_threshold
+        self._encoder = encoder
+
+    async def resolve(self, prop: Any) -> Any:
+        """
+        Deeply resolve a property
+        :param prop: Property to resolve
+        :return: Resolved property
+        """
+        if callable(prop):
+            return await self._resolve_callable(prop)
+        if not self._concurrent:
+            return await self._resolve_sequentially(prop)
+
+        slots: List[_Slot] = []
+        resolved = self._schedule(prop, slots)
+        if slots:
+            results = await asyncio.gather(
+                *(task for _, _, task in slots), return_exceptions=True
+            )
+            for (container, key, _), result in zip(slots, results):
+                if isinstance(result, BaseException):
+                    raise result
+                container[key] = result
+
+        return resolved
+
+    async def _call(self, prop: Callable[[], Any]) -> Any:
+        """
+        Call a property, awaiting its result if needed.
+        Synchronous callables are called in the executor, if any.
+        :param prop: Property to call
+        :return: Result of the call
+        """
+        if isinstance(prop, IgnoreOnFirstLoadProp) and callable(prop.prop):
+            # Call the wrapped callable itself, so that it is offloaded if synchronous
+            prop = prop.prop
+
+        if (
+            self._executor is None
+            or isinstance(prop, InlineProp)
+            or _is_async_callable(prop)
+        ):
+            result = self._call_on_loop(prop)
+        else:
+            context = contextvars.copy_context()
+            result = await asyncio.get_running_loop().run_in_executor(
+                self._executor, context.run, prop
+            )
+
+        if hasattr(result, "__await__"):
+            result = await result
+        return result
+
+    def _call_on_loop(self, prop: Callable[[], Any]) -> Any:
+        """
+        Call a property on the event loop, logging it if it holds the loop
+        for longer than the slow call threshold
+        :param prop: Property to call
+        :return: Result of the call
+        """
+        if self._slow_call_threshold is None:
+            return prop()
+
+        start = time.perf_counter()
+        result = prop()
+        duration = time.perf_counter() - start
+        if duration > self._slow_call_threshold:
+            logger.warning(
+                f"Prop {getattr(prop, '__qualname__', prop)!r} held the event loop "
+                f"for {duration:.3f}s. Consider making it async, or enabling "
+                "offload_sync_props."
+            )
+        return result
+
+    async def _resolve_callable(self, prop: Callable[[], Any]) -> Any:
+        """
+        Call a property and resolve its result
+        :param prop: Property to call
+        :return: Resolved result
+        """
+        if self._semaphore is None:
+            result = await self._call(prop)
+        else:
+            async with self._semaphore:
+                result = await self._call(prop)
+        return await self.resolve(result)
+
+    async def _resolve_sequentially(self, prop: Any) -> Any:
+        """
+        Deeply resolve a property, evaluating callables one after another
+        :param prop: Property to resolve
+        :return: Resolved property
+        """
+        if isinstance(prop, dict):
+            return {
+                self._encode(key): await self.resolve(value)
+                for key, value in prop.items()
+            }
+        if isinstance(prop, list):
+            models = _dump_model_list(prop)
+            if models is not None:
+                return models
+            return [await self.resolve(value) for value in prop]
+        if isinstance(prop, BaseModel):
+            return prop.model_dump(mode="json")
+        return self._encode(prop)
+
+    def _encode(self, prop: Any) -> Any:
+        """
+        Encode a value which is neither a container nor a callable, or a dict key
+        (e.g. an Enum or a date), which the JSON serializers only accept as primitives.
+        JSON primitives are returned as is, without calling the encoder.
+        :param prop: Value to encode
+        :return: Encoded value
+        """
+        if self._encoder is None or type(prop) in _JSON_PRIMITIVES:
+            return prop
+        return self._encoder(prop)
+
+    def _schedule(self, prop: Any, slots: List[_Slot]) -> Any:
+        """
+        Copy the props tree, scheduling a task for every callable found in it.
+        The slot of each task is recorded to put its result back in the tree.
+        :param prop: Property to copy
+        :param slots: List in which the slots are recorded
+        :return: Copy of the property
+        """
+        container: Union[Dict[Any, Any], List[Any]]
+        items: Iterable[Tuple[Any, Any]]
+        if isinstance(prop, dict):
+            container = {}
+            items = prop.items()
+        elif isinstance(prop, list):
+            models = _dump_model_list(prop)
+            if models is not None:
+                return models
+            container = [None] * len(prop)
+            items = enumerate(prop)
+        elif isinstance(prop, BaseModel):
+            return prop.model_dump(mode="json")
+        else:
+            return self._encode(prop)
+
+        for key, value in items:
+            key = self._encode(key)
+            if callable(value):
+                task = asyncio.ensure_future(self._resolve_callable(value))
+                slots.append((container, key, task))
+                container[key] = None
+            else:
+                container[key] = self._schedule(value, slots)
+
+        return container
+
+
+def _is_async_callable(prop: Callable[[], Any]) -> bool:
+    """
+    Check if a callable is a coroutine function (or an object with an async __call__)
+    :param prop: Callable to check
+    :return: True if calling it returns a coroutine, False otherwise
+    """
+    return inspect.iscoroutinefunction(prop) or inspect.iscoroutinefunction(
+        getattr(prop, "__call__", None)
+    )
+
+
+@lru_cache(maxsize=256)
+def _model_list_adapter(model: Type[BaseModel]) -> "TypeAdapter[List[BaseModel]]":
+    """
+    Get the (cached) TypeAdapter dumping a list of instances of a model
+    :param model: BaseModel class
+    :return: The TypeAdapter
+    """
+    return TypeAdapter(List[model])  # type: ignore[valid-type]
+
+
+def _dump_model_list(prop: List[Any]) -> Optional[List[Any]]:
+    """
+    Dump a list of BaseModels of a same type in a single pydantic-core call
+    :param prop: List to dump
+    :return: The dumped list, or None if the list is not made of BaseModels of a same type
+    """
+    if not prop or not isinstance(prop[0], BaseModel):
+        return None
+
+    model = type(prop[0])
+    if any(type(item) is not model for item in prop):
+        return None
+
+    return cast(List[Any], _model_list_adapter(model).dump_python(prop, mode="json"))
@@ -0,0 +1,110 @@
+import json
+from abc import ABC, abstractmethod
+from json import JSONEncoder
+from typing import Any, Type, Union
+
+from fastapi.encoders import jsonable_encoder
+
+from .utils import InertiaJsonEncoder
+
+try:
+    import orjson
+except (ModuleNotFoundError, ImportError):
+    orjson = None  # type: ignore
+
+
+class JsonSerializer(ABC):
+    """
+    Backend used to serialize the page data (JSON responses, HTML embedding
+    and SSR requests) and to parse the SSR server responses.
+    You can extend this class to plug in your own JSON library.
+    """
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        """
+        Serialize a value to UTF-8 encoded JSON
+        :param value: Value to serialize
+        :return: The JSON bytes
+        """
+
+    @abstractmethod
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        Parse JSON data
+        :param data: JSON data to parse
+        :return: The parsed value
+        """
+
+
+class StdlibJsonSerializer(JsonSerializer):
+    """
+    Serializer using the json module of the standard library,
+    and the `json_encoder` of the InertiaConfig
+    """
+
+    def __init__(self, encoder: Type[JSONEncoder] = InertiaJsonEncoder) -> None:
+        """
+        Constructor
+        :param encoder: JSONEncoder class used to serialize values
+        """
+        self.encoder = encoder
+
+    def dumps(self, value: Any) -> bytes:
+        encoded = json.dumps(
+            value, cls=self.encoder, ensure_ascii=False, separators=(",", ":")
+        )
+        if not isinstance(encoded, str):
+            # Encoders overriding `encode` to return JSON compatible data instead
+            # of a string (deprecated, override `default` instead)
+            encoded = json.dumps(encoded, ensure_ascii=False, separators=(",", ":"))
+        return encoded.encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(JsonSerializer):
+    """
+    Serializer using orjson. Values orjson does not handle natively, as well as
+    datetimes and dataclasses, are encoded with FastAPI's jsonable_encoder, so
+    that the output is the same as with the InertiaJsonEncoder.
+    Values orjson cannot serialize at all, such as integers beyond 64 bits,
+    are serialized with the json module of the standard library instead.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructor
+        :raises ImportError: If orjson is not installed
+        """
+        if not orjson:
+            raise ImportError("You need to install orjson to use the OrjsonSerializer")
+        self._fallback = StdlibJsonSerializer()
+
+    def dumps(self, value: Any) -> bytes:
+        try:
+            return orjson.dumps(
+                value,
+                default=jsonable_encoder,
+                option=orjson.OPT_PASSTHROUGH_DATETIME
+                | orjson.OPT_PASSTHROUGH_DATACLASS
+                | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            return self._fallback.dumps(value)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+
+def default_json_serializer(encoder: Type[JSONEncoder]) -> JsonSerializer:
+    """
+    Get the serializer to use when none is configured: orjson if it is installed
+    and the default InertiaJsonEncoder is used, the standard library otherwise
+    :param encoder: The configured JSONEncoder class
+    :return: The serializer
+    """
+    if orjson and encoder is InertiaJsonEncoder:
+        return OrjsonSerializer()
+    return StdlibJsonSerializer(encoder)
@@ -0,0 +1,569 @@
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    TypeVar,
+    Union,
+)
+
+from .exceptions import (
+    SSRBatchUnsupportedException,
+    SSRDeadlineExceededException,
+    SSRRenderException,
+    SSRUnavailableException,
+)
+from .ssr_transports import HTTPSSRTransport, LoadBalancedSSRTransport, SSRTransport
+
+try:
+    import httpx
+except (ModuleNotFoundError, ImportError):
+    httpx = None  # type: ignore
+
+if TYPE_CHECKING:
+    from .config import InertiaConfig
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def ssr_fingerprint(page_json: bytes, version: str) -> str:
+    """
+    Get the fingerprint of a page sent to the SSR server
+    :param page_json: The serialized page data
+    :param version: The Inertia version
+    :return: The fingerprint
+    """
+    return hashlib.sha256(version.encode() + b"\0" + page_json).hexdigest()
+
+
+@dataclass(frozen=True)
+class SSRResult:
+    """
+    Result of a server-side rendering
+    """
+
+    head: str
+    body: str
+
+
+class SSRClient:
+    """
+    Application-lifetime client used to call the Inertia SSR server.
+    It is owned by the InertiaConfig, so every request shares the same
+    transport, and sends pages through the `ssr_transport` of the config.
+    By default, pages are posted to `ssr_url` by a pooled HTTP transport, balanced
+    between the endpoints if `ssr_url` is a list. The default transport is only
+    created the first time SSR actually runs.
+    The transport is closed by `aclose` (see `inertia_lifespan`).
+
+    When `ssr_health_check_interval` is set, `start` runs a background probe of
+    the renderer health, and SSR is skipped while the renderer is known to be down.
+    """
+
+    _config: "InertiaConfig"
+    _transport: Union[SSRTransport, None]
+    _in_flight: Dict[str, "asyncio.Task[SSRResult]"]
+    _background_tasks: Set["asyncio.Task[SSRResult]"]
+    _health_probe: Optional["asyncio.Task[None]"]
+
+    def __init__(self, config_: "InertiaConfig") -> None:
+        """
+        Constructor
+        :param config_: InertiaConfig object
+        """
+        self._config = config_
+        self._transport = None
+        self._in_flight = {}
+        self._background_tasks = set()
+        self._health_probe = None
+        self.available = True
+        self.pending_calls = 0
+        self._batch_supported = True
+
+    @property
+    def transport(self) -> SSRTransport:
+        """
+        Get the transport to the SSR renderer, creating the default one on first use
+        :return: The transport
+        """
+        if self._config.ssr_transport is not None:
+            return self._config.ssr_transport
+
+        if self._transport is None:
+            if isinstance(self._config.ssr_url, str):
+                self._transport = self._http_transport(self._config.ssr_url)
+            else:
+                self._transport = LoadBalancedSSRTransport(
+                    {url: self._http_transport(url) for url in self._config.ssr_url},
+                    hedge_percentile=self._config.ssr_hedge_percentile,
+                    max_hedge_rate=self._config.ssr_max_hedge_rate,
+                )
+        return self._transport
+
+    def _http_transport(self, url: str) -> HTTPSSRTransport:
+        """
+        Create an HTTP transport to an SSR server, configured from the `ssr_` options
+        :param url: The URL to the SSR server
+        :return: The transport
+        """
+        return HTTPSSRTransport(
+            url=url,
+            timeout=self._config.ssr_timeout,
+            max_connections=self._config.ssr_max_connections,
+            max_keepalive_connections=self._config.ssr_max_keepalive_connections,
+            keepalive_expiry=self._config.ssr_keepalive_expiry,
+            gzip_min_size=self._config.ssr_gzip_min_size,
+        )
+
+    async def render(
+        self,
+        page_json: bytes,
+        client: Union["httpx.AsyncClient", None] = None,
+        cacheable: bool = True,
+        deadline: Optional[float] = None,
+        component: Optional[str] = None,
+    ) -> SSRResult:
+        """
+        Render a page, giving up once the deadline, if any, has passed.
+        With `ssr_deadline_background`, a cacheable render that missed its
+        deadline keeps running in the background to warm the SSR cache.
+        :param page_json: The serialized page data
+        :param client: httpx client to use instead of the pooled one
+        :param cacheable: Whether the result can be read from and stored in the cache
+        :param deadline: Time, in seconds, the SSR result is waited for
+        :param component: The component of the page, for transports routing pages by component
+        :raises SSRUnavailableException: If the call is shed or the circuit breaker is open
+        :raises SSRDeadlineExceededException: If the deadline has passed
+        :return: The SSR result
+        """
+        if deadline is None:
+            return await self._render(page_json, component, client, cacheable)
+
+        task = asyncio.ensure_future(
+            self._render(page_json, component, client, cacheable)
+        )
+        background = (
+            self._config.ssr_deadline_background
+            and cacheable
+            and self._config.ssr_cache is not None
+        )
+        try:
+            done, _ = await asyncio.wait({task}, timeout=deadline)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+
+        if task in done:
+            return task.result()
+
+        if background:
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+            task.add_done_callback(_retrieve_exception)
+        else:
+            task.cancel()
+        raise SSRDeadlineExceededException(
+            f"The SSR server did not answer within {deadline}s"
+        )
+
+    async def _render(
+        self,
+        page_json: bytes,
+        component: Optional[str],
+        client: Union["httpx.AsyncClient", None],
+        cacheable: bool,
+    ) -> SSRResult:
+        """
+        Render a page. If an SSR cache is configured and the page is cacheable,
+        the result is looked up in the cache before calling the SSR server.
+        With `ssr_single_flight`, concurrent renders of an identical page share
+        a single call to the SSR server.
+        :param page_json: The serialized page data
+        :param component: The component of the page
+        :param client: httpx client to use instead of the pooled one
+        :param cacheable: Whether the result can be read from and stored in the cache
+        :raises SSRUnavailableException: If the call is shed or the circuit breaker is open
+        :return: The SSR result
+        """
+        cache = self._config.ssr_cache if cacheable else None
+        if cache is None and not self._config.ssr_single_flight:
+            return await self._call(page_json, component, client)
+
+        key = ssr_fingerprint(page_json, self._config.version)
+        if cache is not None:
+            result = await cache.get(key)
+            if result is not None:
+                return result
+
+        if not self._config.ssr_single_flight:
+            return await self._call_and_cache(
+                key, page_json, component, client, cacheable
+            )
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._call_and_cache(key, page_json, component, client, cacheable)
+            )
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+            task.add_done_callback(_retrieve_exception)
+        # Shielded, so that a cancelled request does not cancel the call its
+        # concurrent identical requests are waiting for
+        return await asyncio.shield(task)
+
+    async def _call_and_cache(
+        self,
+        key: str,
+        page_json: bytes,
+        component: Optional[str],
+        client: Union["httpx.AsyncClient", None],
+        cacheable: bool,
+    ) -> SSRResult:
+        """
+        Call the SSR server, and cache the result if the page is cacheable
+        :param key: The page fingerprint
+        :param page_json: The serialized page data
+        :param component: The component of the page
+        :param client: httpx client to use instead of the pooled one
+        :param cacheable: Whether the result can be stored in the cache
+        :raises SSRUnavailableException: If the call is shed or the circuit breaker is open
+        :return: The SSR result
+        """
+        result = await self._call(page_json, component, client)
+        cache = self._config.ssr_cache if cacheable else None
+        if cache is not None:
+            await cache.set(key, result)
+        return result
+
+    async def _call(
+        self,
+        page_json: bytes,
+        component: Optional[str],
+        client: Union["httpx.AsyncClient", None],
+    ) -> SSRResult:
+        """
+        Call the SSR server within the concurrency limit, if any
+        :param page_json: The serialized page data
+        :param component: The component of the page
+        :param client: httpx client to use instead of the pooled one
+        :raises SSRUnavailableException: If the call is shed or the circuit breaker is open
+        :return: The SSR result
+        """
+        return await self._guard(lambda: self._send(page_json, component, client))
+
+    async def _guard(self, send: Callable[[], Awaitable[T]]) -> T:
+        """
+        Call the SSR server within the concurrency limit, if any
+        :param send: Function sending the call
+        :raises SSRUnavailableException: If the call is shed or the circuit breaker is open
+        :return: The result of the call
+        """
+        if not self.available:
+            raise SSRUnavailableException("The SSR server is down")
+
+        self.pending_calls += 1
+        try:
+            limiter = self._config.ssr_concurrency_limiter
+            if limiter is None:
+                return await self._call_through_breaker(send)
+
+            await limiter.acquire()
+            try:
+                return await self._call_through_breaker(send)
+            finally:
+                limiter.release()
+        finally:
+            self.pending_calls -= 1
+
+    async def _call_through_breaker(self, send: Callable[[], Awaitable[T]]) -> T:
+        """
+        Call the SSR server through the circuit breaker, if any
+        :param send: Function sending the call
+        :raises SSRUnavailableException: If the circuit breaker is open
+        :return: The result of the call
+        """
+        breaker = self._config.ssr_circuit_breaker
+        if breaker is None:
+            return await send()
+
+        if not breaker.allow_request():
+            raise SSRUnavailableException("The SSR circuit breaker is open")
+
+        try:
+            result = await send()
+        except SSRBatchUnsupportedException:
+            # The SSR server answered, it just cannot render batches
+            breaker.record_success()
+            raise
+        except asyncio.CancelledError:
+            # The render was given up, e.g. at its deadline: the server did not fail
+            breaker.record_cancellation()
+            raise
+        except BaseException:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        return result
+
+    async def _send(
+        self,
+        page_json: bytes,
+        component: Optional[str],
+        client: Union["httpx.AsyncClient", None],
+    ) -> SSRResult:
+        """
+        Send a page to the SSR renderer through the transport
+        :param page_json: The serialized page data
+        :param component: The component of the page
+        :param client: httpx client to use instead of the pooled one, over HTTP
+        :return: The SSR result
+        """
+        transport = self.transport
+        if client is not None and isinstance(
+            transport, (HTTPSSRTransport, LoadBalancedSSRTransport)
+        ):
+            content = await transport.render(page_json, component, client=client)
+        else:
+            content = await transport.render(page_json, component)
+        return _to_result(self._config.serializer.loads(content))
+
+    async def render_batch(
+        self,
+        pages: Sequence[Dict[str, Any]],
+        cacheable: bool = True,
+        batch_size: int = 100,
+        max_concurrency: int = 8,
+    ) -> List[Union[SSRResult, Exception]]:
+        """
+        Render many pages, e.g. to prerender them or build a sitemap.
+        The pages are sent `batch_size` at a time to the renderer if it can render
+        batches (see `SSRTransport.render_batch`), or else rendered one by one,
+        `max_concurrency` at a time.
+        :param pages: The page objects, with their component, props, url and version
+        :param cacheable: Whether the results can be read from and stored in the cache
+        :param batch_size: Maximum number of pages sent at once to the renderer
+        :param max_concurrency: Maximum number of concurrent renders, without batches
+        :return: The SSR result of each page, or the exception raised rendering it
+        """
+        pages_json = [self._config.serializer.dumps(page) for page in pages]
+        if self._batch_supported:
+            try:
+                results: List[Union[SSRResult, Exception]] = []
+                for start in range(0, len(pages_json), batch_size):
+                    results.extend(
+                        await self._render_chunk(
+                            pages_json[start : start + batch_size], cacheable
+                        )
+                    )
+                return results
+            except SSRBatchUnsupportedException as exc:
+                logger.debug(f"Rendering the pages one by one: {exc}")
+                self._batch_supported = False
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def render_one(
+            page_json: bytes, component: Optional[str]
+        ) -> Union[SSRResult, Exception]:
+            async with semaphore:
+                try:
+                    return await self.render(
+                        page_json, cacheable=cacheable, component=component
+                    )
+                except Exception as exc:
+                    return exc
+
+        return list(
+            await asyncio.gather(
+                *(
+                    render_one(page_json, page.get("component"))
+                    for page, page_json in zip(pages, pages_json)
+                )
+            )
+        )
+
+    async def _render_chunk(
+        self, pages_json: List[bytes], cacheable: bool
+    ) -> List[Union[SSRResult, Exception]]:
+        """
+        Render pages in a single batch, except those found in the cache
+        :param pages_json: The serialized page data of each page
+        :param cacheable: Whether the results can be read from and stored in the cache
+        :raises SSRBatchUnsupportedException: If the renderer cannot render batches
+        :return: The SSR result of each page, or the exception raised rendering it
+        """
+        cache = self._config.ssr_cache if cacheable else None
+        keys = [
+            ssr_fingerprint(page_json, self._config.version) for page_json in pages_json
+        ]
+        results: List[Union[SSRResult, Exception, None]] = [None] * len(pages_json)
+        if cache is not None:
+            for index, key in enumerate(keys):
+                results[index] = await cache.get(key)
+
+        missing = [index for index, result in enumerate(results) if result is None]
+        if missing:
+            batch = [pages_json[index] for index in missing]
+            try:
+                rendered = await self._guard(lambda: self._send_batch(batch))
+            except SSRBatchUnsupportedException:
+                raise
+            except Exception as exc:
+                rendered = [exc] * len(missing)
+            for index, result in zip(missing, rendered):
+                results[index] = result
+                if cache is not None and isinstance(result, SSRResult):
+                    await cache.set(keys[index], result)
+        return [result for result in results if result is not None]
+
+    async def _send_batch(
+        self, pages_json: List[bytes]
+    ) -> List[Union[SSRResult, Exception]]:
+        """
+        Send pages to the SSR renderer in a single batch through the transport
+        :param pages_json: The serialized page data of each page
+        :raises SSRBatchUnsupportedException: If the renderer cannot render batches
+        :raises SSRRenderException: If the renderer did not answer for each page
+        :return: The SSR result of each page, or the error reported by the renderer
+        """
+        responses = self._config.serializer.loads(
+            await self.transport.render_batch(pages_json)
+        )
+        if not isinstance(responses, list) or len(responses) != len(pages_json):
+            raise SSRRenderException(
+                f"The SSR renderer did not answer for each of the {len(pages_json)} pages"
+            )
+        return [
+            SSRRenderException(response["error"])
+            if "error" in response
+            else _to_result(response)
+            for response in responses
+        ]
+
+    async def start(self) -> None:
+        """
+        Start the configured transport (e.g. spawn the renderers of an SSRSupervisor),
+        render the warm-up pages, and start the health probe
+        """
+        if self._config.ssr_transport is not None:
+            await self._config.ssr_transport.start()
+
+        if self._config.ssr_warmup_pages:
+            await self.warm_up()
+
+        interval = self._config.ssr_health_check_interval
+        if interval is not None and self._health_probe is None:
+            self._health_probe = asyncio.ensure_future(self._probe_health(interval))
+
+    async def warm_up(self) -> None:
+        """
+        Render the `ssr_warmup_pages`, warming up the renderers and the connections
+        """
+        pages = self._config.ssr_warmup_pages
+        results = await asyncio.gather(
+            *(self._warm_up(component, props) for component, props in pages),
+            return_exceptions=True,
+        )
+        for (component, _), result in zip(pages, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Could not warm up SSR with {component!r}: {result}")
+
+    async def _warm_up(self, component: str, props: Dict[str, Any]) -> None:
+        """
+        Render a warm-up page, bypassing the cache
+        :param component: The component of the page
+        :param props: Sample props of the page
+        """
+        page = {
+            "component": component,
+            "props": props,
+            "url": "/",
+            "version": self._config.version,
+        }
+        await self.render(
+            self._config.serializer.dumps(page), cacheable=False, component=component
+        )
+
+    async def check_health(self) -> bool:
+        """
+        Check the health of the renderer, updating `available`
+        :return: True if the renderer is up, False otherwise
+        """
+        # Not asyncio.wait_for, which may swallow the cancellation of the health
+        # probe on Python < 3.12
+        check = asyncio.ensure_future(self.transport.health())
+        try:
+            done, _ = await asyncio.wait({check}, timeout=self._config.ssr_timeout)
+        finally:
+            check.cancel()
+        try:
+            healthy = bool(done) and check.result()
+        except Exception:
+            healthy = False
+
+        if healthy != self.available:
+            if healthy:
+                logger.info("The SSR server is up again, resuming SSR")
+            else:
+                logger.warning("The SSR server is down, rendering pages client-side")
+        self.available = healthy
+        return healthy
+
+    async def _probe_health(self, interval: float) -> None:
+        """
+        Check the health of the renderer every `interval` seconds
+        :param interval: Time, in seconds, between two checks
+        """
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval)
+
+    async def aclose(self) -> None:
+        """
+        Cancel the renders still running in the background and the health probe,
+        and close the transport. The default one is created again if SSR runs again afterwards.
+        """
+        background_tasks: "List[asyncio.Task[Any]]" = list(self._background_tasks)
+        if self._health_probe is not None:
+            background_tasks.append(self._health_probe)
+            self._health_probe = None
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+
+        if self._config.ssr_transport is not None:
+            await self._config.ssr_transport.aclose()
+        elif self._transport is not None:
+            transport, self._transport = self._transport, None
+            await transport.aclose()
+
+
+def _to_result(response_json: Dict[str, Any]) -> SSRResult:
+    """
+    Build the SSR result from the response of the SSR renderer
+    :param response_json: The deserialized response
+    :return: The SSR result
+    """
+    return SSRResult(head="\n".join(response_json["head"]), body=response_json["body"])
+
+
+def _retrieve_exception(task: "asyncio.Task[SSRResult]") -> None:
+    """
+    Retrieve the exception of a shared SSR call, so that it is not reported as
+    never retrieved when every request waiting for it was cancelled
+    :param task: The shared SSR call
+    """
+    if not task.cancelled():
+        task.exception()
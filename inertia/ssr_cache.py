@@ -0,0 +1,324 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple, TypedDict, Union
+
+from .ssr import SSRResult
+
+
+class SSRCacheStats(TypedDict):
+    """
+    SSR cache metrics
+    """
+
+    hits: int
+    misses: int
+    entries: int
+    size: int
+
+
+class SSRCacheBackend(ABC):
+    """
+    Storage for SSR results, keyed by page fingerprint.
+    Subclass it to plug another storage into the SSR step of `Inertia.render`.
+    """
+
+    hits: int
+    misses: int
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[SSRResult]:
+        """
+        Get a cached result
+        :param key: The page fingerprint
+        :return: The cached result, or None if it is not cached or expired
+        """
+
+    @abstractmethod
+    async def set(self, key: str, result: SSRResult) -> None:
+        """
+        Cache a result
+        :param key: The page fingerprint
+        :param result: The SSR result
+        """
+
+    @abstractmethod
+    async def stats(self) -> SSRCacheStats:
+        """
+        Get the cache metrics
+        :return: The metrics
+        """
+
+    async def aclose(self) -> None:
+        """
+        Release the resources held by the cache (see `inertia_lifespan`)
+        """
+
+
+class MemorySSRCache(SSRCacheBackend):
+    """
+    In-process LRU cache of SSR results, keyed by page fingerprint.
+    Entries expire after `ttl` seconds, and the least recently used entries are
+    evicted once the cached head and body exceed `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Constructor
+        :param max_bytes: Maximum size, in bytes, of the cached results
+        :param ttl: Time, in seconds, after which a cached result expires
+        :param clock: Monotonic clock, in seconds
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._size = 0
+        self._entries: "OrderedDict[str, Tuple[SSRResult, int, float]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[SSRResult]:
+        """
+        Get a cached result
+        :param key: The page fingerprint
+        :return: The cached result, or None if it is not cached or expired
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[2] <= self._clock():
+            self._remove(key)
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    async def set(self, key: str, result: SSRResult) -> None:
+        """
+        Cache a result
+        :param key: The page fingerprint
+        :param result: The SSR result
+        """
+        size = len(result.head.encode()) + len(result.body.encode())
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (result, size, self._clock() + self.ttl)
+        self._size += size
+
+        while self._size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    async def stats(self) -> SSRCacheStats:
+        """
+        Get the cache metrics
+        :return: The metrics
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "size": self._size,
+        }
+
+    def _remove(self, key: str) -> None:
+        """
+        Remove an entry
+        :param key: The page fingerprint
+        """
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+
+class SQLiteSSRCache(SSRCacheBackend):
+    """
+    LRU cache of SSR results stored in a SQLite database, shared by every worker
+    process of the host that points to the same file.
+    Each write is a single transaction, so workers never see a partial entry.
+    Entries expire after `ttl` seconds, and the least recently used entries are
+    evicted once the cached head and body exceed `max_bytes`.
+    Hits and misses are counted per process.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, "os.PathLike[str]"],
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 60.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Constructor
+        :param path: Path of the SQLite database, created if needed
+        :param max_bytes: Maximum size, in bytes, of the cached results
+        :param ttl: Time, in seconds, after which a cached result expires
+        :param clock: Wall clock, in seconds, shared by the worker processes
+        """
+        self.path = os.fspath(path)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    async def get(self, key: str) -> Optional[SSRResult]:
+        """
+        Get a cached result
+        :param key: The page fingerprint
+        :return: The cached result, or None if it is not cached or expired
+        """
+        result = await asyncio.to_thread(self._get, key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    async def set(self, key: str, result: SSRResult) -> None:
+        """
+        Cache a result
+        :param key: The page fingerprint
+        :param result: The SSR result
+        """
+        await asyncio.to_thread(self._set, key, result)
+
+    async def stats(self) -> SSRCacheStats:
+        """
+        Get the cache metrics
+        :return: The metrics
+        """
+        return await asyncio.to_thread(self._stats)
+
+    async def aclose(self) -> None:
+        """
+        Close the database connection. It is opened again if the cache is used afterwards.
+        """
+        with self._lock:
+            if self._connection is not None:
+                connection, self._connection = self._connection, None
+                connection.close()
+
+    def _stats(self) -> SSRCacheStats:
+        """
+        Get the cache metrics, counting the entries that are not expired
+        :return: The metrics
+        """
+        with self._lock:
+            entries, size = (
+                self._connect()
+                .execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ssr_cache"
+                    " WHERE expires_at > ?",
+                    (self._clock(),),
+                )
+                .fetchone()
+            )
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "size": size,
+        }
+
+    def _get(self, key: str) -> Optional[SSRResult]:
+        """
+        Get a cached result, marking it as recently used
+        :param key: The page fingerprint
+        :return: The cached result, or None if it is not cached or expired
+        """
+        now = self._clock()
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT head, body FROM ssr_cache WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE ssr_cache SET used_at = ? WHERE key = ?", (now, key)
+            )
+        return SSRResult(head=row[0], body=row[1])
+
+    def _set(self, key: str, result: SSRResult) -> None:
+        """
+        Cache a result, then evict the expired and least recently used entries
+        :param key: The page fingerprint
+        :param result: The SSR result
+        """
+        size = len(result.head.encode()) + len(result.body.encode())
+        if size > self.max_bytes:
+            return
+
+        now = self._clock()
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                connection.execute(
+                    "INSERT OR REPLACE INTO ssr_cache"
+                    " (key, head, body, size, expires_at, used_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, result.head, result.body, size, now + self.ttl, now),
+                )
+                connection.execute(
+                    "DELETE FROM ssr_cache WHERE expires_at <= ?", (now,)
+                )
+                connection.execute(
+                    "DELETE FROM ssr_cache WHERE key IN ("
+                    " SELECT key FROM ("
+                    "  SELECT key, SUM(size) OVER (ORDER BY used_at DESC, key)"
+                    "  AS total FROM ssr_cache"
+                    " ) WHERE total > ?"
+                    ")",
+                    (self.max_bytes,),
+                )
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Get the connection of the current process, opening it if needed.
+        Must be called while holding the lock.
+        :return: The connection
+        """
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path,
+                timeout=5.0,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS ssr_cache ("
+                " key TEXT PRIMARY KEY,"
+                " head TEXT NOT NULL,"
+                " body TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " used_at REAL NOT NULL"
+                ")"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ssr_cache_used_at ON ssr_cache (used_at)"
+            )
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
@@ -0,0 +1,129 @@
+import re
+from abc import ABC, abstractmethod
+from fnmatch import fnmatchcase
+from typing import TYPE_CHECKING, Optional, Pattern, Sequence, Union
+
+from starlette.requests import Request
+
+if TYPE_CHECKING:
+    from .config import InertiaConfig
+
+BOT_USER_AGENTS = re.compile(
+    r"bot|crawl|spider|slurp|archiver|facebookexternalhit|embedly|quora link preview"
+    r"|pinterest|vkshare|w3c_validator|whatsapp|telegram|skypeuripreview|preview"
+    r"|lighthouse|google-inspectiontool|headlesschrome",
+    re.IGNORECASE,
+)
+
+
+class SSRPolicy(ABC):
+    """
+    Policy deciding, for each request, whether the page is rendered server-side.
+    When it declines, the page is rendered client-side without calling the SSR server
+    """
+
+    @abstractmethod
+    def should_render(
+        self, request: Request, component: str, config: "InertiaConfig"
+    ) -> bool:
+        """
+        Decide whether the page is rendered server-side
+        :param request: The request being rendered
+        :param component: The component of the page
+        :param config: The Inertia config, e.g. to check the health and load of the SSR client
+        :return: True to render the page server-side, False to render it client-side
+        """
+
+
+class BotsOnlySSRPolicy(SSRPolicy):
+    """
+    Render server-side the pages requested by crawlers and link unfurlers only,
+    humans running the JavaScript being fine with client-side rendering
+    """
+
+    def __init__(self, user_agents: Union[str, Pattern[str]] = BOT_USER_AGENTS) -> None:
+        """
+        Constructor
+        :param user_agents: Regular expression searched in the User-Agent header of bots
+        """
+        self.user_agents = (
+            re.compile(user_agents, re.IGNORECASE)
+            if isinstance(user_agents, str)
+            else user_agents
+        )
+
+    def should_render(
+        self, request: Request, component: str, config: "InertiaConfig"
+    ) -> bool:
+        return bool(self.user_agents.search(request.headers.get("User-Agent", "")))
+
+
+class RouteSSRPolicy(SSRPolicy):
+    """
+    Render server-side the pages whose path matches one of the patterns,
+    e.g. public landing pages, and defer to another policy for the other pages
+    """
+
+    def __init__(
+        self, paths: Sequence[str], otherwise: Optional[SSRPolicy] = None
+    ) -> None:
+        """
+        Constructor
+        :param paths: Shell-style patterns of the paths, e.g. "/blog/*"
+        :param otherwise: Policy for the other paths, None to render them client-side
+        """
+        self.paths = paths
+        self.otherwise = otherwise
+
+    def should_render(
+        self, request: Request, component: str, config: "InertiaConfig"
+    ) -> bool:
+        path = request.url.path
+        if any(fnmatchcase(path, pattern) for pattern in self.paths):
+            return True
+        return self.otherwise is not None and self.otherwise.should_render(
+            request, component, config
+        )
+
+
+class HealthySSRPolicy(SSRPolicy):
+    """
+    Render server-side while the SSR server is healthy and under budget:
+    it is not known to be down (see `ssr_health_check_interval`), the circuit breaker
+    is not open, nothing waits for a slot of the concurrency limiter, and there are
+    fewer than `max_pending_calls` SSR calls running
+    """
+
+    def __init__(
+        self, max_pending_calls: int = 32, policy: Optional[SSRPolicy] = None
+    ) -> None:
+        """
+        Constructor
+        :param max_pending_calls: Maximum number of SSR calls running at once
+        :param policy: Policy to follow when the SSR server is healthy and under budget,
+            None to render every page server-side
+        """
+        self.max_pending_calls = max_pending_calls
+        self.policy = policy
+
+    def should_render(
+        self, request: Request, component: str, config: "InertiaConfig"
+    ) -> bool:
+        ssr_client = config.ssr_client
+        if not ssr_client.available:
+            return False
+        if (
+            config.ssr_circuit_breaker is not None
+            and config.ssr_circuit_breaker.state == "open"
+        ):
+            return False
+        if (
+            config.ssr_concurrency_limiter is not None
+            and config.ssr_concurrency_limiter.stats()["queued"] > 0
+        ):
+            return False
+        if ssr_client.pending_calls >= self.max_pending_calls:
+            return False
+        return self.policy is None or self.policy.should_render(
+            request, component, config
+        )
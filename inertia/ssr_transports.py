@@ -0,0 +1,1106 @@
+import asyncio
+import bisect
+import gzip
+import hashlib
+import logging
+import os
+import struct
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Deque,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    TypedDict,
+    Tuple,
+    Union,
+)
+
+from .circuit_breaker import CircuitBreaker, CircuitState
+from .exceptions import SSRBatchUnsupportedException, SSRUnavailableException
+
+try:
+    import httpx
+except (ModuleNotFoundError, ImportError):
+    httpx = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+_FRAME_HEADER = struct.Struct(">I")
+
+
+class SSRTransport(ABC):
+    """
+    Channel through which pages are sent to the SSR renderer.
+    The renderer answers with a JSON object holding the `head` list and the `body`
+    of the rendered page, as the Inertia SSR server does.
+    """
+
+    @abstractmethod
+    async def render(self, page_json: bytes, component: Optional[str] = None) -> bytes:
+        """
+        Send a page to the renderer
+        :param page_json: The serialized page data
+        :param component: The component of the page, for transports routing pages by component
+        :return: The serialized response of the renderer
+        """
+
+    async def start(self) -> None:
+        """
+        Acquire the resources needed by the transport ahead of the first render
+        (see `inertia_lifespan`)
+        """
+
+    async def render_batch(self, pages_json: Sequence[bytes]) -> bytes:
+        """
+        Send several pages to the SSR renderer at once
+        :param pages_json: The serialized page data of each page
+        :raises SSRBatchUnsupportedException: If the renderer cannot render several
+            pages at once
+        :return: The serialized responses of the renderer, as a JSON array
+        """
+        raise SSRBatchUnsupportedException(
+            f"{type(self).__name__} cannot render batches"
+        )
+
+    async def health(self) -> bool:
+        """
+        Check if the renderer is up. Transports that cannot tell report it as up
+        :return: True if the renderer is up, False otherwise
+        """
+        return True
+
+    async def aclose(self) -> None:
+        """
+        Release the resources held by the transport (see `inertia_lifespan`)
+        """
+
+
+class HTTPSSRTransport(SSRTransport):
+    """
+    Transport posting the pages to the `/render` endpoint of an HTTP SSR server,
+    over TCP or, if `uds` is set, over a Unix domain socket.
+    The underlying httpx client is pooled, and only created on first use.
+    Its connections are bound to the event loop it was created on: a new client
+    is created when the transport is used from another event loop.
+    """
+
+    _client: Union["httpx.AsyncClient", None]
+    _client_loop: Optional[asyncio.AbstractEventLoop]
+
+    def __init__(
+        self,
+        url: str = "http://localhost:13714",
+        uds: Optional[str] = None,
+        timeout: float = 5.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 5.0,
+        gzip_min_size: Optional[int] = None,
+    ) -> None:
+        """
+        Constructor
+        :param url: The URL to the SSR server. Only its path is used over a Unix domain socket
+        :param uds: Path of the Unix domain socket the SSR server listens on
+        :param timeout: Timeout, in seconds, of the calls to the SSR server
+        :param max_connections: Maximum number of connections kept by the pool
+        :param max_keepalive_connections: Maximum number of idle keep-alive connections
+        :param keepalive_expiry: Time, in seconds, after which an idle connection is closed
+        :param gzip_min_size: Size, in bytes, from which the page is gzipped
+        """
+        self.url = url
+        self.uds = uds
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.gzip_min_size = gzip_min_size
+        self.batch_supported = True
+        self._client = None
+        self._client_loop = None
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        """
+        Get the pooled httpx client, creating it on first use on the running loop
+        :raises ImportError: If httpx is not installed
+        :return: The httpx client
+        """
+        if not httpx:
+            raise ImportError("You need to install httpx to use Inertia in SSR mode")
+
+        # The client of another loop (which may be closed already) is dropped
+        loop = asyncio.get_running_loop()
+        if (
+            self._client is None
+            or self._client.is_closed
+            or self._client_loop is not loop
+        ):
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            )
+            timeout = httpx.Timeout(self.timeout)
+            if self.uds is None:
+                self._client = httpx.AsyncClient(limits=limits, timeout=timeout)
+            else:
+                self._client = httpx.AsyncClient(
+                    transport=httpx.AsyncHTTPTransport(uds=self.uds, limits=limits),
+                    timeout=timeout,
+                )
+            self._client_loop = loop
+        return self._client
+
+    async def render(
+        self,
+        page_json: bytes,
+        component: Optional[str] = None,
+        client: Union["httpx.AsyncClient", None] = None,
+    ) -> bytes:
+        """
+        Post a page to the SSR server
+        :param page_json: The serialized page data
+        :param component: The component of the page
+        :param client: httpx client to use instead of the pooled one
+        :return: The serialized response of the SSR server
+        """
+        headers = {"Content-Type": "application/json"}
+        if self.gzip_min_size is not None and len(page_json) >= self.gzip_min_size:
+            page_json = gzip.compress(page_json, compresslevel=6, mtime=0)
+            headers["Content-Encoding"] = "gzip"
+
+        response = await (client if client is not None else self.client).post(
+            url=f"{self.url}/render",
+            content=page_json,
+            headers=headers,
+        )
+        response.raise_for_status()
+        return response.content
+
+    async def render_batch(self, pages_json: Sequence[bytes]) -> bytes:
+        """
+        Post several pages, as a JSON array, to the `/render-batch` endpoint of the
+        SSR server. Stock SSR servers have no such endpoint: once it is found missing,
+        batches are no longer posted.
+        :param pages_json: The serialized page data of each page
+        :raises SSRBatchUnsupportedException: If the SSR server has no
+            `/render-batch` endpoint
+        :return: The serialized responses of the SSR server, as a JSON array
+        """
+        if not self.batch_supported:
+            raise SSRBatchUnsupportedException(
+                "The SSR server has no /render-batch endpoint"
+            )
+
+        content = b"[" + b",".join(pages_json) + b"]"
+        headers = {"Content-Type": "application/json"}
+        if self.gzip_min_size is not None and len(content) >= self.gzip_min_size:
+            content = gzip.compress(content, compresslevel=6, mtime=0)
+            headers["Content-Encoding"] = "gzip"
+
+        response = await self.client.post(
+            f"{self.url}/render-batch",
+            content=content,
+            headers=headers,
+            timeout=self.timeout * len(pages_json),
+        )
+        if response.status_code in (404, 405):
+            self.batch_supported = False
+            raise SSRBatchUnsupportedException(
+                "The SSR server has no /render-batch endpoint"
+            )
+        response.raise_for_status()
+        return response.content
+
+    async def health(self) -> bool:
+        """
+        Check if the SSR server is up, through its `/health` endpoint
+        :return: True if the SSR server is up, False otherwise
+        """
+        response = await self.client.get(f"{self.url}/health")
+        return response.is_success
+
+    async def aclose(self) -> None:
+        """
+        Close the pooled httpx client, if it was ever created.
+        A new one will be created if the transport is used again afterwards.
+        """
+        if self._client is not None:
+            client, self._client = self._client, None
+            if self._client_loop is asyncio.get_running_loop():
+                await client.aclose()
+
+
+class StdioSSRTransport(SSRTransport):
+    """
+    Transport to a renderer process it starts and keeps running, exchanging
+    length-prefixed frames over the process stdin and stdout: each page is written
+    as a 4-byte big-endian length followed by the page JSON, and the renderer
+    answers with a frame holding its JSON response. Pages are sent one at a time.
+    The process is started on first use, and restarted on the next render
+    after it exited or a render failed. A cancelled render is not a failure: the
+    renderer finishes it before the next one.
+    """
+
+    _process: Optional["asyncio.subprocess.Process"]
+    _lock: Optional[asyncio.Lock]
+    _exchange_task: Optional["asyncio.Task[List[bytes]]"]
+
+    def __init__(
+        self,
+        command: Sequence[str],
+        timeout: float = 5.0,
+        cwd: Optional[str] = None,
+        env: Optional[Mapping[str, str]] = None,
+        max_frame_size: int = 64 * 1024 * 1024,
+    ) -> None:
+        """
+        Constructor
+        :param command: The command starting the renderer, e.g. ["node", "ssr.js"]
+        :param timeout: Timeout, in seconds, of a render
+        :param cwd: Working directory of the renderer
+        :param env: Environment variables of the renderer, defaults to the current ones
+        :param max_frame_size: Maximum size, in bytes, of a response of the renderer
+        """
+        self.command = list(command)
+        self.timeout = timeout
+        self.cwd = cwd
+        self.env = dict(env) if env is not None else None
+        self.max_frame_size = max_frame_size
+        self._process = None
+        self._lock = None
+        self._exchange_task = None
+
+    @property
+    def pid(self) -> Optional[int]:
+        """
+        Get the process id of the running renderer
+        :return: The process id, or None if the renderer is not running
+        """
+        if self._process is None or self._process.returncode is not None:
+            return None
+        return self._process.pid
+
+    async def render(self, page_json: bytes, component: Optional[str] = None) -> bytes:
+        """
+        Send a page to the renderer, starting it if needed
+        :param page_json: The serialized page data
+        :param component: The component of the page
+        :raises asyncio.TimeoutError: If the renderer did not answer in time
+        :raises asyncio.IncompleteReadError: If the renderer exited while rendering
+        :return: The serialized response of the renderer
+        """
+        (response,) = await self._run_exchange([page_json], self.timeout)
+        return response
+
+    async def render_batch(self, pages_json: Sequence[bytes]) -> bytes:
+        """
+        Send several pages to the renderer in one pipelined stream, writing the
+        next pages while the renderer answers the first ones
+        :param pages_json: The serialized page data of each page
+        :raises asyncio.TimeoutError: If the renderer did not answer in time
+        :raises asyncio.IncompleteReadError: If the renderer exited while rendering
+        :return: The serialized responses of the renderer, as a JSON array
+        """
+        responses = await self._run_exchange(pages_json, self.timeout * len(pages_json))
+        return b"[" + b",".join(responses) + b"]"
+
+    async def start(self) -> None:
+        """
+        Start the renderer, unless it is already running
+        """
+        async with self._get_lock():
+            await self._start()
+
+    async def health(self) -> bool:
+        """
+        Check if the renderer is running, starting it if needed
+        :return: True if the renderer is running, False otherwise
+        """
+        await self.start()
+        return self.pid is not None
+
+    async def aclose(self) -> None:
+        """
+        Stop the renderer, if it is running.
+        It will be started again if the transport is used afterwards.
+        """
+        await self._stop()
+        if self._exchange_task is not None:
+            # The exchange fails as soon as the renderer is stopped
+            await asyncio.gather(self._exchange_task, return_exceptions=True)
+
+    def _get_lock(self) -> asyncio.Lock:
+        """
+        Get the lock serializing the use of the pipes, creating it on first use
+        :return: The lock
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _start(self) -> "asyncio.subprocess.Process":
+        """
+        Start the renderer, unless it is already running
+        :return: The renderer process
+        """
+        if self._process is not None and self._process.returncode is None:
+            return self._process
+
+        self._process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            cwd=self.cwd,
+            env=self.env,
+        )
+        return self._process
+
+    async def _stop(self) -> None:
+        """
+        Stop the renderer, if it is running
+        """
+        if self._process is None:
+            return
+
+        process, self._process = self._process, None
+        if process.returncode is None:
+            process.kill()
+        await process.wait()
+
+    async def _run_exchange(
+        self, pages_json: Sequence[bytes], timeout: float
+    ) -> List[bytes]:
+        """
+        Exchange frames with the renderer, starting it if needed. The pipes are
+        locked until the exchange is done. If the caller is cancelled (e.g. at its
+        SSR deadline, or when its hedge won), the exchange is finished in the
+        background instead of interrupted, so that the renderer is kept.
+        :param pages_json: The serialized page data of each page
+        :param timeout: Timeout, in seconds, of the exchange
+        :return: The serialized responses of the renderer
+        """
+        lock = self._get_lock()
+        await lock.acquire()
+        try:
+            process = await self._start()
+        except BaseException:
+            lock.release()
+            raise
+
+        exchange = asyncio.ensure_future(self._exchange(process, pages_json, timeout))
+        self._exchange_task = exchange
+
+        def release(task: "asyncio.Task[List[bytes]]") -> None:
+            self._exchange_task = None
+            lock.release()
+            # Mark the error as retrieved, the caller may be gone
+            if not task.cancelled():
+                task.exception()
+
+        exchange.add_done_callback(release)
+        return await asyncio.shield(exchange)
+
+    async def _exchange(
+        self,
+        process: "asyncio.subprocess.Process",
+        pages_json: Sequence[bytes],
+        timeout: float,
+    ) -> List[bytes]:
+        """
+        Write page frames to the renderer while reading its response frames.
+        The renderer is stopped if the exchange fails or times out.
+        :param process: The renderer process
+        :param pages_json: The serialized page data of each page
+        :param timeout: Timeout, in seconds, of the exchange
+        :raises ValueError: If a response is larger than `max_frame_size`
+        :return: The serialized responses of the renderer
+        """
+        try:
+            _, responses = await asyncio.wait_for(
+                asyncio.gather(
+                    self._write_frames(process, pages_json),
+                    self._read_frames(process, len(pages_json)),
+                ),
+                timeout,
+            )
+        except BaseException:
+            # The pipes may hold a partial frame: start over with a new process
+            await self._stop()
+            raise
+        return responses
+
+    async def _write_frames(
+        self, process: "asyncio.subprocess.Process", pages_json: Sequence[bytes]
+    ) -> None:
+        """
+        Write page frames to the renderer
+        :param process: The renderer process
+        :param pages_json: The serialized page data of each page
+        """
+        assert process.stdin is not None
+        for page_json in pages_json:
+            process.stdin.write(_FRAME_HEADER.pack(len(page_json)) + page_json)
+            await process.stdin.drain()
+
+    async def _read_frames(
+        self, process: "asyncio.subprocess.Process", count: int
+    ) -> List[bytes]:
+        """
+        Read response frames from the renderer
+        :param process: The renderer process
+        :param count: Number of frames to read
+        :raises ValueError: If a response is larger than `max_frame_size`
+        :return: The serialized responses of the renderer
+        """
+        assert process.stdout is not None
+        responses = []
+        for _ in range(count):
+            (size,) = _FRAME_HEADER.unpack(
+                await process.stdout.readexactly(_FRAME_HEADER.size)
+            )
+            if size > self.max_frame_size:
+                raise ValueError(
+                    f"The SSR renderer response ({size} bytes) exceeds max_frame_size"
+                )
+            responses.append(await process.stdout.readexactly(size))
+        return responses
+
+
+class SSRRendererStats(TypedDict):
+    """
+    Metrics of a renderer process managed by the SSRSupervisor
+    """
+
+    pid: Optional[int]
+    outstanding: int
+    renders: int
+
+
+class SSRSupervisorStats(TypedDict):
+    """
+    SSR supervisor metrics
+    """
+
+    renderers: List[SSRRendererStats]
+    restarts: int
+    recycled: int
+
+
+class _Renderer:
+    """
+    Renderer process managed by the SSRSupervisor
+    """
+
+    def __init__(self, transport: StdioSSRTransport) -> None:
+        """
+        Constructor
+        :param transport: The transport to the renderer process
+        """
+        self.transport = transport
+        self.outstanding = 0
+        self.renders = 0
+        self.retired = False
+        self.watcher: Optional["asyncio.Task[None]"] = None
+
+    def stats(self) -> SSRRendererStats:
+        """
+        Get the renderer metrics
+        :return: The metrics
+        """
+        return {
+            "pid": self.transport.pid,
+            "outstanding": self.outstanding,
+            "renders": self.renders,
+        }
+
+
+class SSRSupervisor(SSRTransport):
+    """
+    Transport to a pool of renderer processes it spawns and supervises, each of
+    them talking the length-prefixed protocol of the StdioSSRTransport.
+    Renderers are restarted when they exit, and recycled after `max_renders`
+    renders to cap their memory growth: a new renderer takes the place of the old
+    one, which is stopped once its outstanding renders are done.
+    Each page is sent to the renderer with the fewest outstanding renders.
+    The renderers are started by `start` (see `inertia_lifespan`), or on first use.
+    """
+
+    _renderers: List[_Renderer]
+    _background_tasks: Set["asyncio.Task[None]"]
+
+    def __init__(
+        self,
+        command: Sequence[str],
+        processes: int = os.cpu_count() or 1,
+        max_renders: Optional[int] = 10_000,
+        timeout: float = 5.0,
+        restart_delay: float = 0.5,
+        cwd: Optional[str] = None,
+        env: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        """
+        Constructor
+        :param command: The command starting a renderer, e.g. ["node", "ssr.js"]
+        :param processes: Number of renderer processes
+        :param max_renders: Number of renders after which a renderer is recycled,
+            None to never recycle them
+        :param timeout: Timeout, in seconds, of a render
+        :param restart_delay: Time, in seconds, to wait before restarting a renderer that exited
+        :param cwd: Working directory of the renderers
+        :param env: Environment variables of the renderers, defaults to the current ones
+        """
+        self.command = list(command)
+        self.processes = processes
+        self.max_renders = max_renders
+        self.timeout = timeout
+        self.restart_delay = restart_delay
+        self.cwd = cwd
+        self.env = dict(env) if env is not None else None
+        self._renderers = []
+        self._background_tasks = set()
+        self._next = 0
+        self._restarts = 0
+        self._recycled = 0
+
+    async def start(self) -> None:
+        """
+        Spawn the renderer processes, unless they are already running
+        """
+        if not self._renderers:
+            self._renderers = [self._spawn() for _ in range(self.processes)]
+        await asyncio.gather(
+            *(renderer.transport.start() for renderer in self._renderers)
+        )
+
+    async def render(self, page_json: bytes, component: Optional[str] = None) -> bytes:
+        """
+        Send a page to the renderer with the fewest outstanding renders
+        :param page_json: The serialized page data
+        :param component: The component of the page
+        :raises asyncio.TimeoutError: If the renderer did not answer in time
+        :raises asyncio.IncompleteReadError: If the renderer exited while rendering
+        :return: The serialized response of the renderer
+        """
+        if not self._renderers:
+            self._renderers = [self._spawn() for _ in range(self.processes)]
+
+        # Rotate the starting point, so that idle renderers share the load
+        self._next = (self._next + 1) % len(self._renderers)
+        renderer = min(
+            self._renderers[self._next :] + self._renderers[: self._next],
+            key=lambda candidate: candidate.outstanding,
+        )
+
+        renderer.outstanding += 1
+        try:
+            return await renderer.transport.render(page_json, component)
+        finally:
+            renderer.outstanding -= 1
+            renderer.renders += 1
+            if (
+                self.max_renders is not None
+                and renderer.renders >= self.max_renders
+                and not renderer.retired
+            ):
+                self._recycle(renderer)
+            if renderer.retired and renderer.outstanding == 0:
+                self._run_in_background(self._stop(renderer))
+
+    async def health(self) -> bool:
+        """
+        Check if at least one renderer is running
+        :return: True if a renderer is running, False otherwise
+        """
+        return any(renderer.transport.pid is not None for renderer in self._renderers)
+
+    async def aclose(self) -> None:
+        """
+        Stop the renderer processes.
+        They will be spawned again if the supervisor is used afterwards.
+        """
+        renderers, self._renderers = self._renderers, []
+        await asyncio.gather(*(self._stop(renderer) for renderer in renderers))
+        background_tasks = list(self._background_tasks)
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+
+    def stats(self) -> SSRSupervisorStats:
+        """
+        Get the supervisor metrics
+        :return: The metrics
+        """
+        return {
+            "renderers": [renderer.stats() for renderer in self._renderers],
+            "restarts": self._restarts,
+            "recycled": self._recycled,
+        }
+
+    def _spawn(self) -> _Renderer:
+        """
+        Create a renderer, and the task starting it and restarting it when it exits
+        :return: The renderer
+        """
+        renderer = _Renderer(
+            StdioSSRTransport(
+                self.command, timeout=self.timeout, cwd=self.cwd, env=self.env
+            )
+        )
+        renderer.watcher = asyncio.ensure_future(self._watch(renderer))
+        return renderer
+
+    async def _watch(self, renderer: _Renderer) -> None:
+        """
+        Start a renderer, and restart it each time it exits until it is retired
+        :param renderer: The renderer
+        """
+        while not renderer.retired:
+            try:
+                await renderer.transport.start()
+            except Exception as exc:
+                logger.error(f"Could not start the SSR renderer: {exc}")
+                await asyncio.sleep(self.restart_delay)
+                continue
+
+            process = renderer.transport._process
+            if process is not None:
+                await process.wait()
+            if renderer.retired:
+                return
+
+            self._restarts += 1
+            logger.warning(
+                f"SSR renderer {process.pid if process else None} exited"
+                f" with code {process.returncode if process else None}, restarting it"
+            )
+            await asyncio.sleep(self.restart_delay)
+
+    def _recycle(self, renderer: _Renderer) -> None:
+        """
+        Replace a renderer by a new one. The old one is stopped once idle
+        :param renderer: The renderer to recycle
+        """
+        renderer.retired = True
+        self._recycled += 1
+        if renderer in self._renderers:
+            self._renderers[self._renderers.index(renderer)] = self._spawn()
+
+    async def _stop(self, renderer: _Renderer) -> None:
+        """
+        Stop a renderer and the task restarting it
+        :param renderer: The renderer
+        """
+        renderer.retired = True
+        await renderer.transport.aclose()
+        if renderer.watcher is not None:
+            renderer.watcher.cancel()
+            await asyncio.gather(renderer.watcher, return_exceptions=True)
+
+    def _run_in_background(self, coroutine: Coroutine[Any, Any, None]) -> None:
+        """
+        Run a coroutine in a task, keeping a reference to it until it is done
+        :param coroutine: The coroutine
+        """
+        task = asyncio.ensure_future(coroutine)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+
+class SSREndpointStats(TypedDict):
+    """
+    Metrics of an endpoint of the LoadBalancedSSRTransport
+    """
+
+    name: str
+    state: CircuitState
+    outstanding: int
+    renders: int
+
+
+class _Endpoint:
+    """
+    Endpoint of the LoadBalancedSSRTransport
+    """
+
+    def __init__(
+        self, name: str, transport: SSRTransport, breaker: CircuitBreaker
+    ) -> None:
+        """
+        Constructor
+        :param name: The name of the endpoint
+        :param transport: The transport to the endpoint
+        :param breaker: The circuit breaker ejecting the endpoint while it is failing
+        """
+        self.name = name
+        self.transport = transport
+        self.breaker = breaker
+        self.outstanding = 0
+        self.renders = 0
+
+    def stats(self) -> SSREndpointStats:
+        """
+        Get the endpoint metrics
+        :return: The metrics
+        """
+        return {
+            "name": self.name,
+            "state": self.breaker.state,
+            "outstanding": self.outstanding,
+            "renders": self.renders,
+        }
+
+
+class LoadBalancedSSRTransport(SSRTransport):
+    """
+    Transport spreading the pages over several SSR endpoints.
+
+    Pages of a same component go to the same endpoint, picked by consistent hashing
+    on the component, so that the renderers keep their JS modules warm.
+    An endpoint is ejected by its own circuit breaker after `failure_threshold`
+    consecutive failures, its pages going to the next endpoints on the hash ring,
+    and is probed again after `reset_timeout` seconds. When the preferred endpoint
+    already has `max_outstanding` outstanding renders, or the component is unknown,
+    the page goes to the healthy endpoint with the fewest outstanding renders.
+
+    With `hedge_percentile`, a page the endpoint has not rendered within that
+    percentile of the recent render latencies is also sent to another endpoint:
+    the first successful response wins, and the other render is cancelled.
+    At most `max_hedge_rate` of the renders are hedged, so that hedges cannot
+    amplify an overload.
+    """
+
+    _endpoints: Dict[str, _Endpoint]
+    _ring: List[Tuple[int, str]]
+
+    def __init__(
+        self,
+        transports: Mapping[str, SSRTransport],
+        max_outstanding: int = 8,
+        failure_threshold: int = 3,
+        reset_timeout: float = 10.0,
+        replicas: int = 64,
+        hedge_percentile: Optional[float] = None,
+        max_hedge_rate: float = 0.1,
+        hedge_window: int = 200,
+        hedge_min_samples: int = 20,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Constructor
+        :param transports: The transports to the endpoints, by endpoint name (e.g. URL)
+        :param max_outstanding: Number of outstanding renders from which an endpoint is saturated
+        :param failure_threshold: Number of consecutive failures ejecting an endpoint
+        :param reset_timeout: Time, in seconds, after which an ejected endpoint is probed again
+        :param replicas: Number of points of each endpoint on the hash ring
+        :param hedge_percentile: Percentile (between 0 and 1) of the render latencies
+            after which a render is hedged, None to never hedge renders
+        :param max_hedge_rate: Maximum rate (between 0 and 1) of hedged renders
+        :param hedge_window: Number of renders over which the latencies and the
+            hedge rate are computed
+        :param hedge_min_samples: Minimum number of latencies before renders are hedged
+        :param clock: Monotonic clock, in seconds
+        """
+        if not transports:
+            raise ValueError("At least one SSR endpoint is required")
+
+        self.max_outstanding = max_outstanding
+        self.hedge_percentile = hedge_percentile
+        self.max_hedge_rate = max_hedge_rate
+        self.hedge_min_samples = hedge_min_samples
+        self.hedges = 0
+        self.hedges_won = 0
+        self._clock = clock
+        self._latencies: Deque[float] = deque(maxlen=hedge_window)
+        self._latencies_recorded = 0
+        self._hedged: Deque[bool] = deque(maxlen=hedge_window)
+        self._hedge_delay: Optional[float] = None
+        self._endpoints = {
+            name: _Endpoint(
+                name,
+                transport,
+                CircuitBreaker(
+                    failure_threshold=failure_threshold,
+                    reset_timeout=reset_timeout,
+                    clock=clock,
+                ),
+            )
+            for name, transport in transports.items()
+        }
+        self._ring = sorted(
+            (_hash(f"{name}#{replica}"), name)
+            for name in self._endpoints
+            for replica in range(replicas)
+        )
+
+    async def render(
+        self,
+        page_json: bytes,
+        component: Optional[str] = None,
+        client: Union["httpx.AsyncClient", None] = None,
+    ) -> bytes:
+        """
+        Send a page to an endpoint
+        :param page_json: The serialized page data
+        :param component: The component of the page
+        :param client: httpx client to use instead of the pooled ones, for HTTP endpoints
+        :raises SSRUnavailableException: If every endpoint is ejected
+        :return: The serialized response of the endpoint
+        """
+        endpoint = self._pick(component)
+        if self.hedge_percentile is None or len(self._endpoints) < 2:
+            return await self._render_on(endpoint, page_json, component, client)
+
+        started_at = self._clock()
+        first = asyncio.ensure_future(
+            self._render_on(endpoint, page_json, component, client)
+        )
+        try:
+            delay = self._get_hedge_delay()
+            if delay is not None:
+                await asyncio.wait({first}, timeout=delay)
+            if delay is None or first.done() or not self._may_hedge():
+                self._record_hedge(False)
+                return await first
+
+            second_endpoint = self._pick_least_loaded(exclude=endpoint)
+            if second_endpoint is None:
+                self._record_hedge(False)
+                return await first
+            self._record_hedge(True)
+            second = asyncio.ensure_future(
+                self._render_on(second_endpoint, page_json, component, client)
+            )
+        except BaseException:
+            first.cancel()
+            raise
+
+        try:
+            return await self._first_success(first, second)
+        finally:
+            if not first.done():
+                # The first render is cancelled, but it was slow: its latency is at
+                # least the time it ran for, which keeps the hedge delay from drifting
+                self._record_latency(self._clock() - started_at)
+            for task in (first, second):
+                task.cancel()
+                task.add_done_callback(_retrieve_exception)
+
+    async def _first_success(
+        self, first: "asyncio.Future[bytes]", second: "asyncio.Future[bytes]"
+    ) -> bytes:
+        """
+        Wait for the first successful render of a hedged page
+        :param first: The first render
+        :param second: The hedged render
+        :return: The serialized response of the first successful render
+        """
+        pending = {first, second}
+        while True:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    if task is second:
+                        self.hedges_won += 1
+                    return task.result()
+            if not pending:
+                # Both renders failed: raise the error of the first one
+                return first.result()
+
+    async def _render_on(
+        self,
+        endpoint: _Endpoint,
+        page_json: bytes,
+        component: Optional[str],
+        client: Union["httpx.AsyncClient", None],
+    ) -> bytes:
+        """
+        Send a page to an endpoint, recording the outcome and the latency of the render
+        :param endpoint: The endpoint
+        :param page_json: The serialized page data
+        :param component: The component of the page
+        :param client: httpx client to use instead of the pooled ones, for HTTP endpoints
+        :return: The serialized response of the endpoint
+        """
+        started_at = self._clock()
+        endpoint.outstanding += 1
+        try:
+            if client is not None and isinstance(endpoint.transport, HTTPSSRTransport):
+                content = await endpoint.transport.render(
+                    page_json, component, client=client
+                )
+            else:
+                content = await endpoint.transport.render(page_json, component)
+        except asyncio.CancelledError:
+            # A cancelled render (lost hedge, missed deadline...) does not mean the
+            # endpoint is failing, but a cancelled probe must free its slot
+            endpoint.breaker.record_cancellation()
+            raise
+        except BaseException:
+            endpoint.breaker.record_failure()
+            raise
+        finally:
+            endpoint.outstanding -= 1
+            endpoint.renders += 1
+        endpoint.breaker.record_success()
+        self._record_latency(self._clock() - started_at)
+        return content
+
+    async def start(self) -> None:
+        """
+        Start the transports to the endpoints
+        """
+        await asyncio.gather(
+            *(endpoint.transport.start() for endpoint in self._endpoints.values())
+        )
+
+    async def health(self) -> bool:
+        """
+        Check if at least one endpoint is up
+        :return: True if an endpoint is up, False otherwise
+        """
+        results = await asyncio.gather(
+            *(endpoint.transport.health() for endpoint in self._endpoints.values()),
+            return_exceptions=True,
+        )
+        return any(result is True for result in results)
+
+    async def aclose(self) -> None:
+        """
+        Close the transports to the endpoints
+        """
+        await asyncio.gather(
+            *(endpoint.transport.aclose() for endpoint in self._endpoints.values())
+        )
+
+    def stats(self) -> List[SSREndpointStats]:
+        """
+        Get the metrics of the endpoints
+        :return: The metrics
+        """
+        return [endpoint.stats() for endpoint in self._endpoints.values()]
+
+    def _pick(self, component: Optional[str]) -> _Endpoint:
+        """
+        Pick the endpoint a page is sent to
+        :param component: The component of the page
+        :raises SSRUnavailableException: If every endpoint is ejected
+        :return: The endpoint
+        """
+        if component is not None:
+            preferred = self._preferred(component)
+            if (
+                preferred is not None
+                and preferred.outstanding < self.max_outstanding
+                and preferred.breaker.allow_request()
+            ):
+                return preferred
+
+        endpoint = self._pick_least_loaded()
+        if endpoint is None:
+            raise SSRUnavailableException("Every SSR endpoint is ejected")
+        return endpoint
+
+    def _pick_least_loaded(
+        self, exclude: Optional[_Endpoint] = None
+    ) -> Optional[_Endpoint]:
+        """
+        Pick the healthy endpoint with the fewest outstanding renders
+        :param exclude: Endpoint not to pick
+        :return: The endpoint, or None if every endpoint is ejected
+        """
+        for endpoint in sorted(
+            self._endpoints.values(), key=lambda candidate: candidate.outstanding
+        ):
+            if (
+                endpoint is not exclude
+                and endpoint.breaker.state != "open"
+                and endpoint.breaker.allow_request()
+            ):
+                return endpoint
+        return None
+
+    def _get_hedge_delay(self) -> Optional[float]:
+        """
+        Get the time after which a render is hedged, computed from the recent
+        latencies once there are enough of them
+        :return: The delay, in seconds, or None if there are not enough latencies
+        """
+        if self._hedge_delay is None and len(self._latencies) >= self.hedge_min_samples:
+            latencies = sorted(self._latencies)
+            self._hedge_delay = latencies[
+                int((len(latencies) - 1) * (self.hedge_percentile or 0.0))
+            ]
+        return self._hedge_delay
+
+    def _record_latency(self, latency: float) -> None:
+        """
+        Record the latency of a successful render, or of a slow render
+        cancelled because its hedge won
+        :param latency: The latency, in seconds
+        """
+        self._latencies.append(latency)
+        self._latencies_recorded += 1
+        # Recomputed lazily, every few renders
+        if self._latencies_recorded % 16 == 0:
+            self._hedge_delay = None
+
+    def _may_hedge(self) -> bool:
+        """
+        Check if a render can be hedged without exceeding the hedge rate
+        :return: True if the render can be hedged, False otherwise
+        """
+        return sum(self._hedged) + 1 <= self.max_hedge_rate * (len(self._hedged) + 1)
+
+    def _record_hedge(self, hedged: bool) -> None:
+        """
+        Record whether a render was hedged
+        :param hedged: Whether the render was hedged
+        """
+        self._hedged.append(hedged)
+        if hedged:
+            self.hedges += 1
+
+    def _preferred(self, component: str) -> Optional[_Endpoint]:
+        """
+        Get the first endpoint that is not ejected, walking the hash ring
+        clockwise from the hash of the component
+        :param component: The component of the page
+        :return: The endpoint, or None if every endpoint is ejected
+        """
+        start = bisect.bisect(self._ring, (_hash(component), ""))
+        for index in range(len(self._ring)):
+            endpoint = self._endpoints[self._ring[(start + index) % len(self._ring)][1]]
+            if endpoint.breaker.state != "open":
+                return endpoint
+        return None
+
+
+def _hash(key: str) -> int:
+    """
+    Hash a key on the hash ring
+    :param key: The key
+    :return: The hash
+    """
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+def _retrieve_exception(task: "asyncio.Future[bytes]") -> None:
+    """
+    Retrieve the exception of a hedged render, so that it is not reported as
+    never retrieved when the other render won
+    :param task: The render
+    """
+    if not task.cancelled():
+        task.exception()
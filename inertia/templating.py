@@ -6,11 +6,18 @@ from markupsafe import Markup
 
 from .utils import InertiaContext
 
+HEAD_MARKER = "\0inertia_head\0"
+BODY_MARKER = "\0inertia_body\0"
+
 
 class InertiaExtension(Extension):
     """
     Jinja2 extension for Inertia.js that adds the inertia_head and inertia_body tags
     to a jinja environment to render the head and body of the Inertia.js page.
+
+    When the context is `split`, the page is streamed: the assets are rendered in the
+    head, followed by the HEAD_MARKER where the SSR head goes, and the body is rendered
+    as the BODY_MARKER, both being replaced once the page is rendered.
     """
 
     tags = set(["inertia_head", "inertia_body"])
@@ -24,15 +31,29 @@ class InertiaExtension(Extension):
         return nodes.Output([node]).set_lineno(lineno)
 
     def _render_inertia_head(self, context: Context) -> Markup:
-        fragments: list[str] = []
+        return Markup(self.render_head(context["inertia"]))
+
+    def _render_inertia_body(self, context: Context) -> Markup:
         inertia: InertiaContext = context["inertia"]
+        if inertia.split:
+            return Markup(BODY_MARKER)
+        return Markup(self.render_body(inertia))
+
+    @staticmethod
+    def render_head(inertia: InertiaContext) -> str:
+        """
+        Render the head of the Inertia.js page
+        :param inertia: The Inertia context
+        :return: The HTML of the head
+        """
+        fragments: list[str] = []
 
         if inertia.environment == "development":
             fragments.append(
                 f'<script type="module" src="{inertia.dev_url}/@vite/client"></script>'
             )
 
-        if inertia.is_ssr:
+        if inertia.is_ssr and not inertia.split:
             if inertia.ssr_head is None:
                 raise ValueError("SSR is enabled but no SSR head was provided")
             fragments.append(inertia.ssr_head)
@@ -41,11 +62,19 @@ class InertiaExtension(Extension):
             for css_file in inertia.css:
                 fragments.append(f'<link rel="stylesheet" href="{css_file}">')
 
-        return Markup("\n".join(fragments))
+        if inertia.split:
+            fragments.append(HEAD_MARKER)
 
-    def _render_inertia_body(self, context: Context) -> Markup:
+        return "\n".join(fragments)
+
+    @staticmethod
+    def render_body(inertia: InertiaContext) -> str:
+        """
+        Render the body of the Inertia.js page
+        :param inertia: The Inertia context
+        :return: The HTML of the body
+        """
         fragments: list[str] = []
-        inertia: InertiaContext = context["inertia"]
         if inertia.is_ssr:
             if inertia.ssr_body is None:
                 raise ValueError("SSR is enabled but no SSR body was provided")
@@ -56,4 +85,4 @@ class InertiaExtension(Extension):
             fragments.append(f"<div id=\"app\" data-page='{inertia.data}'></div>")
 
         fragments.append(f'<script type="module" src="{inertia.js}"></script>')
-        return Markup("\n".join(fragments))
+        return "\n".join(fragments)
@@ -0,0 +1,93 @@
+"""
+Python stand-ins for the Inertia SSR renderer, to test the SSR transports without Node.
+
+Run as a script, the renderer speaks the length-prefixed protocol of the
+StdioSSRTransport over its stdin and stdout. `serve_http` is a connection handler
+for `asyncio.start_server` / `asyncio.start_unix_server` speaking enough HTTP/1.1
+to serve the `/render` endpoint of the Inertia SSR server, and with `batch=True` a
+`/render-batch` endpoint rendering a JSON array of pages.
+
+Pages whose component is "Crash" make the renderer exit, and pages whose component
+is "Slow" are rendered after a second. In a batch, pages whose component is "Error"
+are reported as errors.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import struct
+import sys
+import time
+from typing import Any, Dict, List
+
+FRAME_HEADER = struct.Struct(">I")
+RENDERER_PATH = os.path.abspath(__file__)
+
+
+def render_page(page: Dict[str, Any]) -> Dict[str, Any]:
+    if page["component"] == "Crash":
+        os._exit(1)
+    if page["component"] == "Slow":
+        time.sleep(1)
+    return {
+        "head": [f"<title>{page['component']}</title>"],
+        "body": f'<div id="app">{page["component"]} rendered by {os.getpid()}</div>',
+    }
+
+
+def render_batch(pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {"error": f"{page['component']} cannot be rendered"}
+        if page["component"] == "Error"
+        else render_page(page)
+        for page in pages
+    ]
+
+
+async def serve_http(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, batch: bool = False
+) -> None:
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.decode().partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            if headers.get("content-encoding") == "gzip":
+                body = gzip.decompress(body)
+
+            if request_line.split()[:2] == [b"POST", b"/render"]:
+                status, content = b"200 OK", json.dumps(render_page(json.loads(body)))
+            elif batch and request_line.split()[:2] == [b"POST", b"/render-batch"]:
+                status, content = b"200 OK", json.dumps(render_batch(json.loads(body)))
+            elif request_line.split()[:2] == [b"GET", b"/health"]:
+                status, content = b"200 OK", json.dumps({"status": "OK"})
+            else:
+                status, content = b"404 Not Found", "{}"
+            payload = content.encode()
+            writer.write(
+                b"HTTP/1.1 " + status + b"\r\n"
+                b"Content-Type: application/json\r\n"
+                b"Content-Length: " + str(len(payload)).encode() + b"\r\n\r\n" + payload
+            )
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+def serve_stdio() -> None:
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+    while header := stdin.read(FRAME_HEADER.size):
+        (size,) = FRAME_HEADER.unpack(header)
+        response = json.dumps(render_page(json.loads(stdin.read(size)))).encode()
+        stdout.write(FRAME_HEADER.pack(len(response)) + response)
+        stdout.flush()
+
+
+if __name__ == "__main__":
+    serve_stdio()
@@ -0,0 +1,135 @@
+import json
+import os
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from starlette.testclient import TestClient
+
+from inertia import InertiaConfig
+from inertia import assets, utils
+
+from .utils import assert_response_content, create_app, manifest_json, templates
+
+COMPONENT = "IndexPage"
+
+
+def write_manifest(path: Path, js_file: str) -> None:
+    with open(manifest_json, "r") as manifest_file:
+        manifest = json.load(manifest_file)
+    manifest["src/main.js"]["file"] = js_file
+    path.write_text(json.dumps(manifest))
+
+
+def test_manifest_is_resolved_once_when_the_dependency_is_created() -> None:
+    with patch.object(
+        assets, "_read_manifest_file", wraps=utils._read_manifest_file
+    ) as read_manifest_mock:
+        config = InertiaConfig(
+            manifest_json_path=manifest_json,
+            environment="production",
+            templates=templates,
+        )
+        app = create_app(config, {})
+        assert read_manifest_mock.call_count == 1
+
+        with TestClient(app) as client:
+            for _ in range(3):
+                response = client.get("/")
+                assert response.status_code == 200
+
+        assert read_manifest_mock.call_count == 1
+
+
+def test_manifest_is_not_reloaded_by_default(tmp_path: Path) -> None:
+    manifest_path = tmp_path / "manifest.json"
+    write_manifest(manifest_path, "assets/main-first.js")
+    app = create_app(
+        InertiaConfig(
+            manifest_json_path=str(manifest_path),
+            environment="production",
+            templates=templates,
+        ),
+        {},
+    )
+
+    with TestClient(app) as client:
+        write_manifest(manifest_path, "assets/main-second.js")
+        os.utime(manifest_path, (0, 0))
+        response = client.get("/")
+        assert_response_content(
+            response, expected_script_asset_url="/assets/main-first.js"
+        )
+
+
+def test_manifest_is_reloaded_when_it_changes_if_enabled(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(assets, "MANIFEST_CHECK_INTERVAL", 0)
+    manifest_path = tmp_path / "manifest.json"
+    write_manifest(manifest_path, "assets/main-first.js")
+    app = create_app(
+        InertiaConfig(
+            manifest_json_path=str(manifest_path),
+            environment="production",
+            manifest_auto_reload=True,
+            templates=templates,
+        ),
+        {},
+    )
+
+    with TestClient(app) as client:
+        response = client.get("/")
+        assert_response_content(
+            response, expected_script_asset_url="/assets/main-first.js"
+        )
+
+        write_manifest(manifest_path, "assets/main-second.js")
+        os.utime(manifest_path, (0, 0))
+        response = client.get("/")
+        assert_response_content(
+            response, expected_script_asset_url="/assets/main-second.js"
+        )
+
+
+def test_manifest_changes_are_checked_at_most_once_per_interval(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    now = 100.0
+    # Only the clock of the assets module is frozen, not the one of the event loop
+    monkeypatch.setattr("inertia.assets.time", SimpleNamespace(monotonic=lambda: now))
+    manifest_path = tmp_path / "manifest.json"
+    write_manifest(manifest_path, "assets/main-first.js")
+    app = create_app(
+        InertiaConfig(
+            manifest_json_path=str(manifest_path),
+            environment="production",
+            manifest_auto_reload=True,
+            templates=templates,
+        ),
+        {},
+    )
+
+    with TestClient(app) as client:
+        with patch.object(os.path, "getmtime", wraps=os.path.getmtime) as getmtime_mock:
+            client.get("/")
+            write_manifest(manifest_path, "assets/main-second.js")
+            os.utime(manifest_path, (0, 0))
+            for _ in range(3):
+                response = client.get("/")
+                assert_response_content(
+                    response, expected_script_asset_url="/assets/main-first.js"
+                )
+            manifest_checks = [
+                call
+                for call in getmtime_mock.call_args_list
+                if call.args == (str(manifest_path),)
+            ]
+            assert len(manifest_checks) == 1
+
+            now += assets.MANIFEST_CHECK_INTERVAL
+            response = client.get("/")
+            assert_response_content(
+                response, expected_script_asset_url="/assets/main-second.js"
+            )
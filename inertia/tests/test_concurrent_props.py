@@ -0,0 +1,143 @@
+import asyncio
+from typing import Annotated, Any, Callable, Coroutine, Optional
+
+import pytest
+from fastapi import FastAPI, Depends
+from starlette.testclient import TestClient
+
+from inertia import (
+    Inertia,
+    inertia_dependency_factory,
+    InertiaResponse,
+    InertiaConfig,
+    lazy,
+)
+
+from .utils import templates
+
+COMPONENT = "IndexPage"
+
+
+class InFlightCounter:
+    def __init__(self) -> None:
+        self.current = 0
+        self.maximum = 0
+
+    def prop(
+        self, value: Any, delay: float = 0.01
+    ) -> Callable[[], Coroutine[Any, Any, Any]]:
+        async def resolve() -> Any:
+            self.current += 1
+            self.maximum = max(self.maximum, self.current)
+            await asyncio.sleep(delay)
+            self.current -= 1
+            return value
+
+        return resolve
+
+
+def create_app(
+    counter: InFlightCounter,
+    concurrent_props: bool = True,
+    props_max_concurrency: Optional[int] = None,
+) -> FastAPI:
+    app = FastAPI()
+    InertiaDep = Annotated[
+        Inertia,
+        Depends(
+            inertia_dependency_factory(
+                InertiaConfig(
+                    templates=templates,
+                    concurrent_props=concurrent_props,
+                    props_max_concurrency=props_max_concurrency,
+                )
+            )
+        ),
+    ]
+
+    @app.get("/", response_model=None)
+    async def index(inertia: InertiaDep) -> InertiaResponse:
+        return await inertia.render(
+            COMPONENT,
+            {
+                "first": counter.prop("first"),
+                "static": "static",
+                "nested": {
+                    "second": counter.prop("second"),
+                    "list": [counter.prop("third"), "fourth"],
+                },
+                "returns_callable": counter.prop(counter.prop({"deep": "value"})),
+                "lazy": lazy(counter.prop("lazy")),
+            },
+        )
+
+    @app.get("/errors", response_model=None)
+    async def errors(inertia: InertiaDep) -> InertiaResponse:
+        async def fails(message: str, delay: float) -> None:
+            await asyncio.sleep(delay)
+            raise ValueError(message)
+
+        return await inertia.render(
+            COMPONENT,
+            {
+                "first": lambda: fails("first", 0.05),
+                "second": lambda: fails("second", 0),
+            },
+        )
+
+    return app
+
+
+EXPECTED_PROPS = {
+    "first": "first",
+    "static": "static",
+    "nested": {"second": "second", "list": ["third", "fourth"]},
+    "returns_callable": {"deep": "value"},
+}
+
+
+def test_props_are_resolved_concurrently_in_the_same_structure() -> None:
+    counter = InFlightCounter()
+    with TestClient(create_app(counter)) as client:
+        response = client.get("/", headers={"X-Inertia": "true"})
+        assert response.status_code == 200
+        assert response.json()["props"] == EXPECTED_PROPS
+        assert list(response.json()["props"].keys()) == list(EXPECTED_PROPS.keys())
+    assert counter.maximum == 4
+
+
+def test_props_concurrency_is_capped() -> None:
+    counter = InFlightCounter()
+    with TestClient(create_app(counter, props_max_concurrency=2)) as client:
+        response = client.get("/", headers={"X-Inertia": "true"})
+        assert response.json()["props"] == EXPECTED_PROPS
+    assert counter.maximum == 2
+
+
+def test_props_are_resolved_sequentially_by_default() -> None:
+    counter = InFlightCounter()
+    with TestClient(create_app(counter, concurrent_props=False)) as client:
+        response = client.get("/", headers={"X-Inertia": "true"})
+        assert response.json()["props"] == EXPECTED_PROPS
+    assert counter.maximum == 1
+
+
+def test_lazy_props_are_resolved_concurrently_on_partial_reloads() -> None:
+    counter = InFlightCounter()
+    with TestClient(create_app(counter)) as client:
+        response = client.get(
+            "/",
+            headers={
+                "X-Inertia": "true",
+                "X-Inertia-Partial-Data": "first,lazy",
+                "X-Inertia-Partial-Component": COMPONENT,
+            },
+        )
+        assert response.json()["props"] == {"first": "first", "lazy": "lazy"}
+    assert counter.maximum == 2
+
+
+def test_first_error_in_props_order_is_raised() -> None:
+    with TestClient(create_app(InFlightCounter())) as client:
+        with pytest.raises(ValueError, match="first"):
+            client.get("/errors", headers={"X-Inertia": "true"})
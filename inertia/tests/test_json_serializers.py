@@ -0,0 +1,154 @@
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Union
+from uuid import UUID
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from starlette.testclient import TestClient
+
+from inertia import (
+    InertiaConfig,
+    InertiaJsonEncoder,
+    JsonSerializer,
+    OrjsonSerializer,
+    StdlibJsonSerializer,
+)
+
+from .utils import assert_response_content, create_app, templates
+
+COMPONENT = "IndexPage"
+CREATED_AT = datetime(2024, 7, 18, 12, 30, 15, 123456)
+ID = UUID("12345678-1234-5678-1234-567812345678")
+
+
+class Person(BaseModel):
+    name: str
+    created_at: datetime
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
+
+
+PROPS = {
+    "person": Person(name="Jane Doe", created_at=CREATED_AT),
+    "created_at": CREATED_AT,
+    "id": ID,
+    "point": Point(x=1, y=2),
+    "by_id": {1: "one"},
+    "text": "l'été <b>&</b>",
+}
+EXPECTED_PROPS = {
+    "person": {"name": "Jane Doe", "created_at": CREATED_AT.isoformat()},
+    "created_at": CREATED_AT.isoformat(),
+    "id": str(ID),
+    "point": {"x": 1, "y": 2},
+    "by_id": {"1": "one"},
+    "text": "l'été <b>&</b>",
+}
+
+
+class CountingSerializer(StdlibJsonSerializer):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def dumps(self, value: Any) -> bytes:
+        self.calls += 1
+        return super().dumps(value)
+
+
+def serializers() -> list[JsonSerializer]:
+    serializers_: list[JsonSerializer] = [StdlibJsonSerializer()]
+    try:
+        serializers_.append(OrjsonSerializer())
+    except ImportError:
+        pass
+    return serializers_
+
+
+@pytest.mark.parametrize("serializer", serializers())
+def test_serializers_encode_json_responses(serializer: JsonSerializer) -> None:
+    app = create_app(
+        InertiaConfig(templates=templates, json_serializer=serializer), PROPS
+    )
+    with TestClient(app) as client:
+        response = client.get("/", headers={"X-Inertia": "true"})
+        assert response.status_code == 200
+        assert response.headers.get("content-type").split(";")[0] == "application/json"
+        assert response.json()["props"] == EXPECTED_PROPS
+
+
+@pytest.mark.parametrize("serializer", serializers())
+def test_serializers_encode_html_responses(serializer: JsonSerializer) -> None:
+    app = create_app(
+        InertiaConfig(templates=templates, json_serializer=serializer), PROPS
+    )
+    with TestClient(app) as client:
+        response = client.get("/")
+        assert response.status_code == 200
+        assert "<b>" not in response.text
+        assert_response_content(response, expected_props=EXPECTED_PROPS)
+
+
+@pytest.mark.parametrize("serializer", serializers())
+def test_serializers_encode_integers_beyond_64_bits(
+    serializer: JsonSerializer,
+) -> None:
+    data = serializer.dumps({"big": 2**70, "created_at": CREATED_AT})
+    assert serializer.loads(data) == {
+        "big": 2**70,
+        "created_at": CREATED_AT.isoformat(),
+    }
+
+
+def test_orjson_serializer_needs_orjson(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("inertia.serializers.orjson", None)
+    with pytest.raises(ImportError):
+        OrjsonSerializer()
+
+
+def test_custom_serializer_is_used_for_every_response() -> None:
+    serializer = CountingSerializer()
+    app = create_app(
+        InertiaConfig(templates=templates, json_serializer=serializer), PROPS
+    )
+    with TestClient(app) as client:
+        client.get("/")
+        client.get("/", headers={"X-Inertia": "true"})
+    assert serializer.calls == 2
+
+
+def test_orjson_is_used_by_default_when_installed() -> None:
+    pytest.importorskip("orjson")
+    config = InertiaConfig(templates=templates)
+    assert isinstance(config.serializer, OrjsonSerializer)
+
+
+def test_custom_json_encoder_is_used_by_default() -> None:
+    class CustomEncoder(InertiaJsonEncoder):
+        def encode(self, value: Any) -> str:
+            return super().encode({"wrapped": value})
+
+    config = InertiaConfig(templates=templates, json_encoder=CustomEncoder)
+    assert isinstance(config.serializer, StdlibJsonSerializer)
+    data: Union[bytes, str] = config.serializer.dumps({"key": CREATED_AT})
+    assert json.loads(data) == {"wrapped": {"key": CREATED_AT.isoformat()}}
+
+
+def test_legacy_json_encoder_returning_data_is_supported() -> None:
+    class LegacyEncoder(InertiaJsonEncoder):
+        def encode(self, value: Any) -> Any:
+            return jsonable_encoder({"wrapped": value})
+
+    app = create_app(
+        InertiaConfig(templates=templates, json_encoder=LegacyEncoder), PROPS
+    )
+    with TestClient(app) as client:
+        response = client.get("/", headers={"X-Inertia": "true"})
+        assert response.json()["wrapped"]["props"] == EXPECTED_PROPS
@@ -71,3 +71,14 @@ def test_partial_reload_include_lazy() -> None:
             "url": f"{client.base_url}/",
             "version": "1.0",
         }
+
+
+async def test_lazy_props_can_be_called() -> None:
+    async def resolve() -> str:
+        return "hello from async lazy callable"
+
+    assert (
+        await lazy(lambda: "hello from lazy callable")() == "hello from lazy callable"
+    )
+    assert await lazy(resolve)() == "hello from async lazy callable"
+    assert await lazy("hello from lazy value")() == "hello from lazy value"
@@ -0,0 +1,143 @@
+from datetime import date, datetime
+from enum import Enum
+from json import JSONEncoder
+from typing import Annotated, Any
+from uuid import UUID
+from unittest.mock import patch
+
+import pytest
+
+from fastapi import FastAPI, Depends
+from fastapi.encoders import jsonable_encoder
+from starlette.testclient import TestClient
+
+from inertia import (
+    Inertia,
+    inertia_dependency_factory,
+    InertiaResponse,
+    InertiaConfig,
+    StdlibJsonSerializer,
+)
+
+from .utils import assert_response_content, templates
+
+COMPONENT = "IndexPage"
+CREATED_AT = datetime(2024, 7, 18, 12, 30, 15)
+USER_ID = UUID("6f1c7b5e-3c1a-4f0e-9d5b-2a8e4c6f0b1d")
+
+
+class Status(Enum):
+    OPEN = "open"
+    CLOSED = "closed"
+
+
+class Money:
+    def __init__(self, cents: int) -> None:
+        self.cents = cents
+
+
+class MoneyEncoder(JSONEncoder):
+    def default(self, value: Any) -> Any:
+        if isinstance(value, Money):
+            return f"{value.cents / 100:.2f}"
+        return super().default(value)
+
+
+def create_app(config: InertiaConfig) -> FastAPI:
+    app = FastAPI()
+    InertiaDep = Annotated[Inertia, Depends(inertia_dependency_factory(config))]
+
+    @app.get("/primitives", response_model=None)
+    async def primitives(inertia: InertiaDep) -> InertiaResponse:
+        return await inertia.render(
+            COMPONENT,
+            {
+                "rows": [
+                    {"id": i, "label": f"row {i}", "ratio": i / 2} for i in range(3)
+                ],
+                "flag": True,
+                "empty": None,
+                "callable": lambda: {"nested": ["a", 1]},
+            },
+        )
+
+    @app.get("/mixed", response_model=None)
+    async def mixed(inertia: InertiaDep) -> InertiaResponse:
+        return await inertia.render(
+            COMPONENT, {"label": "mixed", "created_at": lambda: CREATED_AT}
+        )
+
+    @app.get("/money", response_model=None)
+    async def money(inertia: InertiaDep) -> InertiaResponse:
+        return await inertia.render(COMPONENT, {"price": Money(1234)})
+
+    @app.get("/keys", response_model=None)
+    async def keys(inertia: InertiaDep) -> InertiaResponse:
+        return await inertia.render(
+            COMPONENT,
+            {
+                "counts": {Status.OPEN: 3, Status.CLOSED: lambda: 5},
+                "sales": {date(2024, 7, 18): 12, CREATED_AT: 7},
+                "names": lambda: {USER_ID: "Alice"},
+            },
+        )
+
+    return app
+
+
+def test_json_primitives_are_not_passed_to_the_encoder() -> None:
+    app = create_app(
+        InertiaConfig(templates=templates, json_serializer=StdlibJsonSerializer())
+    )
+    with patch(
+        "inertia.inertia.jsonable_encoder", wraps=jsonable_encoder
+    ) as encoder_mock:
+        with TestClient(app) as client:
+            response = client.get("/primitives", headers={"X-Inertia": "true"})
+    assert response.json()["props"]["callable"] == {"nested": ["a", 1]}
+    encoder_mock.assert_not_called()
+
+
+def test_only_other_values_are_encoded_while_resolving() -> None:
+    app = create_app(
+        InertiaConfig(templates=templates, json_serializer=StdlibJsonSerializer())
+    )
+    with patch(
+        "inertia.inertia.jsonable_encoder", wraps=jsonable_encoder
+    ) as encoder_mock:
+        with TestClient(app) as client:
+            response = client.get("/mixed")
+    assert_response_content(
+        response,
+        expected_props={"label": "mixed", "created_at": CREATED_AT.isoformat()},
+    )
+    encoder_mock.assert_called_once_with(CREATED_AT)
+
+
+def test_custom_json_encoder_still_encodes_values() -> None:
+    app = create_app(InertiaConfig(templates=templates, json_encoder=MoneyEncoder))
+    with TestClient(app) as client:
+        response = client.get("/money", headers={"X-Inertia": "true"})
+    assert response.json()["props"] == {"price": "12.34"}
+
+
+@pytest.mark.parametrize("concurrent_props", [False, True])
+def test_non_primitive_dict_keys_are_encoded(concurrent_props: bool) -> None:
+    app = create_app(
+        InertiaConfig(
+            templates=templates,
+            json_serializer=StdlibJsonSerializer(),
+            concurrent_props=concurrent_props,
+        )
+    )
+    expected_props = {
+        "counts": {"open": 3, "closed": 5},
+        "sales": {"2024-07-18": 12, CREATED_AT.isoformat(): 7},
+        "names": {str(USER_ID): "Alice"},
+    }
+    with TestClient(app) as client:
+        response = client.get("/keys", headers={"X-Inertia": "true"})
+        assert response.json()["props"] == expected_props
+
+        response = client.get("/keys")
+        assert_response_content(response, expected_props=expected_props)
@@ -0,0 +1,124 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+from starlette.types import Message
+
+from inertia import InertiaConfig
+
+from .utils import create_app, templates
+
+PROPS = {"message": "hello from index"}
+MANIFEST = {
+    "src/main.js": {
+        "file": "assets/main-DOVmxSVH.js",
+        "src": "src/main.js",
+        "isEntry": True,
+        "imports": ["_vendor-Bq3x1Yf2.js", "_utils-C9dTz0aX.js"],
+        "dynamicImports": ["src/pages/Admin.js"],
+        "css": ["assets/main-jJL2BnPz.css"],
+    },
+    "_vendor-Bq3x1Yf2.js": {
+        "file": "assets/vendor-Bq3x1Yf2.js",
+        "css": ["assets/vendor-D1n4Kc8e.css"],
+    },
+    "_utils-C9dTz0aX.js": {
+        "file": "assets/utils-C9dTz0aX.js",
+        "imports": ["_vendor-Bq3x1Yf2.js"],
+    },
+    "src/pages/Admin.js": {
+        "file": "assets/Admin-Ax7mQe1L.js",
+        "isDynamicEntry": True,
+    },
+}
+LINKS = [
+    "</assets/main-DOVmxSVH.js>; rel=modulepreload",
+    "</assets/vendor-Bq3x1Yf2.js>; rel=modulepreload",
+    "</assets/utils-C9dTz0aX.js>; rel=modulepreload",
+    "</assets/main-jJL2BnPz.css>; rel=preload; as=style",
+    "</assets/vendor-D1n4Kc8e.css>; rel=preload; as=style",
+]
+
+
+def create_preloading_app(tmp_path: Path, **kwargs: object) -> FastAPI:
+    manifest_json = tmp_path / "manifest.json"
+    manifest_json.write_text(json.dumps(MANIFEST))
+    config = InertiaConfig(
+        templates=templates,
+        manifest_json_path=str(manifest_json),
+        **kwargs,  # type: ignore[arg-type]
+    )
+    return create_app(config, PROPS)
+
+
+async def request(app: FastAPI, extensions: Dict[str, Any]) -> List[Message]:
+    messages: List[Message] = []
+
+    async def receive() -> Message:
+        await asyncio.sleep(0)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("testserver", 80),
+        "extensions": extensions,
+    }
+    await app(scope, receive, send)
+    return messages
+
+
+def test_html_pages_preload_the_entrypoint_and_its_imports(tmp_path: Path) -> None:
+    client = TestClient(
+        create_preloading_app(tmp_path, environment="production", preload_links=True)
+    )
+
+    response = client.get("/")
+    assert response.headers["Link"] == ", ".join(LINKS)
+
+    response = client.get("/", headers={"X-Inertia": "true"})
+    assert "Link" not in response.headers
+
+
+def test_links_are_only_sent_when_enabled(tmp_path: Path) -> None:
+    client = TestClient(create_preloading_app(tmp_path, environment="production"))
+    assert "Link" not in client.get("/").headers
+
+    client = TestClient(create_preloading_app(tmp_path, preload_links=True))
+    assert "Link" not in client.get("/").headers
+
+
+async def test_early_hints_are_sent_before_the_response(tmp_path: Path) -> None:
+    app = create_preloading_app(tmp_path, environment="production", early_hints=True)
+
+    messages = await request(app, {"http.response.early_hint": {}})
+
+    assert [message["type"] for message in messages] == [
+        "http.response.early_hint",
+        "http.response.start",
+        "http.response.body",
+    ]
+    assert messages[0]["links"] == [link.encode() for link in LINKS]
+
+
+async def test_early_hints_need_server_support(tmp_path: Path) -> None:
+    app = create_preloading_app(tmp_path, environment="production", early_hints=True)
+
+    messages = await request(app, {})
+
+    assert messages[0]["type"] == "http.response.start"
@@ -0,0 +1,255 @@
+import asyncio
+import json
+import os
+import sys
+from dataclasses import replace
+from pathlib import Path
+from typing import Annotated, Dict, List, Optional
+
+import pytest
+from fastapi import FastAPI, Depends
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.testclient import TestClient
+
+from inertia import (
+    Inertia,
+    inertia_dependency_factory,
+    InertiaResponse,
+    InertiaConfig,
+    InertiaVersionConflictException,
+    inertia_version_conflict_exception_handler,
+    PrerenderMiddleware,
+    prerender,
+)
+from inertia.prerender import PrerenderManifest, main
+
+from .utils import assert_response_content, manifest_json, templates
+
+
+BASE_URL = "https://example.com"
+PROPS = {"message": "hello from index"}
+CONFIG = InertiaConfig(
+    templates=templates,
+    environment="production",
+    manifest_json_path=manifest_json,
+    version="1.0",
+)
+
+
+def create_app(config: InertiaConfig) -> FastAPI:
+    app = FastAPI()
+    app.add_exception_handler(
+        InertiaVersionConflictException,
+        inertia_version_conflict_exception_handler,  # type: ignore[arg-type]
+    )
+    app.state.renders = 0
+    InertiaDep = Annotated[Inertia, Depends(inertia_dependency_factory(config))]
+
+    @app.get("/", response_model=None)
+    async def index(inertia: InertiaDep) -> InertiaResponse:
+        app.state.renders += 1
+        return await inertia.render("IndexPage", PROPS)
+
+    @app.get("/blog/{slug}", response_model=None)
+    async def post(slug: str, inertia: InertiaDep) -> InertiaResponse:
+        app.state.renders += 1
+        return await inertia.render("Post", {"slug": slug})
+
+    @app.get("/api", response_model=None)
+    async def api() -> Dict[str, str]:
+        return {"status": "ok"}
+
+    return app
+
+
+app = create_app(CONFIG)
+
+
+async def test_pages_are_exported(tmp_path: Path) -> None:
+    manifest = await prerender(
+        create_app(CONFIG), ["/", "/blog/first-post"], str(tmp_path), BASE_URL
+    )
+
+    assert manifest == {
+        "version": "1.0",
+        "pages": {
+            "/": {"html": "index.html", "json": "index.json"},
+            "/blog/first-post": {
+                "html": "blog/first-post/index.html",
+                "json": "blog/first-post/index.json",
+            },
+        },
+    }
+    assert json.loads((tmp_path / "prerender.json").read_text()) == manifest
+    page = json.loads((tmp_path / "blog/first-post/index.json").read_text())
+    assert page == {
+        "component": "Post",
+        "props": {"slug": "first-post"},
+        "url": f"{BASE_URL}/blog/first-post",
+        "version": "1.0",
+    }
+    assert "data-page" in (tmp_path / "blog/first-post/index.html").read_text()
+
+
+async def test_only_inertia_pages_can_be_exported(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="not an Inertia page"):
+        await prerender(create_app(CONFIG), ["/api"], str(tmp_path), BASE_URL)
+    with pytest.raises(ValueError, match="404"):
+        await prerender(create_app(CONFIG), ["/missing"], str(tmp_path), BASE_URL)
+    with pytest.raises(ValueError, match="query strings"):
+        await prerender(create_app(CONFIG), ["/?page=2"], str(tmp_path), BASE_URL)
+
+
+async def test_exported_pages_are_served_without_running_the_app(
+    tmp_path: Path,
+) -> None:
+    await prerender(create_app(CONFIG), ["/"], str(tmp_path), BASE_URL)
+    app = create_app(CONFIG)
+    client = TestClient(PrerenderMiddleware(app, CONFIG, str(tmp_path)))
+
+    response = client.get("/")
+    assert_response_content(response, expected_props=PROPS)
+
+    response = client.get(
+        "/", headers={"X-Inertia": "true", "X-Inertia-Version": "1.0"}
+    )
+    assert response.headers["X-Inertia"] == "true"
+    assert response.json()["props"] == PROPS
+    assert app.state.renders == 0
+
+    response = client.get("/", params={"page": 2})
+    assert_response_content(response, expected_props=PROPS)
+    response = client.get(
+        "/",
+        headers={
+            "X-Inertia": "true",
+            "X-Inertia-Version": "1.0",
+            "X-Inertia-Partial-Data": "message",
+            "X-Inertia-Partial-Component": "IndexPage",
+        },
+    )
+    assert response.json()["props"] == PROPS
+    response = client.get(
+        "/", headers={"X-Inertia": "true", "X-Inertia-Version": "0.9"}
+    )
+    assert response.status_code == 409
+    assert app.state.renders == 2
+
+
+async def test_exported_pages_are_invalidated_on_version_change(
+    tmp_path: Path,
+) -> None:
+    await prerender(create_app(CONFIG), ["/"], str(tmp_path), BASE_URL)
+    config = replace(CONFIG, version="2.0")
+    app = create_app(config)
+    client = TestClient(PrerenderMiddleware(app, config, str(tmp_path)))
+
+    response = client.get("/")
+    assert_response_content(response, expected_props=PROPS)
+    assert app.state.renders == 1
+
+    await prerender(create_app(config), ["/"], str(tmp_path), BASE_URL)
+    os.utime(tmp_path / "prerender.json", (0, 0))
+    response = client.get("/")
+    assert_response_content(response, expected_props=PROPS)
+    assert app.state.renders == 1
+
+
+async def test_manifest_is_not_loaded_on_the_event_loop(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    await prerender(create_app(CONFIG), ["/"], str(tmp_path), BASE_URL)
+    loads: List[str] = []
+    load_manifest = PrerenderMiddleware._load_manifest
+
+    def spy(self: PrerenderMiddleware) -> Optional[PrerenderManifest]:
+        try:
+            asyncio.get_running_loop()
+            loads.append("event loop")
+        except RuntimeError:
+            loads.append("worker thread")
+        return load_manifest(self)
+
+    monkeypatch.setattr(PrerenderMiddleware, "_load_manifest", spy)
+    client = TestClient(PrerenderMiddleware(create_app(CONFIG), CONFIG, str(tmp_path)))
+    client.get("/")
+
+    assert loads == ["worker thread"]
+
+
+def test_command_line(tmp_path: Path) -> None:
+    main([f"{__name__}:app", "/", "-o", str(tmp_path), "--base-url", BASE_URL])
+
+    manifest = json.loads((tmp_path / "prerender.json").read_text())
+    assert list(manifest["pages"]) == ["/"]
+    assert json.loads((tmp_path / "index.json").read_text())["url"] == f"{BASE_URL}/"
+
+
+async def test_pages_must_share_the_same_version(tmp_path: Path) -> None:
+    app = create_app(CONFIG)
+    InertiaDep = Annotated[
+        Inertia,
+        Depends(inertia_dependency_factory(replace(CONFIG, version="2.0"))),
+    ]
+
+    @app.get("/next", response_model=None)
+    async def next_page(inertia: InertiaDep) -> InertiaResponse:
+        return await inertia.render("IndexPage", PROPS)
+
+    with pytest.raises(ValueError, match="/next was rendered with version 2.0"):
+        await prerender(app, ["/", "/next"], str(tmp_path), BASE_URL)
+    with pytest.raises(ValueError, match="No page to prerender"):
+        await prerender(app, [], str(tmp_path), BASE_URL)
+
+
+async def test_prerendering_needs_httpx(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(sys.modules["inertia.prerender"], "httpx", None)
+    with pytest.raises(ImportError, match="install httpx"):
+        await prerender(create_app(CONFIG), ["/"], str(tmp_path), BASE_URL)
+
+
+def test_requests_are_passed_to_the_app_until_pages_are_exported(
+    tmp_path: Path,
+) -> None:
+    app = create_app(CONFIG)
+    client = TestClient(PrerenderMiddleware(app, CONFIG, str(tmp_path)))
+
+    response = client.get("/")
+    assert_response_content(response, expected_props=PROPS)
+    assert app.state.renders == 1
+
+
+async def test_flashed_messages_are_shown_by_the_app(tmp_path: Path) -> None:
+    await prerender(create_app(CONFIG), ["/"], str(tmp_path), BASE_URL)
+    config = replace(CONFIG, use_flash_messages=True)
+    app = create_app(config)
+    InertiaDep = Annotated[Inertia, Depends(inertia_dependency_factory(config))]
+
+    @app.post("/flash", response_model=None)
+    async def flash(inertia: InertiaDep) -> Dict[str, str]:
+        inertia.flash("saved", category="success")
+        return {"status": "ok"}
+
+    prerendered_app = PrerenderMiddleware(app, config, str(tmp_path))
+    client = TestClient(SessionMiddleware(prerendered_app, secret_key="secret_key"))
+
+    client.get("/")
+    assert app.state.renders == 0
+
+    client.post("/flash")
+    response = client.get("/", headers={"X-Inertia": "true"})
+    assert response.json()["props"]["messages"] == [
+        {"message": "saved", "category": "success"}
+    ]
+    assert app.state.renders == 1
+
+    client.get("/")
+    assert app.state.renders == 1
+
+    # Without a session, flashed messages cannot be ruled out: the application
+    # is called, and requires the session
+    client = TestClient(prerendered_app)
+    with pytest.raises(AssertionError, match="SessionMiddleware must be installed"):
+        client.get("/")
@@ -1,12 +1,14 @@
 from datetime import datetime
 from fastapi import FastAPI, Depends
 from typing import Annotated, cast
+from unittest.mock import patch
 from pydantic import BaseModel
 
 from starlette.testclient import TestClient
 
 from .utils import assert_response_content, templates
 from inertia import Inertia, inertia_dependency_factory, InertiaResponse, InertiaConfig
+from inertia.props import _model_list_adapter
 
 
 app = FastAPI()
@@ -126,3 +128,85 @@ def test_pydantic_model_list_are_encoded_on_html_response() -> None:
             expected_props=EXPECTED_PROPS_MULTIPLE,
             expected_url=expected_url,
         )
+
+
+class Employee(Person):
+    company: str
+
+
+@app.get("/mixed", response_model=None)
+async def index_mixed(inertia: InertiaDep) -> InertiaResponse:
+    created_at = cast(datetime, PROPS["person"]["created_at"])
+    return await inertia.render(
+        COMPONENT,
+        {
+            "persons": [
+                Person(name="John Doe", age=42, created_at=created_at),
+                Employee(
+                    name="Jane Doe", age=43, created_at=created_at, company="ACME"
+                ),
+                "not a model",
+            ]
+        },
+    )
+
+
+def test_pydantic_model_list_is_dumped_with_a_cached_adapter() -> None:
+    _model_list_adapter.cache_clear()
+    with patch.object(
+        Person, "model_dump_json", side_effect=AssertionError("JSON round-trip")
+    ):
+        with TestClient(app) as client:
+            for _ in range(2):
+                response = client.get("/multiple", headers={"X-Inertia": "true"})
+                assert response.json()["props"] == EXPECTED_PROPS_MULTIPLE
+
+    cache_info = _model_list_adapter.cache_info()
+    assert cache_info.misses == 1
+    assert cache_info.hits == 1
+
+
+def test_pydantic_model_list_of_mixed_types_are_encoded() -> None:
+    with TestClient(app) as client:
+        response = client.get("/mixed", headers={"X-Inertia": "true"})
+        assert response.json()["props"] == {
+            "persons": [
+                EXPECTED_PROPS["person"],
+                {
+                    **EXPECTED_PROPS["person"],
+                    "name": "Jane Doe",
+                    "age": 43,
+                    "company": "ACME",
+                },
+                "not a model",
+            ]
+        }
+
+
+def test_pydantic_models_are_encoded_with_concurrent_props() -> None:
+    concurrent_app = FastAPI()
+    ConcurrentInertiaDep = Annotated[
+        Inertia,
+        Depends(
+            inertia_dependency_factory(
+                InertiaConfig(templates=templates, concurrent_props=True)
+            )
+        ),
+    ]
+    created_at = cast(datetime, PROPS["person"]["created_at"])
+    person = Person(name="John Doe", age=42, created_at=created_at)
+
+    @concurrent_app.get("/", response_model=None)
+    async def index(inertia: ConcurrentInertiaDep) -> InertiaResponse:
+        return await inertia.render(
+            COMPONENT,
+            {"person": person, "persons": [person, person], "count": lambda: 2},
+        )
+
+    with TestClient(concurrent_app) as client:
+        response = client.get("/", headers={"X-Inertia": "true"})
+        assert response.json()["props"] == {
+            **EXPECTED_PROPS,
+            **EXPECTED_PROPS_MULTIPLE,
+            "count": 2,
+        }
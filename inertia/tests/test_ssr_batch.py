@@ -0,0 +1,209 @@
+import asyncio
+import functools
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+from inertia import (
+    CircuitBreaker,
+    HTTPSSRTransport,
+    MemorySSRCache,
+    SSRRenderException,
+    SSRTransport,
+    StdioSSRTransport,
+)
+from inertia.ssr import SSRResult
+
+from .ssr_renderers import RENDERER_PATH, serve_http
+from .utils import create_ssr_config
+
+
+def page(component: str, **props: Any) -> Dict[str, Any]:
+    return {"component": component, "props": props, "url": "/", "version": "1.0"}
+
+
+class CountingTransport(SSRTransport):
+    def __init__(self) -> None:
+        self.running = 0
+        self.max_running = 0
+        self.components: List[Optional[str]] = []
+
+    async def render(self, page_json: bytes, component: Optional[str] = None) -> bytes:
+        self.components.append(component)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if component == "Error":
+            raise ConnectionError("The SSR server closed the connection")
+        return json.dumps({"head": [], "body": component}).encode()
+
+
+async def test_pages_are_sent_in_batches_to_a_batch_capable_server() -> None:
+    server = await asyncio.start_server(
+        functools.partial(serve_http, batch=True), "127.0.0.1", 0
+    )
+    port = server.sockets[0].getsockname()[1]
+    transport = HTTPSSRTransport(url=f"http://127.0.0.1:{port}", gzip_min_size=1)
+    config = create_ssr_config(ssr_transport=transport, version="1.0")
+    components = ["Home", "About", "Error", "Blog", "Contact"]
+    async with server:
+        results = await config.ssr_client.render_batch(
+            [page(component) for component in components], batch_size=2
+        )
+        await config.ssr_client.aclose()
+
+    assert transport.batch_supported
+    assert results[:2] == [
+        SSRResult(
+            head=f"<title>{component}</title>",
+            body=f'<div id="app">{component} rendered by {os.getpid()}</div>',
+        )
+        for component in components[:2]
+    ]
+    assert isinstance(results[2], SSRRenderException)
+    assert str(results[2]) == "Error cannot be rendered"
+    assert [result.head for result in results[3:]] == [  # type: ignore[union-attr]
+        "<title>Blog</title>",
+        "<title>Contact</title>",
+    ]
+
+
+async def test_stock_server_falls_back_to_single_renders() -> None:
+    server = await asyncio.start_server(serve_http, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    transport = HTTPSSRTransport(url=f"http://127.0.0.1:{port}")
+    config = create_ssr_config(ssr_transport=transport, version="1.0")
+    async with server:
+        results = await config.ssr_client.render_batch(
+            [page(f"Page{index}") for index in range(5)]
+        )
+        await config.ssr_client.aclose()
+
+    assert not transport.batch_supported
+    assert [result.head for result in results] == [  # type: ignore[union-attr]
+        f"<title>Page{index}</title>" for index in range(5)
+    ]
+
+
+async def test_single_renders_are_concurrent_and_fail_per_page() -> None:
+    transport = CountingTransport()
+    config = create_ssr_config(ssr_transport=transport, version="1.0")
+    components = ["Home", "Error"] + [f"Page{index}" for index in range(8)]
+
+    results = await config.ssr_client.render_batch(
+        [page(component) for component in components], max_concurrency=3
+    )
+
+    assert transport.max_running == 3
+    assert isinstance(results[1], ConnectionError)
+    assert [result.body for result in results if isinstance(result, SSRResult)] == [
+        component for component in components if component != "Error"
+    ]
+
+
+class UnfinishedTransport(CountingTransport):
+    async def render_batch(self, pages_json: Sequence[bytes]) -> bytes:
+        raise NotImplementedError
+
+
+async def test_unfinished_batch_method_is_a_failure() -> None:
+    transport = UnfinishedTransport()
+    breaker = CircuitBreaker(failure_threshold=1)
+    config = create_ssr_config(
+        ssr_transport=transport, version="1.0", ssr_circuit_breaker=breaker
+    )
+
+    results = await config.ssr_client.render_batch([page("Home"), page("About")])
+
+    assert all(isinstance(result, NotImplementedError) for result in results)
+    assert transport.components == []
+    assert breaker.state == "open"
+
+
+async def test_cached_pages_are_not_rendered_again() -> None:
+    transport = CountingTransport()
+    cache = MemorySSRCache()
+    config = create_ssr_config(ssr_transport=transport, version="1.0", ssr_cache=cache)
+    pages = [page(f"Page{index}") for index in range(4)]
+
+    first = await config.ssr_client.render_batch(pages)
+    second = await config.ssr_client.render_batch(pages)
+
+    assert first == second
+    assert len(transport.components) == 4
+    assert (await cache.stats())["hits"] == 4
+
+
+async def test_stdio_transport_pipelines_the_batch() -> None:
+    transport = StdioSSRTransport([sys.executable, RENDERER_PATH])
+    config = create_ssr_config(ssr_transport=transport, version="1.0")
+    pages = [page(f"Page{index}", text="x" * 4096) for index in range(100)]
+
+    results = await config.ssr_client.render_batch(pages)
+    pid = transport.pid
+    assert [result.body for result in results] == [  # type: ignore[union-attr]
+        f'<div id="app">Page{index} rendered by {pid}</div>' for index in range(100)
+    ]
+
+    results = await config.ssr_client.render_batch([page("Home"), page("Crash")])
+    assert all(isinstance(result, asyncio.IncompleteReadError) for result in results)
+    assert transport.pid is None
+    await transport.aclose()
+
+
+async def test_unsupported_batches_do_not_open_the_circuit() -> None:
+    transport = CountingTransport()
+    breaker = CircuitBreaker(failure_threshold=1)
+    config = create_ssr_config(
+        ssr_transport=transport, version="1.0", ssr_circuit_breaker=breaker
+    )
+
+    results = await config.ssr_client.render_batch([page("Home"), page("About")])
+
+    assert [result.body for result in results] == [  # type: ignore[union-attr]
+        "Home",
+        "About",
+    ]
+    assert breaker.state == "closed"
+
+
+class BatchTransport(CountingTransport):
+    def __init__(self, answers: Optional[int] = None) -> None:
+        super().__init__()
+        self.answers = answers
+        self.batches = 0
+
+    async def render_batch(self, pages_json: Sequence[bytes]) -> bytes:
+        self.batches += 1
+        components = [json.loads(page_json)["component"] for page_json in pages_json]
+        return json.dumps(
+            [{"head": [], "body": component} for component in components][
+                : self.answers
+            ]
+        ).encode()
+
+
+async def test_batched_pages_are_cached() -> None:
+    transport = BatchTransport()
+    cache = MemorySSRCache()
+    config = create_ssr_config(ssr_transport=transport, version="1.0", ssr_cache=cache)
+    pages = [page(f"Page{index}") for index in range(4)]
+
+    first = await config.ssr_client.render_batch(pages)
+    second = await config.ssr_client.render_batch(pages)
+
+    assert first == second
+    assert transport.batches == 1
+    assert (await cache.stats())["hits"] == 4
+
+
+async def test_batch_missing_pages_is_a_failure() -> None:
+    transport = BatchTransport(answers=1)
+    config = create_ssr_config(ssr_transport=transport, version="1.0")
+
+    results = await config.ssr_client.render_batch([page("Home"), page("About")])
+
+    assert all(isinstance(result, SSRRenderException) for result in results)
+    assert transport.components == []
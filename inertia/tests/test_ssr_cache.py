@@ -0,0 +1,95 @@
+from typing import Annotated
+
+import httpx
+from fastapi import FastAPI, Depends
+from starlette.testclient import TestClient
+
+from inertia import (
+    Inertia,
+    inertia_dependency_factory,
+    InertiaResponse,
+    MemorySSRCache,
+)
+from inertia.inertia import get_httpx_client
+from inertia.ssr import SSRResult, ssr_fingerprint
+
+from .utils import FakeClock, assert_response_content, create_ssr_config
+
+COMPONENT = "IndexPage"
+PROPS = {"message": "hello from index"}
+
+
+async def test_cache_evicts_least_recently_used_entries_by_size() -> None:
+    cache = MemorySSRCache(max_bytes=10)
+    await cache.set("a", SSRResult(head="", body="aaaa"))
+    await cache.set("b", SSRResult(head="", body="bbbb"))
+    assert await cache.get("a") is not None
+
+    await cache.set("c", SSRResult(head="", body="cccc"))
+    assert await cache.get("b") is None
+    assert await cache.get("a") is not None
+    assert await cache.get("c") is not None
+    assert await cache.stats() == {"hits": 3, "misses": 1, "entries": 2, "size": 8}
+
+
+async def test_cache_entries_expire() -> None:
+    clock = FakeClock()
+    cache = MemorySSRCache(ttl=10, clock=clock)
+    await cache.set("a", SSRResult(head="", body="aaaa"))
+
+    clock.now = 9.9
+    assert await cache.get("a") is not None
+    clock.now = 10
+    assert await cache.get("a") is None
+    assert (await cache.stats())["entries"] == 0
+
+
+def test_fingerprint_depends_on_the_version() -> None:
+    assert ssr_fingerprint(b"{}", "1.0") == ssr_fingerprint(b"{}", "1.0")
+    assert ssr_fingerprint(b"{}", "1.0") != ssr_fingerprint(b"{}", "2.0")
+    assert ssr_fingerprint(b"{}", "1.0") != ssr_fingerprint(b"[]", "1.0")
+
+
+async def test_identical_pages_are_rendered_once() -> None:
+    cache = MemorySSRCache()
+    app = FastAPI()
+    InertiaDep = Annotated[
+        Inertia,
+        Depends(inertia_dependency_factory(create_ssr_config(ssr_cache=cache))),
+    ]
+
+    @app.get("/", response_model=None)
+    async def index(inertia: InertiaDep) -> InertiaResponse:
+        return await inertia.render(COMPONENT, PROPS)
+
+    @app.get("/personalized", response_model=None)
+    async def personalized(inertia: InertiaDep) -> InertiaResponse:
+        return await inertia.render(COMPONENT, PROPS, cache_ssr=False)
+
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(
+            200, json={"head": [], "body": f"<div>render {len(calls)}</div>"}
+        )
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as ssr_client:
+        app.dependency_overrides[get_httpx_client] = lambda: ssr_client
+        with TestClient(app) as client:
+            for _ in range(3):
+                response = client.get("/")
+                assert_response_content(
+                    response, expected_body_content="<div>render 1</div>"
+                )
+            assert len(calls) == 1
+            assert (await cache.stats())["hits"] == 2
+            assert (await cache.stats())["misses"] == 1
+
+            for render in range(2, 4):
+                response = client.get("/personalized")
+                assert_response_content(
+                    response, expected_body_content=f"<div>render {render}</div>"
+                )
+            assert len(calls) == 3
+            assert (await cache.stats())["hits"] == 2
@@ -0,0 +1,119 @@
+import httpx
+from starlette.testclient import TestClient
+
+from inertia import CircuitBreaker
+from inertia.inertia import get_httpx_client
+
+from .utils import (
+    FakeClock,
+    assert_response_content,
+    create_app,
+    create_ssr_config,
+)
+
+PROPS = {"message": "hello from index"}
+SSR_BODY = "<div>rendered by ssr</div>"
+
+
+def test_circuit_opens_after_consecutive_failures() -> None:
+    breaker = CircuitBreaker(failure_threshold=3, clock=FakeClock())
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+    assert breaker.stats()["rejected_calls"] == 1
+
+
+def test_circuit_opens_when_failure_rate_is_reached() -> None:
+    breaker = CircuitBreaker(
+        failure_threshold=100,
+        failure_rate_threshold=0.5,
+        window_size=10,
+        minimum_calls=4,
+        clock=FakeClock(),
+    )
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+    breaker.record_failure()
+    assert breaker.stats()["state"] == "open"
+    assert breaker.stats()["failure_rate"] == 0.5
+
+
+def test_half_open_circuit_closes_after_a_successful_probe() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now = 10
+    assert breaker.stats()["state"] == "half_open"
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.stats()["state"] == "closed"
+    assert breaker.stats()["times_opened"] == 1
+
+
+def test_half_open_circuit_reopens_after_a_failed_probe() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 10
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.stats()["times_opened"] == 2
+
+    clock.now = 15
+    assert not breaker.allow_request()
+
+
+def test_cancelled_probe_frees_its_slot() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 10
+    assert breaker.allow_request()
+    breaker.record_cancellation()
+    assert breaker.state == "half_open"
+    assert breaker.allow_request()
+
+
+async def test_ssr_is_skipped_while_the_circuit_is_open() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+    app = create_app(create_ssr_config(ssr_circuit_breaker=breaker), PROPS)
+
+    ssr_up = False
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if not ssr_up:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"head": [], "body": SSR_BODY})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as ssr_client:
+        app.dependency_overrides[get_httpx_client] = lambda: ssr_client
+        with TestClient(app) as client:
+            for _ in range(4):
+                response = client.get("/")
+                assert response.status_code == 200
+                assert_response_content(response, expected_props=PROPS)
+            assert len(calls) == 2
+            assert breaker.stats()["rejected_calls"] == 2
+
+            ssr_up = True
+            clock.now = 30
+            response = client.get("/")
+            assert_response_content(response, expected_body_content=SSR_BODY)
+            assert len(calls) == 3
+            assert breaker.state == "closed"
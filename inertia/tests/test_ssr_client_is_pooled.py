@@ -0,0 +1,128 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import Annotated, AsyncIterator
+from unittest.mock import patch
+
+import httpx
+from fastapi import FastAPI, Depends
+from starlette.testclient import TestClient
+
+from inertia import (
+    Inertia,
+    inertia_dependency_factory,
+    inertia_lifespan,
+    InertiaResponse,
+    InertiaConfig,
+)
+
+from .ssr_renderers import serve_http
+from .utils import (
+    assert_response_content,
+    create_app,
+    create_ssr_config,
+    manifest_json,
+    templates,
+)
+
+
+SSR_URL = "http://some_special_url"
+CONFIG = InertiaConfig(
+    ssr_enabled=True,
+    environment="production",
+    manifest_json_path=manifest_json,
+    ssr_url=SSR_URL,
+    ssr_timeout=2.5,
+    ssr_max_connections=10,
+    ssr_max_keepalive_connections=5,
+    templates=templates,
+)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    async with inertia_lifespan(CONFIG):
+        yield
+
+
+app = FastAPI(lifespan=lifespan)
+InertiaDep = Annotated[Inertia, Depends(inertia_dependency_factory(CONFIG))]
+
+COMPONENT = "IndexPage"
+SSR_BODY = "<div>some body content</div>"
+
+
+@app.get("/", response_model=None)
+async def index(inertia: InertiaDep) -> InertiaResponse:
+    return await inertia.render(COMPONENT, {"message": "hello from index"})
+
+
+def ssr_handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"head": [], "body": SSR_BODY})
+
+
+def test_json_requests_do_not_create_an_ssr_client() -> None:
+    with TestClient(app) as client:
+        response = client.get("/", headers={"X-Inertia": "true"})
+        assert response.status_code == 200
+        assert CONFIG.ssr_client._transport is None
+
+
+def test_ssr_client_is_shared_between_requests_and_closed_on_shutdown() -> None:
+    async_client = httpx.AsyncClient
+    created: list[httpx.AsyncClient] = []
+
+    def client_factory(**kwargs: object) -> httpx.AsyncClient:
+        client = async_client(transport=httpx.MockTransport(ssr_handler), **kwargs)  # type: ignore[arg-type]
+        created.append(client)
+        return client
+
+    with patch.object(httpx, "AsyncClient", side_effect=client_factory) as factory:
+        with TestClient(app) as client:
+            for _ in range(3):
+                response = client.get("/")
+                assert response.status_code == 200
+                assert_response_content(response, expected_body_content=SSR_BODY)
+
+        factory.assert_called_once()
+        kwargs = factory.call_args.kwargs
+        assert kwargs["timeout"] == httpx.Timeout(2.5)
+        assert kwargs["limits"] == httpx.Limits(
+            max_connections=10, max_keepalive_connections=5, keepalive_expiry=5.0
+        )
+
+    assert len(created) == 1
+    assert created[0].is_closed
+    assert CONFIG.ssr_client._transport is None
+
+
+def test_ssr_client_is_recreated_on_another_event_loop() -> None:
+    # The SSR server outlives the event loops of the applications
+    server_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=server_loop.run_forever)
+    thread.start()
+    server = asyncio.run_coroutine_threadsafe(
+        asyncio.start_server(serve_http, "127.0.0.1", 0), server_loop
+    ).result()
+    port = server.sockets[0].getsockname()[1]
+    config = create_ssr_config(ssr_url=f"http://127.0.0.1:{port}")
+    app = create_app(config, {"message": "hello from index"})
+    try:
+        for _ in range(2):
+            # Each TestClient runs the application on a new event loop
+            with TestClient(app) as client:
+                response = client.get("/")
+                assert "IndexPage rendered by" in response.text
+    finally:
+
+        async def stop_server() -> None:
+            server.close()
+            tasks = asyncio.all_tasks() - {asyncio.current_task()}
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(stop_server(), server_loop).result()
+        server_loop.call_soon_threadsafe(server_loop.stop)
+        thread.join()
+        server_loop.close()
@@ -0,0 +1,147 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated
+
+import httpx
+import pytest
+from fastapi import FastAPI, Depends
+from starlette.testclient import TestClient
+
+from inertia import (
+    Inertia,
+    inertia_dependency_factory,
+    InertiaResponse,
+    InertiaConfig,
+    ConcurrencyLimiter,
+    SSRUnavailableException,
+)
+from inertia.inertia import get_httpx_client
+
+from .utils import assert_response_content, manifest_json, templates
+
+
+COMPONENT = "IndexPage"
+PROPS = {"message": "hello from index"}
+SSR_BODY = "<div>rendered by ssr</div>"
+
+
+async def test_calls_beyond_the_limit_wait_in_the_queue() -> None:
+    limiter = ConcurrencyLimiter(max_concurrency=2, max_queue=2, max_wait=None)
+    await limiter.acquire()
+    await limiter.acquire()
+    waiter = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.stats() == {
+        "active": 2,
+        "queued": 1,
+        "admitted": 2,
+        "shed_queue_full": 0,
+        "shed_timeout": 0,
+    }
+
+    limiter.release()
+    await waiter
+    assert limiter.stats()["active"] == 2
+    assert limiter.stats()["queued"] == 0
+    assert limiter.stats()["admitted"] == 3
+
+    limiter.release()
+    limiter.release()
+    assert limiter.stats()["active"] == 0
+
+
+async def test_calls_are_shed_when_the_queue_is_full() -> None:
+    limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=1, max_wait=None)
+    await limiter.acquire()
+    waiter = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(SSRUnavailableException):
+        await limiter.acquire()
+    assert limiter.stats()["shed_queue_full"] == 1
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limiter.stats()["queued"] == 0
+
+
+async def test_calls_are_shed_when_the_wait_is_too_long() -> None:
+    limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=10, max_wait=0.01)
+    await limiter.acquire()
+    with pytest.raises(SSRUnavailableException):
+        await limiter.acquire()
+    assert limiter.stats()["shed_timeout"] == 1
+    assert limiter.stats()["queued"] == 0
+
+    limiter.release()
+    await limiter.acquire()
+    assert limiter.stats()["active"] == 1
+
+
+async def test_slot_handed_over_as_the_wait_times_out_is_kept(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=10, max_wait=0.01)
+    await limiter.acquire()
+
+    async def wait_for(waiter: "asyncio.Future[None]", timeout: float) -> None:
+        # Python 3.12 raises a TimeoutError even if the waiter got its result
+        limiter.release()
+        raise asyncio.TimeoutError
+
+    monkeypatch.setattr(asyncio, "wait_for", wait_for)
+    await limiter.acquire()
+    assert limiter.stats()["active"] == 1
+    assert limiter.stats()["admitted"] == 2
+    assert limiter.stats()["shed_timeout"] == 0
+
+    limiter.release()
+    assert limiter.stats()["active"] == 0
+
+
+async def test_shed_pages_are_rendered_client_side() -> None:
+    limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=0)
+    app = FastAPI()
+    InertiaDep = Annotated[
+        Inertia,
+        Depends(
+            inertia_dependency_factory(
+                InertiaConfig(
+                    ssr_enabled=True,
+                    environment="production",
+                    manifest_json_path=manifest_json,
+                    ssr_concurrency_limiter=limiter,
+                    templates=templates,
+                )
+            )
+        ),
+    ]
+
+    @app.get("/", response_model=None)
+    async def index(inertia: InertiaDep) -> InertiaResponse:
+        return await inertia.render(COMPONENT, PROPS)
+
+    rendering = threading.Event()
+    release = threading.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        rendering.set()
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"head": [], "body": SSR_BODY})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as ssr_client:
+        app.dependency_overrides[get_httpx_client] = lambda: ssr_client
+        with TestClient(app) as client, ThreadPoolExecutor(1) as executor:
+            slow = executor.submit(client.get, "/")
+            assert rendering.wait(5)
+
+            response = client.get("/")
+            assert_response_content(response, expected_props=PROPS)
+            assert limiter.stats()["shed_queue_full"] == 1
+
+            release.set()
+            assert_response_content(slow.result(), expected_body_content=SSR_BODY)
+            assert limiter.stats()["active"] == 0
@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import httpx
+from starlette.testclient import TestClient
+
+from inertia import CircuitBreaker, MemorySSRCache
+from inertia.inertia import get_httpx_client
+
+from .utils import assert_response_content, create_app, create_ssr_config
+
+PROPS = {"message": "hello from index"}
+SSR_BODY = "<div>rendered by ssr</div>"
+
+
+class SlowSSRServer:
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.calls = 0
+        self.completed = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        self.completed += 1
+        return httpx.Response(200, json={"head": [], "body": SSR_BODY})
+
+
+async def test_client_side_page_is_served_once_the_deadline_has_passed() -> None:
+    app = create_app(create_ssr_config(ssr_deadline=0.05), PROPS)
+    server = SlowSSRServer(delay=0.5)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(server)) as ssr_client:
+        app.dependency_overrides[get_httpx_client] = lambda: ssr_client
+        with TestClient(app) as client:
+            started_at = time.monotonic()
+            response = client.get("/")
+            assert time.monotonic() - started_at < 0.4
+            assert_response_content(response, expected_props=PROPS)
+
+            time.sleep(0.6)
+            assert server.calls == 1
+            assert server.completed == 0
+
+            response = client.get("/", params={"deadline": 1})
+            assert_response_content(response, expected_body_content=SSR_BODY)
+
+
+async def test_ssr_keeps_running_in_the_background_to_warm_the_cache() -> None:
+    cache = MemorySSRCache()
+    app = create_app(
+        create_ssr_config(
+            ssr_deadline=0.05, ssr_deadline_background=True, ssr_cache=cache
+        ),
+        PROPS,
+    )
+    server = SlowSSRServer(delay=0.2)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(server)) as ssr_client:
+        app.dependency_overrides[get_httpx_client] = lambda: ssr_client
+        with TestClient(app) as client:
+            response = client.get("/")
+            assert_response_content(response, expected_props=PROPS)
+
+            time.sleep(0.4)
+            assert server.completed == 1
+
+            response = client.get("/")
+            assert_response_content(response, expected_body_content=SSR_BODY)
+            assert server.calls == 1
+            assert (await cache.stats())["hits"] == 1
+
+
+async def test_missed_deadlines_do_not_open_the_circuit() -> None:
+    breaker = CircuitBreaker(failure_threshold=1)
+    app = create_app(
+        create_ssr_config(ssr_deadline=0.05, ssr_circuit_breaker=breaker), PROPS
+    )
+    server = SlowSSRServer(delay=0.5)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(server)) as ssr_client:
+        app.dependency_overrides[get_httpx_client] = lambda: ssr_client
+        with TestClient(app) as client:
+            for _ in range(2):
+                response = client.get("/")
+                assert_response_content(response, expected_props=PROPS)
+
+    assert server.calls == 2
+    assert breaker.stats()["state"] == "closed"
+    assert breaker.stats()["consecutive_failures"] == 0
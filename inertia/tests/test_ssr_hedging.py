@@ -0,0 +1,237 @@
+import asyncio
+import json
+from typing import Dict, List
+
+import httpx
+import pytest
+from starlette.testclient import TestClient
+
+from inertia import LoadBalancedSSRTransport
+from inertia.inertia import get_httpx_client
+
+from .utils import (
+    FakeClock,
+    FakeSSRTransport,
+    assert_response_content,
+    create_app,
+    create_ssr_config,
+)
+
+COMPONENT = "IndexPage"
+
+
+async def create_balancer(
+    max_hedge_rate: float,
+) -> "tuple[LoadBalancedSSRTransport, FakeSSRTransport, FakeSSRTransport]":
+    transports = {name: FakeSSRTransport(name) for name in ("a", "b")}
+    balancer = LoadBalancedSSRTransport(
+        transports,
+        hedge_percentile=0.9,
+        max_hedge_rate=max_hedge_rate,
+        hedge_window=20,
+        hedge_min_samples=10,
+    )
+    preferred_name = json.loads(await balancer.render(b"{}", COMPONENT))["body"]
+    preferred = transports[preferred_name]
+    other = next(
+        transport for transport in transports.values() if transport is not preferred
+    )
+    for _ in range(9):
+        await balancer.render(b"{}", COMPONENT)
+    return balancer, preferred, other
+
+
+async def render(balancer: LoadBalancedSSRTransport) -> str:
+    body: str = json.loads(await balancer.render(b"{}", COMPONENT))["body"]
+    return body
+
+
+async def test_renders_are_not_hedged_before_enough_latencies() -> None:
+    transports = {name: FakeSSRTransport(name) for name in ("a", "b")}
+    balancer = LoadBalancedSSRTransport(transports, hedge_percentile=0.9)
+    for transport in transports.values():
+        transport.delay = 0.05
+    await render(balancer)
+    assert balancer.hedges == 0
+    assert sum(len(transport.components) for transport in transports.values()) == 1
+
+
+async def test_slow_render_is_hedged_to_another_endpoint() -> None:
+    balancer, preferred, other = await create_balancer(max_hedge_rate=0.5)
+    preferred.delay = 1
+
+    assert await render(balancer) == other.body
+    assert balancer.hedges == 1
+    assert balancer.hedges_won == 1
+    await asyncio.sleep(0)
+    assert preferred.cancelled == 1
+    assert [endpoint["outstanding"] for endpoint in balancer.stats()] == [0, 0]
+    assert [endpoint["state"] for endpoint in balancer.stats()] == ["closed", "closed"]
+
+
+async def test_first_render_wins_when_the_hedge_is_slower() -> None:
+    balancer, preferred, other = await create_balancer(max_hedge_rate=0.5)
+    preferred.delay = 0.05
+    other.delay = 1
+
+    assert await render(balancer) == preferred.body
+    assert balancer.hedges == 1
+    assert balancer.hedges_won == 0
+    await asyncio.sleep(0)
+    assert other.cancelled == 1
+
+
+async def test_failed_hedge_does_not_fail_the_render() -> None:
+    balancer, preferred, other = await create_balancer(max_hedge_rate=0.5)
+    preferred.delay = 0.05
+    other.failing = True
+
+    assert await render(balancer) == preferred.body
+    assert balancer.hedges == 1
+
+
+async def test_hedge_rate_is_capped() -> None:
+    balancer, preferred, other = await create_balancer(max_hedge_rate=0.1)
+    preferred.delay = 0.02
+
+    assert [await render(balancer) for _ in range(3)] == [
+        other.body,
+        preferred.body,
+        preferred.body,
+    ]
+    assert balancer.hedges == 1
+    assert len(other.components) == 1
+
+
+async def test_hedge_delay_does_not_drift_under_slow_renders() -> None:
+    transports = {name: FakeSSRTransport(name) for name in ("a", "b")}
+    balancer = LoadBalancedSSRTransport(
+        transports,
+        hedge_percentile=0.9,
+        max_hedge_rate=1,
+        hedge_window=20,
+        hedge_min_samples=10,
+    )
+    for transport in transports.values():
+        transport.delay = 0.02
+    preferred = transports[await render(balancer)]
+    for _ in range(15):
+        await render(balancer)
+    delay = balancer._get_hedge_delay()
+    assert delay is not None and delay >= 0.02
+
+    preferred.delay = 1
+    for transport in transports.values():
+        if transport is not preferred:
+            transport.delay = 0
+    for _ in range(32):
+        await render(balancer)
+
+    assert balancer.hedges == 32
+    delay = balancer._get_hedge_delay()
+    assert delay is not None and delay >= 0.02
+
+
+async def test_ssr_servers_listed_in_ssr_url_can_be_hedged() -> None:
+    config = create_ssr_config(
+        ssr_url=["http://ssr-1:13714", "http://ssr-2:13714"],
+        ssr_hedge_percentile=0.5,
+        ssr_max_hedge_rate=1,
+    )
+    app = create_app(config, {})
+
+    hosts: List[str] = []
+    delays: Dict[str, float] = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        hosts.append(request.url.host)
+        await asyncio.sleep(delays.get(request.url.host, 0))
+        return httpx.Response(
+            200, json={"head": [], "body": f"<div>{request.url.host}</div>"}
+        )
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as ssr_client:
+        app.dependency_overrides[get_httpx_client] = lambda: ssr_client
+        with TestClient(app) as client:
+            for _ in range(20):
+                client.get("/")
+            preferred = hosts[0]
+            other = "ssr-2" if preferred == "ssr-1" else "ssr-1"
+            assert set(hosts) == {preferred}
+
+            delays[preferred] = 1
+            response = client.get("/")
+            assert_response_content(
+                response, expected_body_content=f"<div>{other}</div>"
+            )
+
+
+async def test_render_is_not_hedged_when_every_other_endpoint_is_ejected() -> None:
+    balancer, preferred, other = await create_balancer(max_hedge_rate=0.5)
+    for endpoint in balancer._endpoints.values():
+        if endpoint.transport is other:
+            for _ in range(3):
+                endpoint.breaker.record_failure()
+    preferred.delay = 0.05
+
+    assert await render(balancer) == preferred.body
+    assert balancer.hedges == 0
+    assert other.components == []
+
+
+async def test_render_cancelled_before_its_hedge_is_not_hedged() -> None:
+    transports = {name: FakeSSRTransport(name) for name in ("a", "b")}
+    balancer = LoadBalancedSSRTransport(
+        transports, hedge_percentile=0.9, hedge_min_samples=10
+    )
+    for transport in transports.values():
+        transport.delay = 0.05
+    preferred = transports[await render(balancer)]
+    for _ in range(9):
+        await render(balancer)
+
+    preferred.gate = asyncio.Event()
+    task = asyncio.ensure_future(render(balancer))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert task.cancelled()
+    assert preferred.cancelled == 1
+    assert balancer.hedges == 0
+    assert [endpoint["outstanding"] for endpoint in balancer.stats()] == [0, 0]
+
+
+async def test_error_of_the_first_render_is_raised_when_both_fail() -> None:
+    balancer, preferred, other = await create_balancer(max_hedge_rate=0.5)
+    preferred.delay = 0.05
+    preferred.failing = True
+    other.failing = True
+
+    with pytest.raises(ConnectionError, match=f"{preferred.body} is down"):
+        await render(balancer)
+    assert balancer.hedges == 1
+
+
+async def test_cancelled_probe_frees_its_slot() -> None:
+    clock = FakeClock()
+    transport = FakeSSRTransport("a")
+    balancer = LoadBalancedSSRTransport(
+        {"a": transport}, failure_threshold=1, reset_timeout=10, clock=clock
+    )
+    transport.failing = True
+    with pytest.raises(ConnectionError):
+        await render(balancer)
+
+    clock.now = 10
+    transport.failing = False
+    transport.gate = asyncio.Event()
+    task = asyncio.ensure_future(render(balancer))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert balancer.stats()[0]["state"] == "half_open"
+
+    transport.gate.set()
+    assert await render(balancer) == "a"
+    assert balancer.stats()[0]["state"] == "closed"
@@ -1,4 +1,5 @@
 from typing import TypedDict
+import gzip
 import json
 import os
 from datetime import datetime
@@ -64,7 +65,7 @@ async def test_returns_html() -> None:
     async def get_httpx_client_mock() -> AsyncMock:
         mock = AsyncMock()
         mocked_response = MagicMock()
-        mocked_response.json.return_value = RETURNED_JSON
+        mocked_response.content = json.dumps(RETURNED_JSON).encode()
         mock.post.return_value = mocked_response
         return mock
 
@@ -77,16 +78,16 @@ async def test_returns_html() -> None:
         httpx_mock = await get_httpx_client_mock()
         app.dependency_overrides[get_httpx_client] = lambda: httpx_mock
         response = client.get("/")
-        httpx_mock.post.assert_called_once_with(
-            url=f"{SSR_URL}/render",
-            json={
-                "component": COMPONENT,
-                "props": EXPECTED_PROPS,
-                "url": f"{client.base_url}/",
-                "version": "1.0",
-            },
-            headers={"Content-Type": "application/json"},
-        )
+        httpx_mock.post.assert_called_once()
+        post_kwargs = httpx_mock.post.call_args.kwargs
+        assert post_kwargs["url"] == f"{SSR_URL}/render"
+        assert json.loads(post_kwargs["content"]) == {
+            "component": COMPONENT,
+            "props": EXPECTED_PROPS,
+            "url": f"{client.base_url}/",
+            "version": "1.0",
+        }
+        assert post_kwargs["headers"] == {"Content-Type": "application/json"}
         assert response.status_code == 200
         assert response.headers.get("content-type").split(";")[0] == "text/html"
         assert_response_content(
@@ -114,16 +115,16 @@ async def test_fallback_to_classic_if_render_errors() -> None:
         httpx_mock = await get_httpx_client_mock()
         app.dependency_overrides[get_httpx_client] = lambda: httpx_mock
         response = client.get("/")
-        httpx_mock.post.assert_called_once_with(
-            url=f"{SSR_URL}/render",
-            json={
-                "component": COMPONENT,
-                "props": EXPECTED_PROPS,
-                "url": f"{client.base_url}/",
-                "version": "1.0",
-            },
-            headers={"Content-Type": "application/json"},
-        )
+        httpx_mock.post.assert_called_once()
+        post_kwargs = httpx_mock.post.call_args.kwargs
+        assert post_kwargs["url"] == f"{SSR_URL}/render"
+        assert json.loads(post_kwargs["content"]) == {
+            "component": COMPONENT,
+            "props": EXPECTED_PROPS,
+            "url": f"{client.base_url}/",
+            "version": "1.0",
+        }
+        assert post_kwargs["headers"] == {"Content-Type": "application/json"}
         assert response.status_code == 200
         assert response.headers.get("content-type").split(";")[0] == "text/html"
         assert_response_content(
@@ -134,3 +135,119 @@ async def test_fallback_to_classic_if_render_errors() -> None:
             expected_script_asset_url=js_file,
             expected_css_asset_urls=css_files,
         )
+
+
+async def test_props_are_resolved_once_when_falling_back_to_classic() -> None:
+    calls: list[str] = []
+
+    def counted_prop() -> str:
+        calls.append("called")
+        return "counted"
+
+    @app.get("/counted", response_model=None)
+    async def counted(inertia: InertiaDep) -> InertiaResponse:
+        return await inertia.render(COMPONENT, {"counted": counted_prop})
+
+    httpx_mock = AsyncMock()
+    httpx_mock.post.return_value = httpx.Response(status_code=500)
+    with TestClient(app) as client:
+        app.dependency_overrides[get_httpx_client] = lambda: httpx_mock
+        response = client.get("/counted")
+        httpx_mock.post.assert_called_once()
+        assert json.loads(httpx_mock.post.call_args.kwargs["content"])["props"] == {
+            "counted": "counted"
+        }
+        assert_response_content(response, expected_props={"counted": "counted"})
+    assert calls == ["called"]
+
+
+def ssr_stand_in(request: httpx.Request) -> httpx.Response:
+    """
+    Stand-in for the Inertia SSR server: the body is parsed once, as Node does
+    """
+    content = request.content
+    if request.headers.get("Content-Encoding") == "gzip":
+        content = gzip.decompress(content)
+    page = json.loads(content)
+    return httpx.Response(
+        200,
+        json={
+            "head": [f"<title>{page['component']}</title>"],
+            "body": f'<div id="app">{page["props"]["message"]}</div>',
+        },
+    )
+
+
+def expected_wire_bytes(base_url: str) -> bytes:
+    created_at = cast(datetime, PROPS["created_at"]).isoformat()
+    return (
+        f'{{"component":"{COMPONENT}",'
+        f'"props":{{"message":"hello from index","created_at":"{created_at}"}},'
+        f'"url":"{base_url}/","version":"1.0"}}'
+    ).encode()
+
+
+async def test_page_is_sent_as_raw_json_bytes() -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return ssr_stand_in(request)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as ssr_client:
+        with TestClient(app) as client:
+            app.dependency_overrides[get_httpx_client] = lambda: ssr_client
+            response = client.get("/")
+            assert_response_content(
+                response,
+                expected_additional_head_content=[f"<title>{COMPONENT}</title>"],
+                expected_body_content="<div>hello from index</div>",
+            )
+
+    assert len(requests) == 1
+    assert requests[0].url == f"{SSR_URL}/render"
+    assert requests[0].headers["Content-Type"] == "application/json"
+    assert "Content-Encoding" not in requests[0].headers
+    assert requests[0].content == expected_wire_bytes(str(client.base_url))
+
+
+async def test_large_pages_are_gzipped() -> None:
+    gzip_app = FastAPI()
+    GzipInertiaDep = Annotated[
+        Inertia,
+        Depends(
+            inertia_dependency_factory(
+                InertiaConfig(
+                    ssr_enabled=True,
+                    environment="production",
+                    manifest_json_path=manifest_json,
+                    ssr_url=SSR_URL,
+                    ssr_gzip_min_size=64,
+                    templates=templates,
+                )
+            )
+        ),
+    ]
+
+    @gzip_app.get("/", response_model=None)
+    async def gzip_index(inertia: GzipInertiaDep) -> InertiaResponse:
+        return await inertia.render(COMPONENT, PROPS)
+
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return ssr_stand_in(request)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as ssr_client:
+        with TestClient(gzip_app) as client:
+            gzip_app.dependency_overrides[get_httpx_client] = lambda: ssr_client
+            response = client.get("/")
+            assert_response_content(
+                response, expected_body_content="<div>hello from index</div>"
+            )
+
+    assert requests[0].headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(requests[0].content) == expected_wire_bytes(
+        str(client.base_url)
+    )
@@ -0,0 +1,164 @@
+import asyncio
+import json
+from typing import Annotated, Dict, List
+
+import httpx
+import pytest
+from fastapi import FastAPI, Depends
+from starlette.testclient import TestClient
+
+from inertia import (
+    Inertia,
+    inertia_dependency_factory,
+    InertiaResponse,
+    LoadBalancedSSRTransport,
+    SSRUnavailableException,
+)
+from inertia.inertia import get_httpx_client
+
+from .utils import (
+    FakeClock,
+    FakeSSRTransport,
+    assert_response_content,
+    create_ssr_config,
+)
+
+COMPONENTS = [f"Page{index}" for index in range(30)]
+
+
+def create_transports(*names: str) -> Dict[str, FakeSSRTransport]:
+    return {name: FakeSSRTransport(name) for name in names}
+
+
+async def rendered_by(balancer: LoadBalancedSSRTransport, component: str) -> str:
+    body: str = json.loads(await balancer.render(b"{}", component))["body"]
+    return body
+
+
+async def test_pages_of_a_component_go_to_the_same_endpoint() -> None:
+    balancer = LoadBalancedSSRTransport(create_transports("a", "b", "c"))
+    endpoints = {
+        component: await rendered_by(balancer, component) for component in COMPONENTS
+    }
+    assert set(endpoints.values()) == {"a", "b", "c"}
+    for component in COMPONENTS:
+        assert await rendered_by(balancer, component) == endpoints[component]
+
+
+async def test_removing_an_endpoint_only_moves_its_components() -> None:
+    balancer = LoadBalancedSSRTransport(create_transports("a", "b", "c"))
+    smaller_balancer = LoadBalancedSSRTransport(create_transports("a", "b"))
+    for component in COMPONENTS:
+        endpoint = await rendered_by(balancer, component)
+        if endpoint != "c":
+            assert await rendered_by(smaller_balancer, component) == endpoint
+
+
+async def test_failing_endpoints_are_ejected_then_probed_again() -> None:
+    clock = FakeClock()
+    transports = create_transports("a", "b")
+    balancer = LoadBalancedSSRTransport(
+        transports, failure_threshold=2, reset_timeout=10, clock=clock
+    )
+    endpoints = {
+        component: await rendered_by(balancer, component) for component in COMPONENTS
+    }
+    component = next(
+        component for component, endpoint in endpoints.items() if endpoint == "a"
+    )
+
+    transports["a"].failing = True
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await balancer.render(b"{}", component)
+    assert [endpoint["state"] for endpoint in balancer.stats()] == ["open", "closed"]
+    assert await rendered_by(balancer, component) == "b"
+
+    transports["a"].failing = False
+    clock.now = 10
+    assert await rendered_by(balancer, component) == "a"
+    assert [endpoint["state"] for endpoint in balancer.stats()] == [
+        "closed",
+        "closed",
+    ]
+
+
+async def test_every_endpoint_ejected_makes_ssr_unavailable() -> None:
+    transports = create_transports("a", "b")
+    balancer = LoadBalancedSSRTransport(transports, failure_threshold=1)
+    for transport in transports.values():
+        transport.failing = True
+    with pytest.raises(ConnectionError):
+        await balancer.render(b"{}", "IndexPage")
+    with pytest.raises(ConnectionError):
+        await balancer.render(b"{}", "IndexPage")
+
+    with pytest.raises(SSRUnavailableException):
+        await balancer.render(b"{}", "IndexPage")
+
+
+async def test_saturated_endpoint_falls_back_to_the_least_loaded() -> None:
+    transports = create_transports("a", "b", "c")
+    balancer = LoadBalancedSSRTransport(transports, max_outstanding=1)
+    preferred = await rendered_by(balancer, "IndexPage")
+    transports[preferred].gate = asyncio.Event()
+
+    pending = asyncio.ensure_future(balancer.render(b"{}", "IndexPage"))
+    await asyncio.sleep(0)
+    assert await rendered_by(balancer, "IndexPage") != preferred
+
+    transports[preferred].gate.set()  # type: ignore[union-attr]
+    assert json.loads(await pending)["body"] == preferred
+    assert await rendered_by(balancer, "IndexPage") == preferred
+
+
+async def test_ssr_url_can_list_several_endpoints() -> None:
+    config = create_ssr_config(ssr_url=["http://ssr-1:13714", "http://ssr-2:13714"])
+    app = FastAPI()
+    InertiaDep = Annotated[Inertia, Depends(inertia_dependency_factory(config))]
+
+    @app.get("/{component}", response_model=None)
+    async def index(component: str, inertia: InertiaDep) -> InertiaResponse:
+        return await inertia.render(component, {})
+
+    hosts: Dict[str, List[str]] = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        component = json.loads(request.content)["component"]
+        hosts.setdefault(component, []).append(request.url.host)
+        return httpx.Response(
+            200, json={"head": [], "body": f"<div>{request.url.host}</div>"}
+        )
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as ssr_client:
+        app.dependency_overrides[get_httpx_client] = lambda: ssr_client
+        with TestClient(app) as client:
+            for component in COMPONENTS[:10] * 2:
+                response = client.get(f"/{component}")
+                assert_response_content(
+                    response, expected_body_content=f"<div>{hosts[component][-1]}</div>"
+                )
+
+    assert all(len(set(component_hosts)) == 1 for component_hosts in hosts.values())
+    assert {host for component_hosts in hosts.values() for host in component_hosts} == {
+        "ssr-1",
+        "ssr-2",
+    }
+
+
+async def test_endpoints_are_started_and_closed_with_the_balancer() -> None:
+    calls: List[str] = []
+
+    class Transport(FakeSSRTransport):
+        async def start(self) -> None:
+            calls.append(f"start {self.body}")
+
+        async def aclose(self) -> None:
+            calls.append(f"close {self.body}")
+
+    balancer = LoadBalancedSSRTransport({name: Transport(name) for name in "ab"})
+    await balancer.start()
+    assert sorted(calls) == ["start a", "start b"]
+
+    await balancer.aclose()
+    assert sorted(calls) == ["close a", "close b", "start a", "start b"]
@@ -0,0 +1,108 @@
+from typing import Optional, Tuple
+
+from starlette.testclient import TestClient
+
+from inertia import (
+    InertiaConfig,
+    SSRPolicy,
+    BotsOnlySSRPolicy,
+    RouteSSRPolicy,
+    HealthySSRPolicy,
+    CircuitBreaker,
+)
+
+from .utils import (
+    FakeSSRTransport,
+    assert_response_content,
+    create_app,
+    create_ssr_config,
+)
+
+PROPS = {"message": "hello from index"}
+SSR_BODY = "<div>rendered by ssr</div>"
+GOOGLEBOT = "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)"
+BROWSER = "Mozilla/5.0 (X11; Linux x86_64; rv:131.0) Gecko/20100101 Firefox/131.0"
+
+
+def create_client(
+    policy: Optional[SSRPolicy], **kwargs: object
+) -> Tuple[TestClient, FakeSSRTransport, InertiaConfig]:
+    transport = FakeSSRTransport(SSR_BODY)
+    config = create_ssr_config(ssr_transport=transport, ssr_policy=policy, **kwargs)
+    return TestClient(create_app(config, PROPS)), transport, config
+
+
+def test_bots_only_policy() -> None:
+    client, transport, _ = create_client(BotsOnlySSRPolicy())
+
+    response = client.get("/", headers={"User-Agent": GOOGLEBOT})
+    assert_response_content(response, expected_body_content=SSR_BODY)
+
+    response = client.get("/", headers={"User-Agent": BROWSER})
+    assert_response_content(response, expected_props=PROPS)
+    assert len(transport.components) == 1
+
+
+def test_per_render_flag_overrides_the_policy() -> None:
+    client, transport, _ = create_client(BotsOnlySSRPolicy())
+
+    response = client.get("/", params={"ssr": True}, headers={"User-Agent": BROWSER})
+    assert_response_content(response, expected_body_content=SSR_BODY)
+
+    response = client.get("/", params={"ssr": False}, headers={"User-Agent": GOOGLEBOT})
+    assert_response_content(response, expected_props=PROPS)
+    assert len(transport.components) == 1
+
+
+def test_route_policy() -> None:
+    client, transport, _ = create_client(
+        RouteSSRPolicy(["/", "/blog/*"], otherwise=BotsOnlySSRPolicy())
+    )
+    headers = {"User-Agent": BROWSER}
+
+    for path in ("/", "/blog/first-post"):
+        response = client.get(path, headers=headers)
+        assert_response_content(response, expected_body_content=SSR_BODY)
+
+    response = client.get("/account", headers=headers)
+    assert_response_content(response, expected_props=PROPS)
+
+    response = client.get("/account", headers={"User-Agent": GOOGLEBOT})
+    assert_response_content(response, expected_body_content=SSR_BODY)
+    assert len(transport.components) == 3
+
+
+def test_healthy_policy() -> None:
+    breaker = CircuitBreaker(failure_threshold=1)
+    client, transport, config = create_client(
+        HealthySSRPolicy(max_pending_calls=1), ssr_circuit_breaker=breaker
+    )
+
+    response = client.get("/")
+    assert_response_content(response, expected_body_content=SSR_BODY)
+
+    config.ssr_client.pending_calls = 1
+    response = client.get("/")
+    assert_response_content(response, expected_props=PROPS)
+    config.ssr_client.pending_calls = 0
+
+    config.ssr_client.available = False
+    response = client.get("/")
+    assert_response_content(response, expected_props=PROPS)
+    config.ssr_client.available = True
+
+    breaker.record_failure()
+    response = client.get("/")
+    assert_response_content(response, expected_props=PROPS)
+    assert len(transport.components) == 1
+
+
+def test_healthy_policy_can_wrap_another_policy() -> None:
+    client, transport, _ = create_client(HealthySSRPolicy(policy=BotsOnlySSRPolicy()))
+
+    response = client.get("/", headers={"User-Agent": GOOGLEBOT})
+    assert_response_content(response, expected_body_content=SSR_BODY)
+
+    response = client.get("/", headers={"User-Agent": BROWSER})
+    assert_response_content(response, expected_props=PROPS)
+    assert len(transport.components) == 1
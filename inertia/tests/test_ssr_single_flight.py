@@ -0,0 +1,104 @@
+import asyncio
+
+import httpx
+import pytest
+
+from inertia import MemorySSRCache
+from inertia.ssr import SSRResult
+
+from .utils import create_ssr_config
+
+
+PAGE = b'{"component":"IndexPage","props":{}}'
+OTHER_PAGE = b'{"component":"OtherPage","props":{}}'
+
+
+class GatedSSRServer:
+    def __init__(self, status_code: int = 200) -> None:
+        self.status_code = status_code
+        self.calls: list[httpx.Request] = []
+        self.gate = asyncio.Event()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(request)
+        render = len(self.calls)
+        await self.gate.wait()
+        return httpx.Response(
+            self.status_code,
+            json={"head": [], "body": f"<div>render {render}</div>"},
+        )
+
+
+async def release(server: GatedSSRServer) -> None:
+    while not server.calls:
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.01)
+    server.gate.set()
+
+
+async def test_concurrent_identical_renders_share_one_call() -> None:
+    config = create_ssr_config(ssr_single_flight=True)
+    server = GatedSSRServer()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(server)) as client:
+        results = await asyncio.gather(
+            *(config.ssr_client.render(PAGE, client) for _ in range(10)),
+            config.ssr_client.render(OTHER_PAGE, client),
+            release(server),
+        )
+
+    assert len(server.calls) == 2
+    assert results[:10] == [SSRResult(head="", body="<div>render 1</div>")] * 10
+    assert results[10] == SSRResult(head="", body="<div>render 2</div>")
+
+    server.gate.clear()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(server)) as client:
+        await asyncio.gather(config.ssr_client.render(PAGE, client), release(server))
+    assert len(server.calls) == 3
+
+
+async def test_errors_are_propagated_to_every_waiter() -> None:
+    config = create_ssr_config(ssr_single_flight=True)
+    server = GatedSSRServer(status_code=500)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(server)) as client:
+        results = await asyncio.gather(
+            *(config.ssr_client.render(PAGE, client) for _ in range(5)),
+            release(server),
+            return_exceptions=True,
+        )
+
+    assert len(server.calls) == 1
+    assert all(isinstance(result, httpx.HTTPStatusError) for result in results[:5])
+
+
+async def test_cancelled_render_does_not_cancel_the_shared_call() -> None:
+    config = create_ssr_config(ssr_single_flight=True)
+    server = GatedSSRServer()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(server)) as client:
+        first = asyncio.ensure_future(config.ssr_client.render(PAGE, client))
+        second = asyncio.ensure_future(config.ssr_client.render(PAGE, client))
+        while not server.calls:
+            await asyncio.sleep(0)
+        first.cancel()
+        server.gate.set()
+
+        assert await second == SSRResult(head="", body="<div>render 1</div>")
+        with pytest.raises(asyncio.CancelledError):
+            await first
+    assert len(server.calls) == 1
+
+
+async def test_shared_call_result_is_cached_once() -> None:
+    cache = MemorySSRCache()
+    config = create_ssr_config(ssr_single_flight=True, ssr_cache=cache)
+    server = GatedSSRServer()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(server)) as client:
+        await asyncio.gather(
+            *(config.ssr_client.render(PAGE, client) for _ in range(3)),
+            release(server),
+        )
+        assert await config.ssr_client.render(PAGE, client) == SSRResult(
+            head="", body="<div>render 1</div>"
+        )
+
+    assert len(server.calls) == 1
+    assert await cache.stats() == {"hits": 1, "misses": 3, "entries": 1, "size": 19}
@@ -0,0 +1,84 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from inertia import SQLiteSSRCache
+from inertia.ssr import SSRResult
+
+from .utils import FakeClock
+
+
+async def test_workers_share_the_cache(tmp_path: Path) -> None:
+    path = tmp_path / "ssr.sqlite3"
+    worker_1 = SQLiteSSRCache(path)
+    worker_2 = SQLiteSSRCache(path)
+
+    await worker_1.set("a", SSRResult(head="<title>a</title>", body="<div>a</div>"))
+    assert await worker_2.get("a") == SSRResult(
+        head="<title>a</title>", body="<div>a</div>"
+    )
+    assert await worker_2.get("b") is None
+    assert await worker_2.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "entries": 1,
+        "size": 28,
+    }
+    assert (await worker_1.stats())["hits"] == 0
+
+    await worker_1.aclose()
+    await worker_2.aclose()
+
+
+async def test_results_cached_by_another_process_are_served(tmp_path: Path) -> None:
+    path = tmp_path / "ssr.sqlite3"
+    script = (
+        "import asyncio, sys\n"
+        "from inertia import SQLiteSSRCache\n"
+        "from inertia.ssr import SSRResult\n"
+        "cache = SQLiteSSRCache(sys.argv[1])\n"
+        "asyncio.run(cache.set('page', SSRResult(head='', body='<div>worker</div>')))\n"
+    )
+    subprocess.run([sys.executable, "-c", script, str(path)], check=True)
+
+    cache = SQLiteSSRCache(path)
+    result = await cache.get("page")
+    assert result is not None
+    assert result.body == "<div>worker</div>"
+    await cache.aclose()
+
+
+async def test_cache_evicts_least_recently_used_entries_by_size(
+    tmp_path: Path,
+) -> None:
+    clock = FakeClock(1000.0)
+    cache = SQLiteSSRCache(tmp_path / "ssr.sqlite3", max_bytes=10, clock=clock)
+    await cache.set("a", SSRResult(head="", body="aaaa"))
+    clock.now += 1
+    await cache.set("b", SSRResult(head="", body="bbbb"))
+    clock.now += 1
+    assert await cache.get("a") is not None
+
+    clock.now += 1
+    await cache.set("c", SSRResult(head="", body="cccc"))
+    assert await cache.get("b") is None
+    assert await cache.get("a") is not None
+    assert await cache.get("c") is not None
+    assert await cache.stats() == {"hits": 3, "misses": 1, "entries": 2, "size": 8}
+
+    await cache.set("big", SSRResult(head="", body="x" * 11))
+    assert await cache.get("big") is None
+    await cache.aclose()
+
+
+async def test_cache_entries_expire(tmp_path: Path) -> None:
+    clock = FakeClock(1000.0)
+    cache = SQLiteSSRCache(tmp_path / "ssr.sqlite3", ttl=10, clock=clock)
+    await cache.set("a", SSRResult(head="", body="aaaa"))
+
+    clock.now += 9.9
+    assert await cache.get("a") is not None
+    clock.now += 0.1
+    assert await cache.get("a") is None
+    assert (await cache.stats())["entries"] == 0
+    await cache.aclose()
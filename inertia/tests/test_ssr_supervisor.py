@@ -0,0 +1,126 @@
+import asyncio
+import json
+import sys
+from contextlib import asynccontextmanager
+from typing import Annotated, AsyncIterator, Callable
+
+import pytest
+from fastapi import FastAPI, Depends
+from starlette.testclient import TestClient
+
+from inertia import (
+    Inertia,
+    inertia_dependency_factory,
+    inertia_lifespan,
+    InertiaResponse,
+    InertiaConfig,
+    SSRSupervisor,
+)
+
+from .ssr_renderers import RENDERER_PATH
+from .utils import assert_response_content, manifest_json, templates
+
+
+COMMAND = [sys.executable, RENDERER_PATH]
+
+
+def page(component: str) -> bytes:
+    return json.dumps({"component": component, "props": {}}).encode()
+
+
+def rendered_by(response: bytes) -> int:
+    return int(json.loads(response)["body"].split()[-1].removesuffix("</div>"))
+
+
+async def wait_for(condition: Callable[[], bool]) -> None:
+    for _ in range(500):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Condition not met in time")
+
+
+async def test_renderers_are_spawned_on_start_and_stopped_on_close() -> None:
+    supervisor = SSRSupervisor(COMMAND, processes=3)
+    await supervisor.start()
+    pids = [renderer["pid"] for renderer in supervisor.stats()["renderers"]]
+    assert len(set(pids)) == 3
+    assert None not in pids
+
+    await supervisor.aclose()
+    assert supervisor.stats()["renderers"] == []
+
+
+async def test_renders_go_to_the_least_busy_renderer() -> None:
+    supervisor = SSRSupervisor(COMMAND, processes=2)
+    await supervisor.start()
+    responses = await asyncio.gather(
+        supervisor.render(page("Slow")), supervisor.render(page("IndexPage"))
+    )
+    assert rendered_by(responses[0]) != rendered_by(responses[1])
+
+    batch = await asyncio.gather(*(supervisor.render(page("A")) for _ in range(6)))
+    assert {rendered_by(response) for response in batch} == {
+        renderer["pid"] for renderer in supervisor.stats()["renderers"]
+    }
+    assert [renderer["renders"] for renderer in supervisor.stats()["renderers"]] == [
+        4,
+        4,
+    ]
+    await supervisor.aclose()
+
+
+async def test_crashed_renderers_are_restarted() -> None:
+    supervisor = SSRSupervisor(COMMAND, processes=1, restart_delay=0)
+    await supervisor.start()
+    pid = supervisor.stats()["renderers"][0]["pid"]
+
+    with pytest.raises(asyncio.IncompleteReadError):
+        await supervisor.render(page("Crash"))
+    await wait_for(lambda: supervisor.stats()["renderers"][0]["pid"] not in (None, pid))
+    assert supervisor.stats()["restarts"] == 1
+
+    assert rendered_by(await supervisor.render(page("IndexPage"))) != pid
+    await supervisor.aclose()
+
+
+async def test_renderers_are_recycled_after_max_renders() -> None:
+    supervisor = SSRSupervisor(COMMAND, processes=1, max_renders=2)
+    pids = [rendered_by(await supervisor.render(page("IndexPage"))) for _ in range(5)]
+
+    assert pids[0] == pids[1] != pids[2] == pids[3] != pids[4]
+    assert supervisor.stats()["recycled"] == 2
+    assert supervisor.stats()["restarts"] == 0
+    await supervisor.aclose()
+
+
+def test_supervisor_is_started_by_the_lifespan() -> None:
+    supervisor = SSRSupervisor(COMMAND, processes=2)
+    config = InertiaConfig(
+        templates=templates,
+        ssr_enabled=True,
+        environment="production",
+        manifest_json_path=manifest_json,
+        ssr_transport=supervisor,
+    )
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        async with inertia_lifespan(config):
+            yield
+
+    app = FastAPI(lifespan=lifespan)
+    InertiaDep = Annotated[Inertia, Depends(inertia_dependency_factory(config))]
+
+    @app.get("/", response_model=None)
+    async def index(inertia: InertiaDep) -> InertiaResponse:
+        return await inertia.render("IndexPage", {})
+
+    with TestClient(app) as client:
+        pids = [renderer["pid"] for renderer in supervisor.stats()["renderers"]]
+        assert len(pids) == 2
+        assert None not in pids
+
+        response = client.get("/")
+        assert_response_content(response, expected_body_content="IndexPage rendered by")
+    assert supervisor.stats()["renderers"] == []
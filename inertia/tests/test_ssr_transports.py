@@ -0,0 +1,151 @@
+import asyncio
+import json
+import os
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Annotated, AsyncIterator
+
+import pytest
+from fastapi import FastAPI, Depends
+from starlette.testclient import TestClient
+
+from inertia import (
+    Inertia,
+    inertia_dependency_factory,
+    inertia_lifespan,
+    InertiaResponse,
+    HTTPSSRTransport,
+    StdioSSRTransport,
+)
+from inertia.ssr import SSRResult
+
+from .ssr_renderers import RENDERER_PATH, serve_http
+from .utils import assert_response_content, create_ssr_config
+
+
+PROPS = {"message": "hello from index"}
+
+
+def page(component: str) -> bytes:
+    return json.dumps({"component": component, "props": PROPS}).encode()
+
+
+async def test_http_transport() -> None:
+    server = await asyncio.start_server(serve_http, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    transport = HTTPSSRTransport(url=f"http://127.0.0.1:{port}", gzip_min_size=1)
+    config = create_ssr_config(ssr_transport=transport)
+    async with server:
+        result = await config.ssr_client.render(page("IndexPage"))
+        await config.ssr_client.aclose()
+
+    assert result == SSRResult(
+        head="<title>IndexPage</title>",
+        body=f'<div id="app">IndexPage rendered by {os.getpid()}</div>',
+    )
+    assert transport._client is None
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Unix domain sockets only")
+async def test_unix_domain_socket_transport(tmp_path: Path) -> None:
+    socket_path = str(tmp_path / "ssr.sock")
+    server = await asyncio.start_unix_server(serve_http, socket_path)
+    config = create_ssr_config(ssr_transport=HTTPSSRTransport(uds=socket_path))
+    async with server:
+        results = [
+            await config.ssr_client.render(page(component))
+            for component in ("IndexPage", "OtherPage")
+        ]
+        await config.ssr_client.aclose()
+
+    assert [result.head for result in results] == [
+        "<title>IndexPage</title>",
+        "<title>OtherPage</title>",
+    ]
+
+
+async def test_stdio_transport_keeps_the_renderer_running() -> None:
+    transport = StdioSSRTransport([sys.executable, RENDERER_PATH])
+    assert transport.pid is None
+
+    first = await transport.render(page("IndexPage"))
+    pid = transport.pid
+    second = await transport.render(page("OtherPage"))
+    assert transport.pid == pid
+    assert (
+        json.loads(first)["body"] == f'<div id="app">IndexPage rendered by {pid}</div>'
+    )
+    assert json.loads(second)["head"] == ["<title>OtherPage</title>"]
+
+    await transport.aclose()
+    assert transport.pid is None
+
+
+async def test_stdio_transport_restarts_the_renderer_after_a_crash() -> None:
+    transport = StdioSSRTransport([sys.executable, RENDERER_PATH])
+    await transport.render(page("IndexPage"))
+    pid = transport.pid
+
+    with pytest.raises(asyncio.IncompleteReadError):
+        await transport.render(page("Crash"))
+    assert transport.pid is None
+
+    await transport.render(page("IndexPage"))
+    assert transport.pid not in (None, pid)
+    await transport.aclose()
+
+
+async def test_stdio_transport_restarts_the_renderer_after_a_timeout() -> None:
+    transport = StdioSSRTransport([sys.executable, RENDERER_PATH], timeout=0.2)
+    with pytest.raises(asyncio.TimeoutError):
+        await transport.render(page("Slow"))
+    assert transport.pid is None
+
+    # The new renderer must have time to start
+    transport.timeout = 5
+    response = await transport.render(page("IndexPage"))
+    assert json.loads(response)["head"] == ["<title>IndexPage</title>"]
+    await transport.aclose()
+
+
+async def test_stdio_transport_keeps_the_renderer_after_a_cancelled_render() -> None:
+    transport = StdioSSRTransport([sys.executable, RENDERER_PATH])
+    await transport.start()
+    pid = transport.pid
+
+    render = asyncio.ensure_future(transport.render(page("Slow")))
+    await asyncio.sleep(0.1)
+    render.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await render
+
+    response = await transport.render(page("IndexPage"))
+    assert json.loads(response)["head"] == ["<title>IndexPage</title>"]
+    assert transport.pid == pid
+    await transport.aclose()
+
+
+def test_pages_are_rendered_through_the_configured_transport() -> None:
+    transport = StdioSSRTransport([sys.executable, RENDERER_PATH])
+    config = create_ssr_config(ssr_transport=transport)
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        async with inertia_lifespan(config):
+            yield
+
+    app = FastAPI(lifespan=lifespan)
+    InertiaDep = Annotated[Inertia, Depends(inertia_dependency_factory(config))]
+
+    @app.get("/", response_model=None)
+    async def index(inertia: InertiaDep) -> InertiaResponse:
+        return await inertia.render("IndexPage", PROPS)
+
+    with TestClient(app) as client:
+        response = client.get("/")
+        assert_response_content(
+            response,
+            expected_body_content=f'<div id="app">IndexPage rendered by {transport.pid}</div>',
+        )
+    assert transport.pid is None
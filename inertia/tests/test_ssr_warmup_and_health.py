@@ -0,0 +1,142 @@
+import asyncio
+import json
+import sys
+from typing import Optional
+
+import pytest
+from starlette.testclient import TestClient
+
+from inertia import (
+    HTTPSSRTransport,
+    LoadBalancedSSRTransport,
+    SSRSupervisor,
+    StdioSSRTransport,
+)
+
+from .ssr_renderers import RENDERER_PATH, serve_http
+from .utils import (
+    FakeSSRTransport,
+    assert_response_content,
+    create_app,
+    create_ssr_config,
+)
+
+PROPS = {"message": "hello from index"}
+SSR_BODY = "<div>rendered by ssr</div>"
+
+
+class FakeTransport(FakeSSRTransport):
+    def __init__(self) -> None:
+        super().__init__(SSR_BODY)
+        self.healthy = True
+        self.failing_component: Optional[str] = None
+
+    async def render(self, page_json: bytes, component: Optional[str] = None) -> bytes:
+        content = await super().render(page_json, component)
+        if component == self.failing_component:
+            raise ConnectionError(f"{component} cannot be rendered")
+        assert json.loads(page_json)["component"] == component
+        return content
+
+    async def health(self) -> bool:
+        return self.healthy
+
+
+def test_warmup_pages_are_rendered_on_startup() -> None:
+    transport = FakeTransport()
+    transport.failing_component = "BrokenPage"
+    config = create_ssr_config(
+        ssr_transport=transport,
+        ssr_warmup_pages=[
+            ("IndexPage", PROPS),
+            ("BrokenPage", {}),
+            ("OtherPage", {"items": []}),
+        ],
+    )
+
+    with TestClient(create_app(config, PROPS, lifespan=True)):
+        assert sorted(transport.components) == [  # type: ignore[type-var]
+            "BrokenPage",
+            "IndexPage",
+            "OtherPage",
+        ]
+
+
+def test_ssr_is_skipped_while_the_renderer_is_down() -> None:
+    transport = FakeTransport()
+    config = create_ssr_config(ssr_transport=transport, ssr_health_check_interval=0.01)
+
+    with TestClient(create_app(config, PROPS, lifespan=True)) as client:
+        response = client.get("/")
+        assert_response_content(response, expected_body_content=SSR_BODY)
+
+        transport.healthy = False
+        client.portal.call(asyncio.sleep, 0.1)  # type: ignore[union-attr]
+        assert config.ssr_client.available is False
+        renders = len(transport.components)
+        response = client.get("/")
+        assert_response_content(response, expected_props=PROPS)
+        assert len(transport.components) == renders
+
+        transport.healthy = True
+        client.portal.call(asyncio.sleep, 0.1)  # type: ignore[union-attr]
+        assert config.ssr_client.available is True
+        response = client.get("/")
+        assert_response_content(response, expected_body_content=SSR_BODY)
+
+
+async def test_http_transport_health() -> None:
+    server = await asyncio.start_server(serve_http, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    transport = HTTPSSRTransport(url=f"http://127.0.0.1:{port}")
+    config = create_ssr_config(
+        ssr_transport=transport,
+    )
+    async with server:
+        assert await config.ssr_client.check_health() is True
+    server.close()
+    await server.wait_closed()
+    await transport.aclose()
+
+    assert await config.ssr_client.check_health() is False
+    assert config.ssr_client.available is False
+
+
+async def test_balanced_endpoints_are_up_while_one_of_them_is() -> None:
+    transports = {name: FakeTransport() for name in ("a", "b")}
+    balancer = LoadBalancedSSRTransport(transports)
+    assert await balancer.health() is True
+
+    transports["a"].healthy = False
+    assert await balancer.health() is True
+
+    transports["b"].healthy = False
+    assert await balancer.health() is False
+
+
+async def test_renderer_process_health() -> None:
+    transport = StdioSSRTransport([sys.executable, RENDERER_PATH])
+    assert await transport.health() is True
+    await transport.aclose()
+
+    supervisor = SSRSupervisor([sys.executable, RENDERER_PATH], processes=1)
+    await supervisor.start()
+    assert await supervisor.health() is True
+    await supervisor.aclose()
+    assert await supervisor.health() is False
+
+
+async def test_renderers_that_cannot_start_are_retried(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    supervisor = SSRSupervisor(["/nonexistent/renderer"], restart_delay=0.01)
+
+    with pytest.raises(FileNotFoundError):
+        await supervisor.start()
+    for _ in range(100):
+        if caplog.text.count("Could not start the SSR renderer") > 1:
+            break
+        await asyncio.sleep(0.01)
+    assert caplog.text.count("Could not start the SSR renderer") > 1
+    assert await supervisor.health() is False
+    await supervisor.aclose()
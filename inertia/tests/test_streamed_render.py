@@ -0,0 +1,197 @@
+import asyncio
+from typing import Annotated, Any, Dict, Iterator, List
+
+import pytest
+from fastapi import Depends, FastAPI
+from starlette.testclient import TestClient
+from starlette.types import Message
+
+from inertia import (
+    Inertia,
+    InertiaConfig,
+    InertiaResponse,
+    inertia_dependency_factory,
+)
+
+from .utils import (
+    FakeSSRTransport,
+    assert_response_content,
+    create_app,
+    manifest_json,
+    templates,
+)
+
+PROPS = {"message": "hello from index"}
+SSR_HEAD = "<title>rendered by ssr</title>"
+SSR_BODY = "<div>rendered by ssr</div>"
+JS_FILE = "/assets/main-DOVmxSVH.js"
+CSS_FILES = [
+    "/assets/main-jJL2BnPz.css",
+    "/assets/main-jJL2BnPy.css",
+    "/assets/main-jJL2BnPx.css",
+]
+CSS_LINK = f'<link rel="stylesheet" href="{CSS_FILES[-1]}">'
+
+
+def create_streaming_app(props: Dict[str, Any], **kwargs: object) -> FastAPI:
+    config = InertiaConfig(
+        templates=templates,
+        environment="production",
+        manifest_json_path=manifest_json,
+        stream_html=True,
+        **kwargs,  # type: ignore[arg-type]
+    )
+    return create_app(config, props)
+
+
+async def test_head_is_sent_before_the_props_are_resolved() -> None:
+    resolved = asyncio.Event()
+
+    async def slow_message() -> str:
+        await resolved.wait()
+        return "hello from index"
+
+    app = create_streaming_app({"message": slow_message})
+    chunks: List[bytes] = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+    disconnected = asyncio.Event()
+
+    async def receive() -> Message:
+        if requests:
+            return requests.pop()
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.body" and message["body"]:
+            chunks.append(message["body"])
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("testserver", 80),
+    }
+    task = asyncio.ensure_future(app(scope, receive, send))
+    try:
+        for _ in range(100):
+            if chunks:
+                break
+            await asyncio.sleep(0.01)
+
+        assert len(chunks) == 1
+        head = chunks[0].decode()
+        assert head.rstrip().endswith(CSS_LINK)
+        assert "data-page" not in head
+    finally:
+        resolved.set()
+        await task
+    assert len(chunks) == 2
+    assert "hello from index" in chunks[1].decode()
+    assert chunks[1].decode().rstrip().endswith("</html>")
+
+
+def test_streamed_page_has_the_content_of_the_regular_page() -> None:
+    client = TestClient(create_streaming_app(PROPS))
+
+    streamed = client.get("/")
+    regular = client.get("/", params={"stream": False})
+
+    assert streamed.headers["content-type"] == "text/html; charset=utf-8"
+    assert "content-length" not in streamed.headers
+    assert "content-length" in regular.headers
+    for response in (streamed, regular):
+        assert_response_content(
+            response,
+            expected_component="IndexPage",
+            expected_props=PROPS,
+            expected_script_asset_url=JS_FILE,
+            expected_css_asset_urls=CSS_FILES,
+        )
+
+
+def test_ssr_head_is_streamed_in_the_head() -> None:
+    client = TestClient(
+        create_streaming_app(
+            PROPS,
+            ssr_enabled=True,
+            ssr_transport=FakeSSRTransport(SSR_BODY, head=[SSR_HEAD]),
+        )
+    )
+
+    response = client.get("/")
+
+    assert_response_content(response, expected_body_content=SSR_BODY)
+    head, _, body = response.text.partition("</head>")
+    assert SSR_HEAD in head
+    assert head.index(CSS_LINK) < head.index(SSR_HEAD)
+    assert SSR_BODY in body
+
+
+def test_errors_after_the_head_close_the_document() -> None:
+    def failing_message() -> str:
+        raise RuntimeError("The database is down")
+
+    client = TestClient(create_streaming_app({"message": failing_message}))
+
+    response = client.get("/")
+
+    assert response.status_code == 200
+    assert CSS_LINK in response.text
+    assert "data-page" not in response.text
+    assert response.text.rstrip().endswith("</html>")
+
+
+@pytest.mark.parametrize("dependencies_outlive_stream", [True, False])
+def test_props_are_resolved_before_the_dependencies_are_closed(
+    monkeypatch: pytest.MonkeyPatch, dependencies_outlive_stream: bool
+) -> None:
+    monkeypatch.setattr(
+        "inertia.inertia._DEPENDENCIES_OUTLIVE_STREAM", dependencies_outlive_stream
+    )
+    config = InertiaConfig(
+        templates=templates,
+        environment="production",
+        manifest_json_path=manifest_json,
+        stream_html=True,
+    )
+    app = FastAPI()
+    InertiaDep = Annotated[Inertia, Depends(inertia_dependency_factory(config))]
+    events: List[str] = []
+
+    def get_session() -> Iterator[Dict[str, str]]:
+        yield {"message": "hello from the session"}
+        events.append("closed")
+
+    @app.get("/", response_model=None)
+    async def index(
+        inertia: InertiaDep, session: Annotated[Dict[str, str], Depends(get_session)]
+    ) -> InertiaResponse:
+        def message() -> str:
+            events.append("resolved")
+            return session["message"]
+
+        response = await inertia.render("IndexPage", {"message": message})
+        events.append("returned")
+        return response
+
+    response = TestClient(app).get("/")
+
+    assert_response_content(
+        response, expected_props={"message": "hello from the session"}
+    )
+    # Before FastAPI 0.118.0, the dependencies are closed once the route returns
+    expected = (
+        ["returned", "resolved"]
+        if dependencies_outlive_stream
+        else ["resolved", "returned"]
+    )
+    assert events == [*expected, "closed"]
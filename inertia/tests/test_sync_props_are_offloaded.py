@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+from typing import Annotated
+
+import pytest
+from fastapi import FastAPI, Depends
+from starlette.testclient import TestClient
+
+from inertia import (
+    Inertia,
+    inertia_dependency_factory,
+    InertiaResponse,
+    InertiaConfig,
+    inertia_lifespan,
+    inline,
+    lazy,
+)
+
+from .utils import templates
+
+COMPONENT = "IndexPage"
+
+
+def thread_name() -> str:
+    return threading.current_thread().name
+
+
+def slow_prop() -> str:
+    time.sleep(0.05)
+    return "slow"
+
+
+def create_app(config: InertiaConfig) -> FastAPI:
+    app = FastAPI()
+    InertiaDep = Annotated[Inertia, Depends(inertia_dependency_factory(config))]
+
+    @app.get("/", response_model=None)
+    async def index(inertia: InertiaDep) -> InertiaResponse:
+        return await inertia.render(
+            COMPONENT,
+            {
+                "loop": thread_name(),
+                "offloaded": thread_name,
+                "inline": inline(thread_name),
+                "lazy": lazy(thread_name),
+            },
+        )
+
+    @app.get("/slow", response_model=None)
+    async def slow(inertia: InertiaDep) -> InertiaResponse:
+        return await inertia.render(COMPONENT, {"slow": slow_prop})
+
+    return app
+
+
+def test_sync_props_are_called_in_the_thread_pool() -> None:
+    app = create_app(InertiaConfig(templates=templates, offload_sync_props=True))
+    with TestClient(app) as client:
+        response = client.get("/", headers={"X-Inertia": "true"})
+        props = response.json()["props"]
+        assert props["offloaded"].startswith("inertia-props")
+        assert props["inline"] == props["loop"]
+
+
+def test_lazy_sync_props_are_called_in_the_thread_pool() -> None:
+    app = create_app(InertiaConfig(templates=templates, offload_sync_props=True))
+    with TestClient(app) as client:
+        response = client.get(
+            "/",
+            headers={
+                "X-Inertia": "true",
+                "X-Inertia-Partial-Data": "lazy",
+                "X-Inertia-Partial-Component": COMPONENT,
+            },
+        )
+        assert response.json()["props"]["lazy"].startswith("inertia-props")
+
+
+def test_sync_props_are_called_on_the_event_loop_by_default() -> None:
+    app = create_app(InertiaConfig(templates=templates))
+    with TestClient(app) as client:
+        response = client.get("/", headers={"X-Inertia": "true"})
+        props = response.json()["props"]
+        assert props["offloaded"] == props["loop"]
+
+
+def test_slow_sync_props_are_logged_in_development(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    app = create_app(InertiaConfig(templates=templates, slow_sync_prop_threshold=0.01))
+    with caplog.at_level(logging.WARNING, logger="inertia.props"):
+        with TestClient(app) as client:
+            client.get("/slow", headers={"X-Inertia": "true"})
+    assert "'slow_prop' held the event loop" in caplog.text
+
+
+def test_slow_sync_props_are_not_logged_when_offloaded(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    app = create_app(
+        InertiaConfig(
+            templates=templates,
+            offload_sync_props=True,
+            slow_sync_prop_threshold=0.01,
+        )
+    )
+    with caplog.at_level(logging.WARNING, logger="inertia.props"):
+        with TestClient(app) as client:
+            client.get("/slow", headers={"X-Inertia": "true"})
+    assert "held the event loop" not in caplog.text
+
+
+async def test_thread_pool_is_shut_down_with_the_application() -> None:
+    config = InertiaConfig(templates=templates, offload_sync_props=True)
+    executor = config.props_executor
+    assert executor is not None
+    executor.submit(thread_name).result()
+
+    async with inertia_lifespan(config):
+        pass
+
+    with pytest.raises(RuntimeError):
+        executor.submit(thread_name)
+    assert config.props_executor is not executor
+    assert config.props_executor is not None
+    assert (
+        config.props_executor.submit(thread_name).result().startswith("inertia-props")
+    )
+    config.props_executor.shutdown()
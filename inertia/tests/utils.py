@@ -1,12 +1,121 @@
+import asyncio
 import json
 import os
-from typing import Any, List, Optional, Union, cast
+from contextlib import asynccontextmanager
+from typing import (
+    Annotated,
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Union,
+    cast,
+)
+from fastapi import Depends, FastAPI
 from fastapi.templating import Jinja2Templates
 from httpx import Response
 from bs4 import BeautifulSoup, Tag
 
+from inertia import (
+    Inertia,
+    InertiaConfig,
+    InertiaResponse,
+    SSRTransport,
+    inertia_dependency_factory,
+    inertia_lifespan,
+)
+
 template_dir = os.path.join(os.path.dirname(__file__), "templates")
 templates = Jinja2Templates(directory=template_dir)
+manifest_json = os.path.join(os.path.dirname(__file__), "dummy_manifest_js.json")
+
+
+class FakeClock:
+    """
+    Clock whose time is moved forward by the test
+    """
+
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeSSRTransport(SSRTransport):
+    """
+    SSR transport rendering every page to the same body, and recording the
+    rendered components. Renders can be held by a gate, delayed, or made to fail.
+    """
+
+    def __init__(self, body: str, head: Sequence[str] = ()) -> None:
+        self.body = body
+        self.head = list(head)
+        self.components: List[Optional[str]] = []
+        self.gate: Optional[asyncio.Event] = None
+        self.delay = 0.0
+        self.failing = False
+        self.cancelled = 0
+
+    async def render(self, page_json: bytes, component: Optional[str] = None) -> bytes:
+        self.components.append(component)
+        try:
+            if self.gate is not None:
+                await self.gate.wait()
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.failing:
+            raise ConnectionError(f"{self.body} is down")
+        return json.dumps({"head": self.head, "body": self.body}).encode()
+
+
+def create_ssr_config(**kwargs: Any) -> InertiaConfig:
+    """
+    Create a production config with SSR enabled
+    """
+    return InertiaConfig(
+        templates=templates,
+        ssr_enabled=True,
+        environment="production",
+        manifest_json_path=manifest_json,
+        **kwargs,
+    )
+
+
+def create_app(
+    config: InertiaConfig, props: Dict[str, Any], lifespan: bool = False
+) -> FastAPI:
+    """
+    Create an application rendering the IndexPage at any path. The `ssr`, `stream`
+    and `deadline` query parameters are passed to `Inertia.render`.
+    With `lifespan`, the application runs `inertia_lifespan`.
+    """
+
+    @asynccontextmanager
+    async def app_lifespan(_: FastAPI) -> AsyncIterator[None]:
+        async with inertia_lifespan(config):
+            yield
+
+    app = FastAPI(lifespan=app_lifespan if lifespan else None)
+    InertiaDep = Annotated[Inertia, Depends(inertia_dependency_factory(config))]
+
+    @app.get("/{path:path}", response_model=None)
+    async def index(
+        path: str,
+        inertia: InertiaDep,
+        ssr: Optional[bool] = None,
+        stream: Optional[bool] = None,
+        deadline: Optional[float] = None,
+    ) -> InertiaResponse:
+        return await inertia.render(
+            "IndexPage", props, ssr=ssr, stream=stream, ssr_deadline=deadline
+        )
+
+    return app
 
 
 def assert_response_content(
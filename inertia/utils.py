@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from json import JSONEncoder, load as json_load
-from functools import lru_cache
 from fastapi.encoders import jsonable_encoder
+from markupsafe import Markup
 from typing import (
     Literal,
     Callable,
@@ -12,6 +12,7 @@ from typing import (
     cast,
     Any,
     Awaitable,
+    Sequence,
 )
 
 
@@ -29,9 +30,9 @@ class InertiaJsonEncoder(JSONEncoder):
         """
         super().__init__(*args, **kwargs)
 
-    def encode(self, value: Any) -> Any:
+    def default(self, value: Any) -> Any:
         """
-        Encode the value
+        Encode a value the json module does not handle natively
         Uses the jsonable_encoder from FastAPI to encode the value
         :param value: Value to encode
         :return: Encoded value
@@ -101,6 +102,27 @@ class DeferredProp(IgnoreOnFirstLoadProp):
         self.group = group
 
 
+class InlineProp:
+    """
+    Marker for a cheap synchronous callable property: it is always called directly
+    on the event loop, even when synchronous props are offloaded to a thread pool
+    """
+
+    def __init__(self, prop: Callable[[], Any]):
+        """
+        Constructor
+        :param prop: Callable property to evaluate
+        """
+        self.prop = prop
+
+    def __call__(self) -> Any:
+        """
+        Call the property
+        :return: Value of the property
+        """
+        return self.prop()
+
+
 def lazy(prop: Union[Callable[[], Union[Any, Awaitable[Any]]], Any]) -> LazyProp:
     """
     Create a lazy property
@@ -127,6 +149,16 @@ def defer(
     return DeferredProp(prop, group)
 
 
+def inline(prop: Callable[[], Any]) -> InlineProp:
+    """
+    Mark a synchronous callable property as cheap, so that it is called directly on
+    the event loop instead of being offloaded to the thread pool
+    :param prop: Callable property to evaluate
+    :return: Inline property
+    """
+    return InlineProp(prop)
+
+
 class ViteManifestChunk(TypedDict):
     file: str
     src: Optional[str]
@@ -141,12 +173,27 @@ class ViteManifestChunk(TypedDict):
 ViteManifest = Dict[str, ViteManifestChunk]
 
 
-@lru_cache
 def _read_manifest_file(path: str) -> ViteManifest:
     with open(path, "r") as manifest_file:
         return cast(ViteManifest, json_load(manifest_file))
 
 
+def htmlsafe_json(data: bytes) -> Markup:
+    """
+    Make JSON data safe to embed in HTML, replacing HTML-unsafe characters with
+    unicode escapes, like jinja's htmlsafe_json_dumps
+    :param data: UTF-8 encoded JSON data
+    :return: The HTML-safe JSON string
+    """
+    return Markup(
+        data.decode("utf-8")
+        .replace("<", "\\u003c")
+        .replace(">", "\\u003e")
+        .replace("&", "\\u0026")
+        .replace("'", "\\u0027")
+    )
+
+
 @dataclass()
 class InertiaContext:
     """
@@ -155,9 +202,10 @@ class InertiaContext:
 
     environment: Literal["development", "production"]
     dev_url: str
-    css: list[str]
+    css: Sequence[str]
     js: str
     is_ssr: bool
     data: Optional[str] = None
     ssr_head: Optional[str] = None
     ssr_body: Optional[str] = None
+    split: bool = False